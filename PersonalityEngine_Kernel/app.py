@@ -4,18 +4,169 @@ Production Build – Stripe Payment Link Flow
 Railway Ready
 """
 
-from fastapi import FastAPI, HTTPException, Query, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Form, Header, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
+import anyio.to_thread
+import os
+import secrets
+import threading
+import time
+
+from PersonalityEngine_Kernel.engine_runtime.affinity_dispatch import (
+    dispatched_inference_record, get_dispatcher, start_dispatcher, stop_dispatcher,
+)
+from PersonalityEngine_Kernel.engine_runtime.admission import (
+    ADMISSION_ENABLED, AdmissionController, AdmissionMiddleware,
+)
+from PersonalityEngine_Kernel.engine_runtime.input_limits import (
+    BodyLimitMiddleware, InputLimitError, InputLimits,
+)
+from PersonalityEngine_Kernel.engine_runtime.population_stats import get_population_stats, summarize
+from PersonalityEngine_Kernel.engine_runtime.slow_requests import SlowRequestLog
+from PersonalityEngine_Kernel.engine_runtime.stack_sampler import ProfilerBusy, get_stack_sampler
+from PersonalityEngine_Kernel.engine_runtime.structured_logging import (
+    REQUEST_STATE_KEY, RequestLogMiddleware, configure_logging, get_log_handler, shutdown_logging,
+)
+from PersonalityEngine_Kernel.engine_runtime.warmup import WarmupState, start_warmup
+from PersonalityEngine_Kernel.engines.inference.inference_engine import (
+    ENGINE_VERSION, decide_inference, render_record, run_inference,
+)
+from PersonalityEngine_Kernel.engines.inference.result_cache import get_result_cache, open_errors
+from PersonalityEngine_Kernel.engines.inference.snapshot_store import get_snapshot_store
+from PersonalityEngine_Kernel.engines.translation.narrative_report import render_narrative
+from PersonalityEngine_Kernel.engines.translation.report_page import render_report_html
+
+# -----------------------------
+# Warm-up (flips /ready when done)
+# -----------------------------
+
+WARMUP = WarmupState()
+
+
+def _warm_vector(engine_input: dict):
+    from PersonalityEngine_Kernel.engines.vector.vector_engine import run_vector_inference
+    return render_narrative(run_vector_inference(engine_input))
+
+
+def _warm_report(engine_input: dict):
+    return render_report_html(run_inference(engine_input))
+
+
+def _warm_dispatch(engine_input: dict):
+    # With PEK_AFFINITY_WORKERS, every worker process must have imported the
+    # engine before /ready; in-process steps don't reach them.
+    dispatcher = get_dispatcher()
+    if dispatcher is not None:
+        dispatcher.warm(engine_input)
+
+
+def _warm_request_model(engine_input: dict):
+    return build_engine_input(InferenceRequest(responses=[engine_input["example_statement"]]))
+
+
+WARMUP_STEPS = [
+    ("request_model", _warm_request_model),
+    ("inference", run_inference),
+    ("dispatch", _warm_dispatch),
+    ("trace", lambda e: run_inference(e, trace=True)),
+    ("vector", _warm_vector),
+    ("report_html", _warm_report),
+    ("report_form", lambda e: report_form(paid="true")),
+    ("json_response", lambda e: JSONResponse(content=run_inference(e))),
+]
+
+
+# Sync routes run on the AnyIO worker-thread pool (40 threads by default).
+# On a free-threaded interpreter those threads run inference in parallel, so
+# the pool size is the per-process concurrency limit.
+THREADPOOL_SIZE = int(os.environ.get("PEK_THREADPOOL_SIZE", 0))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    if THREADPOOL_SIZE > 0:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Opening the shared cache / snapshot files is part of warming up.
+    get_result_cache()
+    get_snapshot_store()
+    # PEK_AFFINITY_WORKERS>0: inference runs in pinned local worker processes.
+    start_dispatcher()
+    start_warmup(WARMUP, WARMUP_STEPS)
+    yield
+    stop_dispatcher()
+    stats = get_population_stats()
+    if stats is not None:
+        stats.flush()
+    dump_path = os.environ.get("PEK_SLOW_LOG_DUMP")
+    if dump_path:
+        SLOW_REQUESTS.dump_jsonl(dump_path)
+    shutdown_logging()
 
-from PersonalityEngine_Kernel.engines.inference.inference_engine import run_inference
 
 app = FastAPI(
     title="PersonaSight™",
-    version="2.0.1"
+    version="2.0.1",
+    lifespan=lifespan
 )
 
+# -----------------------------
+# Input Limits (live_input_mode.json)
+# -----------------------------
+
+INPUT_LIMITS = InputLimits()
+app.add_middleware(BodyLimitMiddleware, limits=INPUT_LIMITS)
+
+
+def limit_responses(responses: List[str]):
+    try:
+        return INPUT_LIMITS.apply(responses)
+    except InputLimitError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+
+# -----------------------------
+# Admission Control (outermost: rejects before the body is read)
+# -----------------------------
+
+ADMISSION = AdmissionController() if ADMISSION_ENABLED else None
+if ADMISSION is not None:
+    app.add_middleware(AdmissionMiddleware, controller=ADMISSION)
+
+# Request records wrap everything above, so rejected requests log their status.
+app.add_middleware(RequestLogMiddleware)
+
+# -----------------------------
+# Debug Endpoints (token protected)
+# -----------------------------
+
+SLOW_REQUESTS = SlowRequestLog()
+
+
+def require_debug_token(token: Optional[str]) -> None:
+    # Disabled entirely unless PEK_DEBUG_TOKEN is set.
+    expected = os.environ.get("PEK_DEBUG_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid debug token")
+
+
+def infer_with_record(engine_input: dict):
+    # (result, cache status, decision record); cache rows and worker replies
+    # carry the record, so no path runs inference twice.
+    return dispatched_inference_record(engine_input)
+
+
+def observe_population(engine_input: dict, record: dict) -> None:
+    stats = get_population_stats()
+    if stats is not None:
+        stats.observe(engine_input, record)
+
+
 # -----------------------------
 # Request Model
 # -----------------------------
@@ -35,6 +186,125 @@ def health():
     return {"status": "ok", "engine": "PersonaSight™"}
 
 
+# -----------------------------
+# Readiness (after warm-up)
+# -----------------------------
+
+@app.get("/ready")
+def ready():
+    if not WARMUP.ready.is_set():
+        return JSONResponse(status_code=503, content=WARMUP.describe())
+    return WARMUP.describe()
+
+
+# -----------------------------
+# Admission Stats
+# -----------------------------
+
+@app.get("/admission/stats")
+def admission_stats():
+    if ADMISSION is None:
+        return {"enabled": False}
+    return ADMISSION.stats()
+
+
+# -----------------------------
+# Input Limit Stats
+# -----------------------------
+
+@app.get("/input/stats")
+def input_stats():
+    return INPUT_LIMITS.stats()
+
+
+# -----------------------------
+# Logging Pipeline Stats
+# -----------------------------
+
+@app.get("/logging/stats")
+def logging_stats():
+    handler = get_log_handler()
+    if handler is None:
+        return {"enabled": False}
+    return handler.stats()
+
+
+# -----------------------------
+# Affinity Dispatch Stats
+# -----------------------------
+
+@app.get("/affinity/stats")
+def affinity_stats():
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
+        return {"enabled": False}
+    return dispatcher.stats()
+
+
+# -----------------------------
+# Slowest Recent Requests
+# -----------------------------
+
+@app.get("/debug/slow")
+def debug_slow(format: str = Query("json"), x_debug_token: Optional[str] = Header(None)):
+    require_debug_token(x_debug_token)
+    if format == "jsonl":
+        return PlainTextResponse(SLOW_REQUESTS.to_jsonl(), media_type="application/x-ndjson")
+    return SLOW_REQUESTS.describe()
+
+
+# -----------------------------
+# On-Demand Stack Profile
+# -----------------------------
+
+@app.get("/debug/profile")
+def debug_profile(seconds: float = Query(5.0), hz: int = Query(100), format: str = Query("collapsed"),
+                  idle: bool = Query(False), x_debug_token: Optional[str] = Header(None)):
+    # Samples every thread (including the pool running sync handlers) for
+    # `seconds`; this request's own thread is left out.
+    require_debug_token(x_debug_token)
+    try:
+        profile = get_stack_sampler().run(seconds, hz, exclude=(threading.get_ident(),), include_idle=idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "json":
+        return profile.describe()
+    return PlainTextResponse(profile.collapsed())
+
+
+# -----------------------------
+# Population Stats
+# -----------------------------
+
+@app.get("/stats")
+def population_stats(scope: str = Query("worker"), format: str = Query("summary")):
+    # scope=all merges every worker's flushed snapshot (PEK_STATS_DIR);
+    # format=sketch returns the mergeable state instead of the summary.
+    stats = get_population_stats()
+    if stats is None:
+        return {"enabled": False}
+    if scope not in ("worker", "all"):
+        raise HTTPException(status_code=400, detail="scope must be worker or all")
+    if format not in ("summary", "sketch"):
+        raise HTTPException(status_code=400, detail="format must be summary or sketch")
+    snapshot = stats.cluster_snapshot() if scope == "all" else stats.snapshot()
+    if format == "sketch":
+        return snapshot
+    return {"enabled": True, "scope": scope, **summarize(snapshot)}
+
+
+# -----------------------------
+# Shared Result Cache Stats
+# -----------------------------
+
+@app.get("/cache/stats")
+def cache_stats():
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False, "open_errors": open_errors()}
+    return {"enabled": True, "open_errors": open_errors(), **cache.stats()}
+
+
 # -----------------------------
 # Engine Input Builder
 # -----------------------------
@@ -53,12 +323,36 @@ def build_engine_input(payload: InferenceRequest) -> dict:
 # -----------------------------
 
 @app.post("/infer")
-def infer(payload: InferenceRequest):
+def infer(payload: InferenceRequest, request: Request, trace: bool = Query(False)):
     if not payload.responses:
         raise HTTPException(status_code=400, detail="No responses provided")
 
+    t0 = time.perf_counter()
+    payload.responses, warnings = limit_responses(payload.responses)
     engine_input = build_engine_input(payload)
-    result = run_inference(engine_input)
+    t1 = time.perf_counter()
+    if trace:
+        # never served from the cache: the trace must describe this run
+        from PersonalityEngine_Kernel.engines.inference.inference_trace import trace_inference_record
+        (result, record), cache_status = trace_inference_record(engine_input), "bypass"
+    else:
+        result, cache_status, record = infer_with_record(engine_input)
+    t2 = time.perf_counter()
+    # NumPy and the compiled kernel load on first use, not at worker start.
+    from PersonalityEngine_Kernel.engines.vector.vector_engine import run_vector_inference
+    result["kernel_vector"] = run_vector_inference(engine_input)
+    result["narrative"] = render_narrative(result["kernel_vector"])
+    if warnings:
+        result["input_warnings"] = warnings
+    t3 = time.perf_counter()
+
+    SLOW_REQUESTS.observe(
+        "/infer", t3 - t0, engine_input, cache_status,
+        (("limits", t1 - t0), ("inference", t2 - t1), ("vector", t3 - t2)),
+        mode=record["mode"],
+    )
+    setattr(request.state, REQUEST_STATE_KEY, {"engine_input": engine_input, "cache": cache_status, "mode": record["mode"]})
+    observe_population(engine_input, record)
     return JSONResponse(content=result)
 
 
@@ -212,150 +506,53 @@ def report_form(paid: Optional[str] = Query(None)):
 # Final Report Rendering
 # -----------------------------
 
+# render_report_html lives in engines/translation/report_page.py, shared with the bulk
+# pre-renderer (engine_runtime/bulk_reports.py).
+
 @app.post("/report", response_class=HTMLResponse)
-def render_report(responses: List[str] = Form(...)):
+def render_report(request: Request, responses: List[str] = Form(...)):
 
+    t0 = time.perf_counter()
+    responses, _ = limit_responses(responses)
     payload = InferenceRequest(responses=responses)
     engine_input = build_engine_input(payload)
-    result = run_inference(engine_input)
+    t1 = time.perf_counter()
+
+    store = get_snapshot_store()
+    if store is None:
+        result, cache_status, record = infer_with_record(engine_input)
+        mode, snapshot_id = record["mode"], None
+        t2 = time.perf_counter()
+    else:
+        # Snapshots keep the decision record, not the rendered text or the answers.
+        record = decide_inference(engine_input)
+        result, cache_status, mode = render_record(record), "snapshot", record["mode"]
+        t2 = time.perf_counter()
+        snapshot_id = store.append(record)
+    t3 = time.perf_counter()
+    html = render_report_html(result, snapshot_id)
+    t4 = time.perf_counter()
+
+    SLOW_REQUESTS.observe(
+        "/report", t4 - t0, engine_input, cache_status,
+        (("limits", t1 - t0), ("inference", t2 - t1), ("snapshot", t3 - t2), ("render", t4 - t3)),
+        mode=mode,
+    )
+    setattr(request.state, REQUEST_STATE_KEY, {"engine_input": engine_input, "cache": cache_status, "mode": mode})
+    observe_population(engine_input, record)
+    return HTMLResponse(html)
 
-    depth = result.get("input_depth_rating", {})
-    lite = result.get("lite_translation", {})
 
-    orientation = lite.get("orientation_snapshot", "")
-    core_themes = lite.get("core_themes", "")
-    sections = lite.get("sections", {})
-    underlying = sections.get("underlying_patterns", "")
-    dynamics = sections.get("internal_dynamics", "")
-    decision = sections.get("decision_control", "")
-    real_world = lite.get("real_world_signals", [])
-    prompts = lite.get("reflection_prompts", [])
-    next_step_note = lite.get("next_step_note", "")
-
-    return HTMLResponse(f"""
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>PersonaSight™ Snapshot</title>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-                background: radial-gradient(circle at center, #f5f2ea 0%, #ece6d8 100%);
-                color: #2c2a27;
-                padding: 60px 20px;
-            }}
-            .container {{
-                max-width: 820px;
-                margin: auto;
-                background: #fbf8f3;
-                padding: 64px;
-                border-radius: 18px;
-                box-shadow: 0 35px 80px rgba(0,0,0,0.12);
-            }}
-            h1 {{
-                font-size: 2.3em;
-                margin-bottom: 30px;
-            }}
-            h2 {{
-                margin-top: 40px;
-                font-size: 1.1em;
-                text-transform: uppercase;
-                letter-spacing: 0.08em;
-                color: #8a8175;
-            }}
-            p {{
-                line-height: 1.8;
-                margin-top: 14px;
-            }}
-            ul {{
-                margin-top: 16px;
-                line-height: 1.8;
-            }}
-            li {{
-                margin-bottom: 8px;
-            }}
-            .depth {{
-                background: #f0ebe3;
-                padding: 16px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-                font-size: 0.95em;
-            }}
-            .next {{
-                margin-top: 40px;
-                background: #f0ebe3;
-                padding: 16px;
-                border-radius: 10px;
-            }}
-
-            @media print {{
-                button {{
-                    display: none;
-                }}
-
-                body {{
-                    font-size: 12pt;
-                }}
-
-                a {{
-                    display: none;
-                }}
-
-                h2, p, ul, .depth, .next {{
-                    page-break-inside: avoid;
-                    break-inside: avoid;
-                }}
-
-                h2 {{
-                    page-break-after: avoid;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>PersonaSight™ Snapshot</h1>
-
-            <div style="margin-bottom:20px; padding:12px; background:#fff3cd; border-radius:8px; font-size:0.95em; color:#856404;">
-                This report is not saved. Please click “Save / Print Snapshot” before closing this page.
-            </div>
-
-            <button onclick="window.print()" style="margin-bottom:20px; padding:10px 16px; border-radius:8px; border:none; background:#2c2a27; color:white; cursor:pointer;">
-                Save / Print Snapshot
-            </button>
-
-            <div class="depth">
-                <strong>Input Depth:</strong> {depth.get("label","")}<br>
-                {depth.get("note","")}
-            </div>
-
-            <h2>Core Orientation</h2>
-            <p>{orientation}</p>
-
-            <p><em>{core_themes}</em></p>
-
-            <h2>Behavioral Foundation</h2>
-            <p>{underlying}</p>
-
-            <h2>Internal Pressure Pattern</h2>
-            <p>{dynamics}</p>
-
-            <h2>Decision Model</h2>
-            <p>{decision}</p>
-
-            <h2>Real-World Signals</h2>
-            <ul>
-                {''.join(f"<li>{s}</li>" for s in real_world)}
-            </ul>
-
-            <h2>Reflection Prompts</h2>
-            <ul>
-                {''.join(f"<li>{p}</li>" for p in prompts)}
-            </ul>
-
-            <div class="next">{next_step_note}</div>
+# -----------------------------
+# Saved Report Re-Rendering
+# -----------------------------
 
-        </div>
-    </body>
-    </html>
-    """)
\ No newline at end of file
+@app.get("/report/{snapshot_id}", response_class=HTMLResponse)
+def saved_report(snapshot_id: str):
+    store = get_snapshot_store()
+    record = store.get(snapshot_id) if store is not None else None
+    if record is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    if record["engine_version"] != ENGINE_VERSION:
+        raise HTTPException(status_code=410, detail="Snapshot was produced by a retired engine version")
+    return HTMLResponse(render_report_html(render_record(record), snapshot_id))
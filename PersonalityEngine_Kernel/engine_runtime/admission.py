@@ -0,0 +1,202 @@
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# ================================
+#  ADMISSION CONTROL
+#  Per-client token buckets + a global in-flight cap with priority:
+#  /report (paid) may use every slot, bulk /infer only a small share.
+#  Rejections are answered here and never reach the engine.
+#  Runs on the event loop only, so no locking is needed.
+#
+#  Deployment: the app is expected behind a proxy that appends the caller's
+#  address to X-Forwarded-For (the Procfile / Railway setup). Without that,
+#  every caller looks like the proxy and shares one bucket, so clients are
+#  keyed on the last forwarded hop by default. A server reachable directly,
+#  without such a proxy, must set PEK_TRUST_FORWARDED=0, or callers can pick
+#  their own bucket through the header.
+# ================================
+
+REPORT = "report"
+BULK = "bulk"
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+ADMISSION_ENABLED = os.environ.get("PEK_ADMISSION", "1").lower() not in ("0", "false", "no")
+
+# Global in-flight cap (all admitted routes), and the share bulk /infer may
+# hold. Inference is CPU-bound under one GIL, so every extra bulk request in
+# flight slows a concurrent /report; keep the bulk share small.
+CAPACITY = int(_env_float("PEK_ADMISSION_CAPACITY", 32))
+BULK_LIMIT = int(_env_float("PEK_ADMISSION_BULK_LIMIT", 4))
+
+# (tokens per second, burst) per client and route class.
+RATES = {
+    BULK: (_env_float("PEK_RATE_INFER_PER_SEC", 5), _env_float("PEK_RATE_INFER_BURST", 20)),
+    REPORT: (_env_float("PEK_RATE_REPORT_PER_SEC", 2), _env_float("PEK_RATE_REPORT_BURST", 10)),
+}
+
+# Proxies in front of the app (Railway) append the caller to X-Forwarded-For;
+# only that last hop is trusted, earlier entries are whatever the client sent.
+TRUST_FORWARDED = os.environ.get("PEK_TRUST_FORWARDED", "1").lower() not in ("0", "false", "no")
+
+# Comma-separated API keys issued to customers. A key in this set gets its own
+# bucket; any other X-API-Key is ignored and the caller is keyed by address,
+# so rotating made-up keys buys no extra tokens. Stored as SHA-256 digests.
+API_KEYS = frozenset(
+    hashlib.sha256(k.strip().encode()).hexdigest()
+    for k in os.environ.get("PEK_API_KEYS", "").split(",") if k.strip()
+)
+
+# Buckets kept at once; the least recently seen client is dropped beyond this.
+MAX_TRACKED_CLIENTS = int(_env_float("PEK_ADMISSION_MAX_CLIENTS", 10000))
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        # Returns 0 when admitted, else seconds until a token is available.
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    if path == "/infer":
+        return BULK
+    if path == "/report" or path.startswith("/report/"):
+        return REPORT
+    return None
+
+
+class AdmissionController:
+    def __init__(self, capacity: int = CAPACITY, bulk_limit: int = BULK_LIMIT,
+                 rates: Dict[str, Tuple[float, float]] = None, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.capacity = max(1, capacity)
+        self.max_clients = max(1, max_clients)
+        self.limits = {
+            REPORT: self.capacity,
+            BULK: max(1, min(bulk_limit, self.capacity)),
+        }
+        self.in_flight_by_class = {REPORT: 0, BULK: 0}
+        self.rates = rates or RATES
+        self.in_flight = 0
+        self.evicted = 0
+        self.buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.counters = {
+            cls: {"admitted": 0, "rate_limited": 0, "over_capacity": 0} for cls in (REPORT, BULK)
+        }
+
+    def admit(self, cls: str, client: str) -> Optional[Tuple[int, int, str]]:
+        # None = admitted; else (status, retry_after_seconds, reason).
+        now = time.monotonic()
+        key = (cls, client)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            rate, burst = self.rates[cls]
+            bucket = self.buckets[key] = TokenBucket(rate, burst, now)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+                self.evicted += 1
+        else:
+            self.buckets.move_to_end(key)
+
+        wait = bucket.take(now)
+        if wait > 0:
+            self.counters[cls]["rate_limited"] += 1
+            return 429, max(1, math.ceil(wait)), "rate_limited"
+        if self.in_flight >= self.capacity or self.in_flight_by_class[cls] >= self.limits[cls]:
+            # the token is spent anyway: a client hammering a full server backs off too
+            self.counters[cls]["over_capacity"] += 1
+            return 503, 1, "over_capacity"
+
+        self.in_flight += 1
+        self.in_flight_by_class[cls] += 1
+        self.counters[cls]["admitted"] += 1
+        return None
+
+    def release(self, cls: str) -> None:
+        self.in_flight -= 1
+        self.in_flight_by_class[cls] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "capacity": self.capacity,
+            "limits": self.limits,
+            "in_flight": self.in_flight,
+            "in_flight_by_class": self.in_flight_by_class,
+            "tracked_clients": len(self.buckets),
+            "max_clients": self.max_clients,
+            "evicted_clients": self.evicted,
+            "counters": self.counters,
+        }
+
+
+def client_key(scope: dict, api_keys: frozenset = API_KEYS) -> str:
+    headers = dict(scope.get("headers") or ())
+    api_key = headers.get(b"x-api-key")
+    if api_key and api_keys:
+        digest = hashlib.sha256(api_key).hexdigest()
+        if digest in api_keys:
+            return "key:" + digest[:16]
+    if TRUST_FORWARDED:
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            return "ip:" + forwarded.decode("latin-1").rsplit(",", 1)[-1].strip()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+# -------------------------------------
+# ASGI middleware
+# -------------------------------------
+class AdmissionMiddleware:
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        cls = classify(scope["method"], scope["path"])
+        if cls is None:
+            return await self.app(scope, receive, send)
+
+        rejected = self.controller.admit(cls, client_key(scope))
+        if rejected is not None:
+            status, retry_after, reason = rejected
+            body = json.dumps({"detail": reason, "retry_after": retry_after}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(cls)
@@ -0,0 +1,336 @@
+import bisect
+import hashlib
+import math
+import multiprocessing
+import os
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engines.inference.result_cache import cached_inference_record, input_digest
+
+# ================================
+#  AFFINITY DISPATCH
+#  Optional front dispatcher: inference runs in N local engine worker
+#  processes, and each input digest is pinned to one of them by consistent
+#  hashing, so repeats land where the result (and warm tables) already are.
+#  Bounded loads keep a hot key from piling onto one worker; a worker that
+#  dies leaves the ring until its replacement is up, which moves only its
+#  own keys. A worker that misses WORKER_TIMEOUT is killed rather than
+#  left holding a late reply, and is replaced the same way.
+#  Enabled with PEK_AFFINITY_WORKERS=<n>.
+# ================================
+
+AFFINITY_WORKERS = int(os.environ.get("PEK_AFFINITY_WORKERS", 0))
+# A worker may hold at most ceil(LOAD_FACTOR * average in-flight) requests.
+LOAD_FACTOR = float(os.environ.get("PEK_AFFINITY_LOAD_FACTOR", 1.25))
+WORKER_CACHE_SIZE = int(os.environ.get("PEK_AFFINITY_CACHE_SIZE", 4096))
+VIRTUAL_NODES = 160
+SUPERVISE_INTERVAL = 0.5
+WORKER_TIMEOUT = float(os.environ.get("PEK_AFFINITY_TIMEOUT_SECONDS", 30))
+
+AFFINITY = "affinity"
+RANDOM = "random"
+
+
+def _point(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+# -------------------------
+# Ring
+# -------------------------
+class ConsistentHashRing:
+    def __init__(self, virtual_nodes: int = VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: List[int] = []
+        self.members: set = set()
+
+    def _rebuild(self) -> None:
+        pairs = sorted(
+            (_point("%d#%d" % (w, v)), w) for w in self.members for v in range(self.virtual_nodes)
+        )
+        self._points = [p for p, _ in pairs]
+        self._owners = [w for _, w in pairs]
+
+    def add(self, worker: int) -> None:
+        if worker not in self.members:
+            self.members.add(worker)
+            self._rebuild()
+
+    def remove(self, worker: int) -> None:
+        if worker in self.members:
+            self.members.discard(worker)
+            self._rebuild()
+
+    def candidates(self, digest: str):
+        # Distinct workers in ring order starting at the key's point.
+        if not self._points:
+            return
+        start = bisect.bisect(self._points, int(digest[:16], 16))
+        seen = set()
+        n = len(self._points)
+        for i in range(n):
+            w = self._owners[(start + i) % n]
+            if w not in seen:
+                seen.add(w)
+                yield w
+                if len(seen) == len(self.members):
+                    return
+
+    def owner(self, digest: str) -> Optional[int]:
+        return next(self.candidates(digest), None)
+
+
+# -------------------------
+# Worker process
+# -------------------------
+def _worker_main(conn, cache_size: int) -> None:
+    # Per-worker LRU in front of the (optional) shared cache: the part that
+    # affinity routing makes effective. Entries and replies carry the
+    # decision record with the rendered result.
+    local: "OrderedDict[str, Tuple[dict, dict]]" = OrderedDict()
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        digest, engine_input = message
+        entry = local.get(digest)
+        if entry is not None:
+            local.move_to_end(digest)
+            result, record = entry
+            status = "worker_hit"
+        else:
+            result, status, record = cached_inference_record(engine_input)
+            local[digest] = (result, record)
+            if len(local) > cache_size:
+                local.popitem(last=False)
+        conn.send((result, status, record))
+
+
+class _Worker:
+    def __init__(self, slot: int, ctx, cache_size: int):
+        self.slot = slot
+        self.lock = threading.Lock()
+        parent, child = ctx.Pipe()
+        self.conn = parent
+        self.process = ctx.Process(target=_worker_main, args=(child, cache_size),
+                                   name="pek-affinity-%d" % slot, daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, digest: str, engine_input: dict, timeout: float) -> Tuple[dict, str, dict]:
+        with self.lock:
+            self.conn.send((digest, engine_input))
+            if not self.conn.poll(timeout):
+                # Its late reply would answer the next request on this pipe:
+                # kill it, and the supervisor starts a clean replacement.
+                self.process.kill()
+                self.process.join(timeout=2)
+                raise TimeoutError("affinity worker %d timed out" % self.slot)
+            return self.conn.recv()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+# -------------------------
+# Dispatcher
+# -------------------------
+class AffinityDispatcher:
+    def __init__(self, n_workers: int, load_factor: float = LOAD_FACTOR,
+                 cache_size: int = WORKER_CACHE_SIZE, routing: str = AFFINITY,
+                 worker_timeout: float = WORKER_TIMEOUT):
+        self.n_workers = max(1, n_workers)
+        self.worker_timeout = worker_timeout
+        self.load_factor = max(1.0, load_factor)
+        self.cache_size = cache_size
+        self.routing = routing
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self.ring = ConsistentHashRing()
+        self.workers: Dict[int, _Worker] = {}
+        self.in_flight = {slot: 0 for slot in range(self.n_workers)}
+        self.counters = {
+            slot: {"requests": 0, "primary": 0, "spilled": 0, "worker_hits": 0, "restarts": 0, "timeouts": 0}
+            for slot in range(self.n_workers)
+        }
+        self.fallbacks = 0
+        self.membership_changes = 0
+        self._stop = threading.Event()
+
+        for slot in range(self.n_workers):
+            self.workers[slot] = _Worker(slot, self._ctx, cache_size)
+            self.ring.add(slot)
+        self._supervisor = threading.Thread(target=self._supervise, name="pek-affinity-supervisor", daemon=True)
+        self._supervisor.start()
+
+    # --- membership ---
+    def _supervise(self) -> None:
+        while not self._stop.wait(SUPERVISE_INTERVAL):
+            for slot, worker in list(self.workers.items()):
+                if not worker.alive() and not self._stop.is_set():
+                    self._replace(slot)
+
+    def _evict(self, slot: int) -> None:
+        # Out of the ring: only this worker's keys move, to their next ring
+        # owner, until the replacement is back under the same slot.
+        # Caller holds self._lock.
+        if slot in self.ring.members:
+            self.ring.remove(slot)
+            self.membership_changes += 1
+
+    def _replace(self, slot: int) -> None:
+        with self._lock:
+            self._evict(slot)
+        old = self.workers[slot]
+        replacement = _Worker(slot, self._ctx, self.cache_size)
+        with old.lock:
+            old.conn.close()
+        with self._lock:
+            self.workers[slot] = replacement
+            self.ring.add(slot)
+            self.membership_changes += 1
+            self.counters[slot]["restarts"] += 1
+
+    # --- routing ---
+    def _choose(self, digest: str) -> Tuple[Optional[int], bool]:
+        # (slot, is_primary); caller holds self._lock.
+        members = self.ring.members
+        if not members:
+            return None, False
+        if self.routing == RANDOM:
+            return random.choice(sorted(members)), True
+        total = sum(self.in_flight[s] for s in members)
+        capacity = math.ceil(self.load_factor * (total + 1) / len(members))
+        primary = True
+        for slot in self.ring.candidates(digest):
+            if self.in_flight[slot] < capacity:
+                return slot, primary
+            primary = False
+        return self.ring.owner(digest), True
+
+    def infer(self, engine_input: dict) -> Tuple[dict, str, dict]:
+        # (result, status, decision record), like cached_inference_record.
+        digest = input_digest(engine_input)
+        with self._lock:
+            slot, primary = self._choose(digest)
+            if slot is not None:
+                self.in_flight[slot] += 1
+                worker = self.workers[slot]
+        if slot is None:
+            with self._lock:
+                self.fallbacks += 1
+            return cached_inference_record(engine_input)
+
+        try:
+            result, status, record = worker.call(digest, engine_input, self.worker_timeout)
+        except (EOFError, OSError, TimeoutError) as exc:
+            # worker died (or was killed for timing out) mid-request: stop
+            # routing to it, the supervisor replaces it
+            with self._lock:
+                self.in_flight[slot] -= 1
+                self.fallbacks += 1
+                self.counters[slot]["timeouts"] += isinstance(exc, TimeoutError)
+                if self.workers[slot] is worker:
+                    self._evict(slot)
+            return cached_inference_record(engine_input)
+
+        with self._lock:
+            self.in_flight[slot] -= 1
+            counter = self.counters[slot]
+            counter["requests"] += 1
+            counter["primary" if primary else "spilled"] += 1
+            counter["worker_hits"] += status == "worker_hit"
+        return result, status, record
+
+    def warm(self, engine_input: dict) -> None:
+        # One round trip to every live worker, bypassing routing: readiness
+        # has to cover all of them, not just the ones warm-up keys hash to.
+        digest = input_digest(engine_input)
+        with self._lock:
+            workers = [self.workers[slot] for slot in sorted(self.ring.members)]
+        for worker in workers:
+            worker.call(digest, engine_input, self.worker_timeout)
+
+    # --- metrics ---
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {slot: dict(c) for slot, c in self.counters.items()}
+            in_flight = dict(self.in_flight)
+            members = sorted(self.ring.members)
+            fallbacks, changes = self.fallbacks, self.membership_changes
+        requests = [c["requests"] for c in counters.values()]
+        total = sum(requests)
+        hits = sum(c["worker_hits"] for c in counters.values())
+        mean = total / len(requests) if requests else 0.0
+        return {
+            "enabled": True,
+            "routing": self.routing,
+            "workers": self.n_workers,
+            "live_members": members,
+            "load_factor": self.load_factor,
+            "requests": total,
+            "worker_hit_rate": round(hits / total, 4) if total else None,
+            "spill_rate": round(sum(c["spilled"] for c in counters.values()) / total, 4) if total else None,
+            "imbalance": round(max(requests) / mean, 4) if mean else None,
+            "fallbacks": fallbacks,
+            "membership_changes": changes,
+            "in_flight": in_flight,
+            "per_worker": counters,
+        }
+
+    def close(self) -> None:
+        self._stop.set()
+        self._supervisor.join(timeout=2)
+        for worker in self.workers.values():
+            worker.stop()
+
+
+_DISPATCHER: Optional[AffinityDispatcher] = None
+_DISPATCHER_LOCK = threading.Lock()
+
+
+def start_dispatcher() -> Optional[AffinityDispatcher]:
+    global _DISPATCHER
+    if AFFINITY_WORKERS <= 0:
+        return None
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is None:
+            _DISPATCHER = AffinityDispatcher(AFFINITY_WORKERS)
+    return _DISPATCHER
+
+
+def get_dispatcher() -> Optional[AffinityDispatcher]:
+    return _DISPATCHER
+
+
+def stop_dispatcher() -> None:
+    global _DISPATCHER
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is not None:
+            _DISPATCHER.close()
+            _DISPATCHER = None
+
+
+def dispatched_inference_record(engine_input: dict) -> Tuple[dict, str, dict]:
+    # Drop-in for cached_inference_record; in-process when dispatch is off.
+    dispatcher = _DISPATCHER
+    if dispatcher is None:
+        return cached_inference_record(engine_input)
+    return dispatcher.infer(engine_input)
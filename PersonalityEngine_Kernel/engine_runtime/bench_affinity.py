@@ -0,0 +1,151 @@
+import os
+import random
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PersonalityEngine_Kernel.engine_runtime.affinity_dispatch import (
+    AFFINITY, RANDOM, AffinityDispatcher, ConsistentHashRing,
+)
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK, run_inference
+from PersonalityEngine_Kernel.engines.inference.result_cache import input_digest
+
+# Single machine: N local workers, a Zipf-skewed stream of repeated inputs,
+# affinity routing vs random routing, then one worker killed mid-run and
+# one that hangs past its timeout.
+WORKERS = 4
+DISTINCT = 3000
+REQUESTS = 20000
+CLIENTS = 8
+CACHE_SIZE = 500    # per worker: room for its share of the hot keys, not for all of them
+HANG_TIMEOUT = 0.5
+
+FILLER = "the a and i when it my work day so because really often people time think feel".split()
+
+
+def build_inputs(n=DISTINCT, seed=5):
+    rng = random.Random(seed)
+    phrases = [p for conf in BANK.values() for p in conf["hits"]]
+    out = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(20, 120))
+        for _ in range(rng.randint(1, 4)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        out.append({"example_statement": " ".join(words), "context_flags": {}, "forced_overrides": {}})
+    return out
+
+
+def build_stream(inputs, n=REQUESTS, seed=7, skew=1.1):
+    rng = random.Random(seed)
+    weights = [1.0 / (i + 1) ** skew for i in range(len(inputs))]
+    return rng.choices(inputs, weights=weights, k=n)
+
+
+def drive(dispatcher, stream):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        list(pool.map(dispatcher.infer, stream))
+    return time.perf_counter() - started
+
+
+def run_mode(routing, stream):
+    dispatcher = AffinityDispatcher(WORKERS, cache_size=CACHE_SIZE, routing=routing)
+    try:
+        drive(dispatcher, stream[:200])   # worker start-up / imports
+        elapsed = drive(dispatcher, stream)
+        return dispatcher.stats(), elapsed
+    finally:
+        dispatcher.close()
+
+
+def key_movement(inputs):
+    # Fraction of keys that change owner when one worker leaves, and again
+    # when it comes back. Ideal is 1/WORKERS each way, and nothing else moves.
+    ring = ConsistentHashRing()
+    for w in range(WORKERS):
+        ring.add(w)
+    digests = [input_digest(e) for e in inputs]
+    before = [ring.owner(d) for d in digests]
+    ring.remove(WORKERS - 1)
+    during = [ring.owner(d) for d in digests]
+    ring.add(WORKERS - 1)
+    after = [ring.owner(d) for d in digests]
+    moved = sum(a != b for a, b in zip(before, during)) / len(digests)
+    collateral = sum(a != b for a, b in zip(before, during) if a != WORKERS - 1) / len(digests)
+    restored = all(a == b for a, b in zip(before, after))
+    return moved, collateral, restored
+
+
+def restart_run(stream):
+    dispatcher = AffinityDispatcher(WORKERS, cache_size=CACHE_SIZE)
+    try:
+        drive(dispatcher, stream)
+        victim = dispatcher.workers[0].process
+        victim.kill()
+        t0 = time.perf_counter()
+        drive(dispatcher, stream[: len(stream) // 4])
+        while dispatcher.stats()["per_worker"][0]["restarts"] == 0 and time.perf_counter() - t0 < 30:
+            time.sleep(0.05)
+        drive(dispatcher, stream[: len(stream) // 4])
+        return dispatcher.stats(), time.perf_counter() - t0
+    finally:
+        dispatcher.close()
+
+
+def timeout_run(inputs):
+    # Worker 0 is stopped (SIGSTOP), so its next call times out. The worker
+    # must be killed and replaced, and no late reply may answer a later
+    # request: every result is checked against in-process inference.
+    dispatcher = AffinityDispatcher(WORKERS, cache_size=CACHE_SIZE, worker_timeout=HANG_TIMEOUT)
+    try:
+        owned = [e for e in inputs if dispatcher.ring.owner(input_digest(e)) == 0][:50]
+        drive(dispatcher, owned[:5])   # worker start-up / imports
+        os.kill(dispatcher.workers[0].process.pid, signal.SIGSTOP)
+        t0 = time.perf_counter()
+        mismatches = sum(dispatcher.infer(e)[0] != run_inference(e) for e in owned)
+        while dispatcher.stats()["per_worker"][0]["restarts"] == 0 and time.perf_counter() - t0 < 30:
+            time.sleep(0.05)
+        mismatches += sum(dispatcher.infer(e)[0] != run_inference(e) for e in owned)
+        return dispatcher.stats(), mismatches, time.perf_counter() - t0
+    finally:
+        dispatcher.close()
+
+
+def main():
+    inputs = build_inputs()
+    stream = build_stream(inputs)
+    print("Workers: %d   distinct inputs: %d   requests: %d   clients: %d   per-worker cache: %d"
+          % (WORKERS, DISTINCT, REQUESTS, CLIENTS, CACHE_SIZE))
+    print("%-10s %10s %10s %10s %12s" % ("routing", "hit rate", "spill", "imbalance", "req/s"))
+    results = {}
+    for routing in (AFFINITY, RANDOM):
+        stats, elapsed = run_mode(routing, stream)
+        results[routing] = stats
+        print("%-10s %10.3f %10.3f %10.3f %12.0f" % (
+            routing, stats["worker_hit_rate"], stats["spill_rate"], stats["imbalance"], REQUESTS / elapsed))
+
+    moved, collateral, restored = key_movement(inputs)
+    print("\nOne worker leaves: %.3f of keys move (ideal %.3f), %.3f move between survivors; "
+          "restored on rejoin: %s" % (moved, 1.0 / WORKERS, collateral, restored))
+
+    stats, elapsed = restart_run(stream)
+    print("Killed worker 0: restarts=%d fallbacks=%d membership changes=%d hit rate after=%.3f (%.1fs)"
+          % (stats["per_worker"][0]["restarts"], stats["fallbacks"], stats["membership_changes"],
+             stats["worker_hit_rate"], elapsed))
+
+    hung, mismatches, elapsed = timeout_run(inputs)
+    print("Hung worker 0: timeouts=%d restarts=%d back in ring: %s mismatches=%d (%.1fs)"
+          % (hung["per_worker"][0]["timeouts"], hung["per_worker"][0]["restarts"],
+             0 in hung["live_members"], mismatches, elapsed))
+
+    ok = (results[AFFINITY]["worker_hit_rate"] > results[RANDOM]["worker_hit_rate"]
+          and collateral == 0 and restored and stats["per_worker"][0]["restarts"] >= 1
+          and hung["per_worker"][0]["timeouts"] >= 1 and hung["per_worker"][0]["restarts"] >= 1
+          and 0 in hung["live_members"] and mismatches == 0)
+    print("\nOK" if ok else "\nFAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
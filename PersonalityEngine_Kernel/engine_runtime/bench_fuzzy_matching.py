@@ -0,0 +1,147 @@
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+from PersonalityEngine_Kernel.engine_runtime.engine_loader import assemble_engine
+from PersonalityEngine_Kernel.engines.inference import inference_engine
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK, decide_inference, get_phrase_index
+
+# Fuzzy p99 must stay within this multiple of exact-match p99, with the
+# correction cache working as in service. The filler vocabulary keeps the
+# cache missing on new words, so the trigram / edit-distance path is in the
+# measured p99. A run with the cache cleared before every input is printed
+# as the worst case, outside the budget.
+P99_BUDGET = 2.0
+
+# Share of filler words that get a typo too; answers misspell any word, not
+# just the ones in the phrase bank.
+FILLER_TYPO_RATE = 0.03
+
+# Each configuration is measured this many times, each pass starting from a
+# fresh correction cache, and the pass with the median ratio is reported, so
+# one scheduler hiccup does not decide the budget check.
+REPEATS = 3
+
+# Answers (a different seed from the measured ones) run through the
+# correction cache before the in-service pass. Without them the measured p99
+# is just the first few answers into an empty cache; the cold row covers
+# that case.
+PRIMER_SIZE = 500
+
+# Filler is drawn from every word in the engine's configuration text (about
+# 1.9k distinct words), Zipf-weighted by how often each occurs, so the answers
+# keep producing tokens the correction cache has not seen.
+def build_vocabulary():
+    counts = Counter()
+
+    def walk(value):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                walk(k)
+                walk(v)
+        elif isinstance(value, list):
+            for v in value:
+                walk(v)
+        elif isinstance(value, str):
+            counts.update(re.findall(r"[a-z]+", value.lower()))
+
+    walk(assemble_engine())
+    words = [w for w, _ in counts.most_common()]
+    return words, [1.0 / (rank + 1) for rank in range(len(words))]
+
+# -------------------------
+# Synthetic answers with typos
+# -------------------------
+def misspell(word, rng):
+    if len(word) < 6:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    op = rng.randrange(3)
+    if op == 0:
+        return word[:i] + word[i + 1:]                          # drop a letter
+    if op == 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]  # swap neighbours
+    return word[:i] + word[i] + word[i:]                        # double a letter
+
+def build_corpus(n=2000, seed=11):
+    rng = random.Random(seed)
+    phrases = [p for conf in BANK.values() for p in conf["hits"]]
+    vocabulary, weights = build_vocabulary()
+    corpus = []
+    for _ in range(n):
+        words = [misspell(w, rng) if rng.random() < FILLER_TYPO_RATE else w
+                 for w in rng.choices(vocabulary, weights=weights, k=rng.randint(40, 160))]
+        for _ in range(rng.randint(1, 6)):
+            phrase = rng.choice(phrases).split()
+            if rng.random() < 0.6:
+                phrase = [misspell(w, rng) for w in phrase]
+            at = rng.randrange(len(words) + 1)
+            words[at:at] = phrase
+        corpus.append({"example_statement": " ".join(words)})
+    return corpus
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+def measure(corpus, cold=False, primer=()):
+    # Each input runs exact then fuzzy back to back, so load on the machine
+    # hits both sides of the ratio alike. primer: answers run through the
+    # correction cache first, like the traffic a serving process has already
+    # seen. cold: correction cache cleared before each fuzzy run, so every
+    # token takes the trigram / edit-distance path.
+    correct_token = get_phrase_index().correct_token
+    correct_token.cache_clear()
+    inference_engine.FUZZY_MATCHING = True
+    for e in primer:
+        decide_inference(e)
+    primed = correct_token.cache_info()
+    latencies = {False: [], True: []}
+    baseline = {False: 0, True: 0}
+    for e in corpus:
+        if cold:
+            correct_token.cache_clear()
+        for fuzzy in (False, True):
+            inference_engine.FUZZY_MATCHING = fuzzy
+            t0 = time.perf_counter()
+            record = decide_inference(e)
+            latencies[fuzzy].append(time.perf_counter() - t0)
+            baseline[fuzzy] += record["mode"] == "LOW_SIGNAL_BASELINE"
+    info = correct_token.cache_info()
+    hits = info.hits - primed.hits
+    lookups = hits + info.misses - primed.misses
+    exact, fuzzy = sorted(latencies[False]), sorted(latencies[True])
+    return {
+        "exact": exact,
+        "fuzzy": fuzzy,
+        "baseline": baseline,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "ratio": percentile(fuzzy, 0.99) / percentile(exact, 0.99),
+    }
+
+def run_benchmark():
+    corpus = build_corpus()
+    primer = build_corpus(PRIMER_SIZE, seed=12)
+    get_phrase_index()
+    measure(corpus[:200])  # warm up
+
+    def median_pass(cold=False):
+        passes = sorted((measure(corpus, cold, () if cold else primer) for _ in range(REPEATS)), key=lambda run: run["ratio"])
+        return passes[len(passes) // 2]
+
+    warm, cold = median_pass(), median_pass(cold=True)
+    rows = [
+        ("exact", warm["exact"], warm["baseline"][False], 0.0),
+        ("fuzzy", warm["fuzzy"], warm["baseline"][True], warm["hit_rate"]),
+        ("fuzzy, cold cache", cold["fuzzy"], cold["baseline"][True], cold["hit_rate"]),
+    ]
+    for name, lat, low, hit_rate in rows:
+        print("%-18s p50 %.1f us  p99 %.1f us  LOW_SIGNAL_BASELINE %d/%d  correction cache hits %.0f%%" % (
+            name, percentile(lat, 0.5) * 1e6, percentile(lat, 0.99) * 1e6, low, len(corpus), hit_rate * 100))
+
+    print("p99 ratio: %.2fx (budget %.1fx); cold cache worst case %.2fx" % (warm["ratio"], P99_BUDGET, cold["ratio"]))
+    return warm["ratio"] <= P99_BUDGET
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark() else 1)
@@ -0,0 +1,106 @@
+import random
+import sys
+import time
+
+from PersonalityEngine_Kernel.engine_runtime.engine_loader import assemble_engine
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK
+from PersonalityEngine_Kernel.engines.vector.indicator_stage import (
+    MIN_EVIDENCE, MIN_TERM, STOPWORDS, TOKEN, compile_indicator_index, stem,
+)
+from PersonalityEngine_Kernel.engines.vector.vector_engine import DIMENSIONS
+
+# Index build time, and per-request lookup through the inverted index vs a
+# scan of every indicator's term list. Both must score identically.
+N = 2000
+BUILDS = 20
+
+FILLER = "the a and i when it my work day so because really often people time think feel".split()
+
+
+def build_texts(index, n=N, seed=9):
+    rng = random.Random(seed)
+    phrases = [p for conf in BANK.values() for p in conf["hits"]]
+    cues = [t for t in index.postings if " " not in t]
+    texts = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(10, 200))
+        for _ in range(rng.randint(0, 6)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        for _ in range(rng.randint(0, 4)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(cues) + rng.choice(["", "ing", "s", "ed"]))
+        texts.append(" ".join(words))
+    return texts
+
+
+def per_rule_scan(index, entry_terms, text):
+    # What the index replaces: every indicator checks its own terms.
+    terms, prev = set(), None
+    for token in TOKEN.findall(text):
+        if token in STOPWORDS or len(token) < MIN_TERM:
+            continue
+        term = stem(token)
+        terms.add(term)
+        if prev is not None:
+            terms.add(prev + " " + term)
+        prev = term
+    scores = {}
+    for e, weights in enumerate(entry_terms):
+        found = [(t, w) for t, w in weights if t in terms]
+        if sum(2 if " " in t else 1 for t, _ in found) >= MIN_EVIDENCE:
+            scores[e] = round(sum(w for _, w in found) / index.entry_capacity[e], 9)
+    return scores
+
+
+def main():
+    engine = assemble_engine()
+    started = time.perf_counter()
+    for _ in range(BUILDS):
+        index = compile_indicator_index(engine, DIMENSIONS)
+    build_ms = (time.perf_counter() - started) * 1e3 / BUILDS
+
+    entry_terms = [[] for _ in index.ids]
+    for t, plist in index.postings.items():
+        for e, w in plist:
+            entry_terms[e].append((t, w))
+
+    texts = build_texts(index)
+    mismatches = 0
+    for text in texts:
+        _, matched = index.score(text)
+        if {e: round(s, 9) for e, s, _ in matched} != per_rule_scan(index, entry_terms, text):
+            mismatches += 1
+
+    stem.cache_clear()
+    t0 = time.perf_counter()
+    for text in texts:
+        index.score(text)
+    cold_us = (time.perf_counter() - t0) * 1e6 / len(texts)
+    t0 = time.perf_counter()
+    for text in texts:
+        index.score(text)
+    indexed_us = (time.perf_counter() - t0) * 1e6 / len(texts)
+    t0 = time.perf_counter()
+    for text in texts:
+        per_rule_scan(index, entry_terms, text)
+    scan_us = (time.perf_counter() - t0) * 1e6 / len(texts)
+    t0 = time.perf_counter()
+    for text in texts:
+        index.describe(text)
+    describe_us = (time.perf_counter() - t0) * 1e6 / len(texts)
+
+    hit_rate = sum(bool(index.lookup(t)) for t in texts) / len(texts)
+    stats = index.stats()
+    print("Index: %d indicators, %d terms, %d postings   build: %.2f ms"
+          % (stats["indicators"], stats["terms"], stats["postings"], build_ms))
+    print("Inputs: %d (%.0f%% match at least one indicator)" % (len(texts), hit_rate * 100))
+    print("%-28s %10s" % ("lookup", "us/input"))
+    print("%-28s %10.1f" % ("per-indicator scan", scan_us))
+    print("%-28s %10.1f" % ("inverted index (cold stems)", cold_us))
+    print("%-28s %10.1f" % ("inverted index", indexed_us))
+    print("%-28s %10.1f" % ("index + output block", describe_us))
+    print("Mismatches: %d" % mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import random
+import sys
+import time
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK
+from PersonalityEngine_Kernel.engines.translation.narrative_report import (
+    CONFLICT_TEMPLATES, PLACEHOLDER, NarrativeProfile, get_narrative,
+)
+from PersonalityEngine_Kernel.engines.vector.vector_engine import run_vector_batch
+
+# Compiled narrative rendering vs a per-request regex substitution over the
+# same templates and sources. Outputs must match exactly.
+N = 2000
+ROUNDS = 3
+
+FILLER = "the a and i when it my work day so because really often people time think feel".split()
+
+
+def build_rows(n=N, seed=3):
+    rng = random.Random(seed)
+    phrases = [p for conf in BANK.values() for p in conf["hits"]]
+    inputs = []
+    for i in range(n):
+        words = rng.choices(FILLER, k=rng.randint(5, 80))
+        for _ in range(rng.randint(0, 8)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        flags = {"stress_level": round(rng.random(), 2)} if i % 3 == 0 else {}
+        inputs.append({"example_statement": " ".join(words), "context_flags": flags})
+    return run_vector_batch(inputs)
+
+
+def naive_sections(narrative, templates, indent, kernel_vector):
+    # What compiling replaces: regex substitution over every template, with
+    # each placeholder resolved where it occurs.
+    profile = NarrativeProfile(kernel_vector)
+    conflict = bool(kernel_vector.get("conflict_patterns"))
+    out = {}
+    for section in narrative.order:
+        paragraphs = []
+        for name, _ in narrative.sections[section]:
+            if not conflict and name in CONFLICT_TEMPLATES:
+                continue
+            text = " ".join(templates[name]["structure"])
+            paragraphs.append(indent + PLACEHOLDER.sub(lambda m: narrative.sources[m.group(1)](profile), text))
+        if paragraphs:
+            out[section] = "\n\n".join(paragraphs)
+    return out
+
+
+def best_rate(fn, rows):
+    best = 0.0
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for row in rows:
+            fn(row)
+        best = max(best, len(rows) / (time.perf_counter() - started))
+    return best
+
+
+def main():
+    from PersonalityEngine_Kernel.engine_runtime.engine_loader import assemble_engine
+    engine = assemble_engine()
+    modules = engine["modules"]
+    templates = modules["motives"]["modules"]["interpretation"]["narrative_templates"]["templates"]
+    indent = " " * modules["output"]["report_structure"]["formatting_rules"].get("indent", 0)
+
+    started = time.perf_counter()
+    narrative = get_narrative()
+    compile_ms = (time.perf_counter() - started) * 1e3
+
+    rows = build_rows()
+    mismatches = sum(narrative.render_sections(r) != naive_sections(narrative, templates, indent, r) for r in rows)
+
+    compiled = best_rate(narrative.render_sections, rows)
+    naive = best_rate(lambda r: naive_sections(narrative, templates, indent, r), rows)
+    text = best_rate(narrative.render_text, rows)
+    conflicts = sum(bool(r["conflict_patterns"]) for r in rows)
+
+    print("Rows: %d (%d with conflicts)   templates: %d   slots: %d   compile: %.2f ms"
+          % (len(rows), conflicts, len(templates), len(narrative.slots), compile_ms))
+    print("%-26s %12s" % ("renderer", "reports/s"))
+    print("%-26s %12.0f" % ("regex substitution", naive))
+    print("%-26s %12.0f" % ("compiled sections", compiled))
+    print("%-26s %12.0f" % ("compiled full text", text))
+    print("Speedup: %.2fx   mismatches: %d" % (compiled / naive, mismatches))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK
+from PersonalityEngine_Kernel.engines.translation.narrative_report import render_narrative
+from PersonalityEngine_Kernel.engines.vector.pipeline_stages import (
+    compile_pipeline_runtime, run_pipeline, run_pipeline_batch,
+)
+from PersonalityEngine_Kernel.engines.vector.vector_engine import get_vector_kernel, run_vector_inference
+
+# ================================
+#  PIPELINE RUNTIME BENCHMARK
+#  Cold vs warm (memoized) runs of the pipeline.json stages, one input at a
+#  time and in batch. Every pipeline result is checked against
+#  run_vector_inference (kernel vector) and render_narrative (narrative),
+#  and the warm pass must be served from the memo at every stage.
+#
+#  python -m PersonalityEngine_Kernel.engine_runtime.bench_pipeline --inputs 600
+# ================================
+
+N = 600
+FILLER = "the a and i when it my work day so because really often people time think feel".split()
+STRESS_STATES = [None, None, None, "acute", "chronic", 0.4]
+
+
+def build_inputs(n=N, seed=11):
+    # forced_overrides are not a pipeline input, so none are set here.
+    rng = random.Random(seed)
+    phrases = [p for conf in BANK.values() for p in conf["hits"]]
+    inputs = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(10, 120))
+        for _ in range(rng.randint(0, 6)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        state = rng.choice(STRESS_STATES)
+        inputs.append({
+            "example_statement": " ".join(words),
+            "context_flags": {} if state is None else {"stress_state": state},
+            "forced_overrides": {},
+        })
+    return inputs
+
+
+def mismatches(inputs, reports) -> int:
+    bad = 0
+    for e, report in zip(inputs, reports):
+        kernel_vector = dict(report["kernel_vector"])
+        kernel_vector.pop("ranked_dimensions", None)   # pipeline-only extra
+        expected = run_vector_inference(e)
+        bad += (json.dumps(kernel_vector, sort_keys=True) != json.dumps(expected, sort_keys=True)
+                or report["narrative"] != render_narrative(expected))
+    return bad
+
+
+def memo_misses(reports) -> int:
+    return sum(t["memo"] != "hit" for r in reports for t in r["stage_timings"].values())
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - started) * 1e3
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold vs memoized runs of the pipeline runtime.")
+    parser.add_argument("--inputs", type=int, default=N)
+    args = parser.parse_args()
+
+    get_vector_kernel()   # compiled tables load once, before any timing
+    inputs = build_inputs(args.inputs)
+    runtime = compile_pipeline_runtime()
+    try:
+        print("%d inputs, %d stages in %d levels" % (len(inputs), len(runtime.graph.stages), len(runtime.graph.levels)))
+        print("  %-10s %10s %10s %8s %10s %12s" % ("mode", "cold ms", "warm ms", "speedup", "mismatch", "memo misses"))
+
+        failed = 0
+        for mode in ("single", "batch"):
+            runtime.clear()
+            if mode == "single":
+                cold, cold_ms = timed(lambda: [run_pipeline(e, runtime) for e in inputs])
+                warm, warm_ms = timed(lambda: [run_pipeline(e, runtime) for e in inputs])
+            else:
+                cold, cold_ms = timed(run_pipeline_batch, inputs, runtime)
+                warm, warm_ms = timed(run_pipeline_batch, inputs, runtime)
+            bad = mismatches(inputs, cold) + mismatches(inputs, warm)
+            misses = memo_misses(warm)
+            failed += bad + misses
+            print("  %-10s %10.1f %10.1f %7.1fx %10d %12d"
+                  % (mode, cold_ms, warm_ms, cold_ms / warm_ms if warm_ms else 0.0, bad, misses))
+
+        hits = sum(c["memo_hits"] for c in runtime.stats()["stages"].values())
+        runs = sum(c["runs"] for c in runtime.stats()["stages"].values())
+        print("Stage runs: %d, memo hits: %d" % (runs, hits))
+    finally:
+        runtime.close()
+    print("OK" if not failed else "FAIL")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import (
+    DEPTH_LABELS, ENGINE_VERSION, MODES, render_record,
+)
+from PersonalityEngine_Kernel.engines.inference.snapshot_store import SnapshotStore
+
+BATCH = 10000
+
+# -------------------------
+# Synthetic decision records
+# -------------------------
+def build_record(rng):
+    return {
+        "engine_version": ENGINE_VERSION,
+        "mode": rng.choice(MODES),
+        "second_mode": rng.choice(MODES + [None]),
+        "depth_label": rng.choice(DEPTH_LABELS),
+        "theme_extras": rng.randrange(16),
+        "variant": 0,
+    }
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+def run_benchmark(records=2_000_000, lookups=100_000):
+    rng = random.Random(7)
+    directory = tempfile.mkdtemp(prefix="pek_snapshots_")
+    try:
+        store = SnapshotStore(directory)
+
+        start = time.perf_counter()
+        ids = []
+        pool = [build_record(rng) for _ in range(BATCH)]
+        while len(ids) < records:
+            ids.extend(store.append_many(pool[:min(BATCH, records - len(ids))]))
+        elapsed = time.perf_counter() - start
+        print("Records appended:", len(ids))
+        print("Append throughput: %.0f records/sec" % (len(ids) / elapsed))
+        print("Log size: %.1f MB, index size: %.1f MB" % (
+            os.path.getsize(store.log_path) / 1e6, os.path.getsize(store.index_path) / 1e6))
+
+        # reopen: the offset index is mapped, not rebuilt
+        store.close()
+        start = time.perf_counter()
+        store = SnapshotStore(directory)
+        print("Reopen: %.2f ms" % ((time.perf_counter() - start) * 1e3))
+
+        sample = [rng.choice(ids) for _ in range(lookups)]
+        latencies = []
+        for sid in sample:
+            t0 = time.perf_counter()
+            store.get(sid)
+            latencies.append(time.perf_counter() - t0)
+        latencies.sort()
+        print("Lookups:", lookups)
+        print("Lookup latency p50: %.2f us, p99: %.2f us, max: %.2f us" % (
+            percentile(latencies, 0.50) * 1e6, percentile(latencies, 0.99) * 1e6, latencies[-1] * 1e6))
+
+        t0 = time.perf_counter()
+        for sid in sample[:10000]:
+            render_record(store.get(sid))
+        print("Lookup + render: %.2f us" % ((time.perf_counter() - t0) / 10000 * 1e6))
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark(*(int(a) for a in sys.argv[1:3]))
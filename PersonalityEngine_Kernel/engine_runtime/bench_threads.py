@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK, decide_inference, run_inference
+from PersonalityEngine_Kernel.engines.translation.narrative_report import get_narrative, render_narrative
+from PersonalityEngine_Kernel.engines.vector.vector_engine import get_vector_kernel, run_vector_inference
+
+# ================================
+#  THREAD SCALING BENCHMARK
+#  Requests/sec vs thread count for the work a sync route does on the
+#  worker-thread pool. With the GIL the threads take turns and throughput
+#  stays flat; on a free-threaded build (python3.14t, or -X gil=0) they run
+#  in parallel. Every threaded result is compared with a single-threaded
+#  run, so a data race shows up as a mismatch, not just a number.
+#
+#  python -m PersonalityEngine_Kernel.engine_runtime.bench_threads --json default.json
+#  python3.14t -m PersonalityEngine_Kernel.engine_runtime.bench_threads --json free.json
+#  python -m PersonalityEngine_Kernel.engine_runtime.bench_threads --compare default.json free.json
+# ================================
+
+N = 4000
+FILLER = "the a and i when it my work day so because really often people time think feel".split()
+
+
+def _infer_route(e: dict) -> dict:
+    # /infer without cache or dispatcher: inference, kernel vector, narrative
+    result = run_inference(e)
+    result["kernel_vector"] = run_vector_inference(e)
+    result["narrative"] = render_narrative(result["kernel_vector"])
+    return result
+
+
+WORKLOADS = {
+    "decide": decide_inference,
+    "inference": run_inference,
+    "vector": run_vector_inference,
+    "infer_route": _infer_route,
+}
+
+
+def build_inputs(n=N, seed=17):
+    rng = random.Random(seed)
+    phrases = [p for conf in BANK.values() for p in conf["hits"]]
+    inputs = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(10, 120))
+        for _ in range(rng.randint(0, 6)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        inputs.append({"example_statement": " ".join(words), "context_flags": {}, "forced_overrides": {}})
+    return inputs
+
+
+def interpreter() -> dict:
+    gil_check = getattr(sys, "_is_gil_enabled", None)
+    return {
+        "python": sys.version.split()[0],
+        "free_threaded_build": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+        "gil_enabled": gil_check() if gil_check else True,
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_threads(fn, inputs, threads: int):
+    # Each thread takes a contiguous slice; all start together on a barrier.
+    chunk = -(-len(inputs) // threads)
+    slices = [inputs[i:i + chunk] for i in range(0, len(inputs), chunk)]
+    barrier = threading.Barrier(len(slices) + 1)
+
+    def work(part):
+        barrier.wait()
+        return [fn(e) for e in part]
+
+    with ThreadPoolExecutor(max_workers=len(slices)) as pool:
+        futures = [pool.submit(work, part) for part in slices]
+        barrier.wait()
+        started = time.perf_counter()
+        results = [r for f in futures for r in f.result()]
+    return results, time.perf_counter() - started
+
+
+def measure(name, inputs, thread_counts):
+    fn = WORKLOADS[name]
+    reference = [json.dumps(r, sort_keys=True) for r in map(fn, inputs)]
+    rows = []
+    for threads in thread_counts:
+        results, elapsed = run_threads(fn, inputs, threads)
+        mismatches = sum(json.dumps(r, sort_keys=True) != ref for r, ref in zip(results, reference))
+        rows.append({"threads": threads, "rps": len(inputs) / elapsed, "mismatches": mismatches})
+    base = rows[0]["rps"]
+    for row in rows:
+        row["speedup"] = row["rps"] / base
+    return rows
+
+
+def print_rows(name, rows):
+    print("%s" % name)
+    print("  %7s %10s %8s %10s" % ("threads", "req/s", "speedup", "mismatch"))
+    for row in rows:
+        print("  %7d %10.0f %7.2fx %10d" % (row["threads"], row["rps"], row["speedup"], row["mismatches"]))
+
+
+def compare(paths):
+    runs = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            runs.append(json.load(f))
+    labels = ["%s%s" % (r["interpreter"]["python"], "" if r["interpreter"]["gil_enabled"] else " (no GIL)")
+              for r in runs]
+    for name in runs[0]["workloads"]:
+        print(name)
+        print("  %7s" % "threads" + "".join(" %22s" % label for label in labels))
+        by_threads = [{row["threads"]: row for row in r["workloads"].get(name, [])} for r in runs]
+        for threads in sorted(by_threads[0]):
+            cells = []
+            for rows in by_threads:
+                row = rows.get(threads)
+                cells.append(" %13.0f (%5.2fx)" % (row["rps"], row["speedup"]) if row else " %22s" % "-")
+            print("  %7d" % threads + "".join(cells))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Requests/sec vs worker threads.")
+    parser.add_argument("--threads", default="1,2,4,8", help="comma-separated thread counts")
+    parser.add_argument("--requests", type=int, default=N)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), action="append")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--compare", nargs="+", metavar="PATH", help="side-by-side table of saved runs")
+    args = parser.parse_args()
+    if args.compare:
+        return compare(args.compare)
+
+    thread_counts = sorted({int(t) for t in args.threads.split(",")} | {1})
+    info = interpreter()
+    print("Python %s  free-threaded build: %s  GIL enabled: %s  CPUs: %s"
+          % (info["python"], info["free_threaded_build"], info["gil_enabled"], info["cpus"]))
+
+    # compiled tables load once, before any timing
+    get_vector_kernel()
+    get_narrative()
+    inputs = build_inputs(args.requests)
+    results = {}
+    for name in args.workload or list(WORKLOADS):
+        results[name] = measure(name, inputs, thread_counts)
+        print_rows(name, results[name])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"interpreter": info, "requests": len(inputs), "workloads": results}, f, indent=2)
+    mismatches = sum(row["mismatches"] for rows in results.values() for row in rows)
+    print("Mismatches: %d" % mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import itertools
+import time
+
+from PersonalityEngine_Kernel.engines.translation.lite_translation import translate_lite, build_translation
+
+# -------------------------
+# Synthetic kernel outputs
+# -------------------------
+def build_corpus():
+    coherence = [{}, {"state": "coherent"}, {"state": "coherent", "description": "Stable drive."}, {"state": "mixed"}]
+    orientations = ["Unknown", "Control-Oriented", "Connection-Seeking", "Threat-Vigilant"]
+    motives = ["Unclear", "Safety", "Recognition", "Autonomy"]
+    confidences = [None, 0.2, 0.5, 0.8]
+    patterns = [{}, {"approach_avoidance": 1}]
+
+    corpus = []
+    for c, o, m, s, cp, sp in itertools.product(coherence, orientations, motives, confidences, patterns, patterns):
+        corpus.append({
+            "identity_coherence": c,
+            "global_orientation": o,
+            "dominant_motive": m,
+            "confidence_score": s,
+            "conflict_patterns": cp,
+            "stress_profile": sp,
+        })
+    return corpus
+
+def run_benchmark(rounds=50):
+    corpus = build_corpus()
+    build_translation.cache_clear()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for record in corpus:
+            translate_lite(record)
+    elapsed = time.perf_counter() - start
+
+    total = rounds * len(corpus)
+    print("Records translated:", total)
+    print("Throughput: %.0f records/sec" % (total / elapsed))
+    print("Mean latency: %.2f us" % (elapsed / total * 1e6))
+    print("Cache:", build_translation.cache_info())
+
+if __name__ == "__main__":
+    run_benchmark()
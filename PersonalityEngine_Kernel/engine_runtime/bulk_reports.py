@@ -0,0 +1,210 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engine_runtime.input_limits import InputLimitError, InputLimits
+from PersonalityEngine_Kernel.engines.inference.inference_engine import run_inference
+from PersonalityEngine_Kernel.engines.translation.report_page import render_report_html
+
+# ================================
+#  BULK REPORT PRE-RENDERING
+#  Renders finished /report pages for a JSONL file of answer sets
+#  ({"responses": [...], "id": optional}), one HTML file per line, across a
+#  process pool. Pages go through the same input limits, inference and
+#  page template as /report, so each file is byte-identical to the
+#  page /report serves for those answers (without a snapshot store).
+#  Memory stays bounded: input is read lazily, at most --window batches
+#  are in flight and errors go to errors.jsonl as they happen. A safe "id"
+#  names the file; a duplicate id, or one that looks like a generated
+#  report-NNNNNNN name, gets "@<line index>" appended instead of
+#  overwriting another page.
+#
+#  python -m PersonalityEngine_Kernel.engine_runtime.bulk_reports answers.jsonl \
+#      --out reports/ --gzip --verify 50
+# ================================
+
+BATCH = 64
+SAFE_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+GENERATED_ID = re.compile(r"^report-\d+$", re.IGNORECASE)
+
+_LIMITS: Optional[InputLimits] = None
+
+
+def read_answer_sets(path: str) -> Iterator[Tuple[int, Optional[str], List[str]]]:
+    with open(path, "r", encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, list):
+                item = {"responses": item}
+            ident = item.get("id")
+            yield index, None if ident is None else str(ident), [str(r) for r in item.get("responses") or []]
+            index += 1
+
+
+def _init_worker() -> None:
+    global _LIMITS
+    _LIMITS = InputLimits()
+
+
+def render_page(responses: List[str]) -> str:
+    # The /report route, minus the web layer.
+    limits = _LIMITS or InputLimits()
+    responses, _ = limits.apply(responses)
+    engine_input = {"example_statement": " ".join(responses), "context_flags": {}, "forced_overrides": {}}
+    return render_report_html(run_inference(engine_input))
+
+
+def render_batch(batch: List[Tuple[int, Optional[str], List[str]]], compress: bool) -> List[tuple]:
+    # (index, id, page bytes or None, error or None); compression runs here, in the worker.
+    out = []
+    for index, ident, responses in batch:
+        if not responses:
+            out.append((index, ident, None, "no responses"))
+            continue
+        try:
+            page = render_page(responses).encode("utf-8")
+        except InputLimitError as exc:
+            out.append((index, ident, None, exc.detail))
+            continue
+        if compress:
+            page = gzip.compress(page, mtime=0)
+        out.append((index, ident, page, None))
+    return out
+
+
+def _batches(items: Iterator, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class PageNamer:
+    # File names in input order. Remembers the ids it has handed out (case-
+    # folded, for case-insensitive filesystems); "@" is outside SAFE_ID, so a
+    # suffixed name can never equal another id or a generated name.
+    def __init__(self, compress: bool):
+        self.extension = ".html.gz" if compress else ".html"
+        self.used = set()
+
+    def __call__(self, index: int, ident: Optional[str]) -> str:
+        if ident is None or not SAFE_ID.match(ident):
+            return "report-%07d" % index + self.extension
+        folded = ident.lower()
+        if folded in self.used or GENERATED_ID.match(ident):
+            return "%s@%d" % (ident, index) + self.extension
+        self.used.add(folded)
+        return ident + self.extension
+
+
+def render_all(path: str, out_dir: str, workers: int, batch: int = BATCH, window: int = 0,
+               compress: bool = False) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    window = window or 2 * workers
+    pages = errors = written_bytes = 0
+    name = PageNamer(compress)
+    error_path = os.path.join(out_dir, "errors.jsonl")
+    if os.path.exists(error_path):
+        os.remove(error_path)   # from an earlier run; only this run's errors belong here
+    error_file = None
+
+    def write(results):
+        nonlocal pages, errors, written_bytes, error_file
+        for index, ident, page, error in results:
+            # every line claims its name, so names depend on the input alone
+            target = os.path.join(out_dir, name(index, ident))
+            if error is not None:
+                errors += 1
+                if error_file is None:
+                    error_file = open(error_path, "w", encoding="utf-8")
+                error_file.write(json.dumps({"index": index, "id": ident, "error": error}, ensure_ascii=False) + "\n")
+                continue
+            with open(target, "wb") as f:
+                f.write(page)
+            pages += 1
+            written_bytes += len(page)
+
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = deque()
+            for chunk in _batches(read_answer_sets(path), batch):
+                if len(pending) >= window:
+                    write(pending.popleft().result())
+                pending.append(pool.submit(render_batch, chunk, compress))
+            while pending:
+                write(pending.popleft().result())
+    finally:
+        if error_file is not None:
+            error_file.close()
+    elapsed = time.perf_counter() - started
+    return {"pages": pages, "errors": errors, "bytes": written_bytes, "seconds": elapsed,
+            "pages_per_sec": pages / elapsed if elapsed else 0.0}
+
+
+def verify(path: str, out_dir: str, n: int, compress: bool) -> int:
+    # Posts the first n answer sets to the app and compares bytes with the files.
+    # The page differs by design when /report saves a snapshot, so no store here.
+    os.environ.pop("PEK_SNAPSHOT_DIR", None)
+    os.environ["PEK_ADMISSION"] = "0"
+    from fastapi.testclient import TestClient
+    from PersonalityEngine_Kernel.app import app
+
+    checked = mismatches = 0
+    name = PageNamer(compress)
+    with TestClient(app) as client:
+        for index, ident, responses in read_answer_sets(path):
+            if checked >= n:
+                break
+            target = os.path.join(out_dir, name(index, ident))
+            if not os.path.exists(target):
+                continue
+            served = client.post("/report", data={"responses": responses}).content
+            with open(target, "rb") as f:
+                page = f.read()
+            if compress:
+                page = gzip.decompress(page)
+            checked += 1
+            mismatches += page != served
+    print("Verified %d pages against /report: %d mismatches" % (checked, mismatches), file=sys.stderr)
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-render /report pages for a JSONL file of answer sets.")
+    parser.add_argument("inputs", help="JSONL answer sets")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=BATCH, help="answer sets per task")
+    parser.add_argument("--window", type=int, default=0, help="batches in flight (default 2 x workers)")
+    parser.add_argument("--gzip", action="store_true", help="write .html.gz files")
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="compare the first N pages with what /report serves")
+    args = parser.parse_args()
+
+    stats = render_all(args.inputs, args.out, max(1, args.workers), max(1, args.batch),
+                       max(0, args.window), args.gzip)
+    print("Wrote %d pages (%d bytes, %d errors) in %.2fs: %.0f pages/sec with %d workers"
+          % (stats["pages"], stats["bytes"], stats["errors"], stats["seconds"],
+             stats["pages_per_sec"], args.workers), file=sys.stderr)
+    if args.verify:
+        return 1 if verify(args.inputs, args.out, args.verify, args.gzip) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from PersonalityEngine_Kernel.engines.inference.columnar_results import open_columnar, score_to_columnar
+from PersonalityEngine_Kernel.engines.inference.inference_engine import run_inference
+
+# ================================
+#  BULK SCORING
+#  Scores a JSONL file of inputs (engine inputs, or {"responses": [...]}) and
+#  writes either rendered JSON lines or a columnar result file. A columnar
+#  file decodes back to the same JSON lines with --decode.
+#
+#  python -m PersonalityEngine_Kernel.engine_runtime.bulk_score inputs.jsonl \
+#      --format columnar --out results.pekcol
+#  python -m PersonalityEngine_Kernel.engine_runtime.bulk_score --decode results.pekcol
+# ================================
+
+
+def read_inputs(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "responses" in item and "example_statement" not in item:
+                item = {
+                    "example_statement": " ".join(item["responses"]),
+                    "context_flags": item.get("context_flags") or {},
+                    "forced_overrides": item.get("forced_overrides") or {},
+                }
+            yield item
+
+
+def write_jsonl(out, rows) -> int:
+    n = 0
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False))
+        out.write("\n")
+        n += 1
+    return n
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Score a JSONL file of inputs in bulk.")
+    parser.add_argument("inputs", nargs="?", help="JSONL inputs")
+    parser.add_argument("--format", choices=["json", "columnar"], default="json")
+    parser.add_argument("--out", help="output path (default: stdout for json)")
+    parser.add_argument("--decode", metavar="FILE", help="columnar file to expand back to JSON lines")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.decode:
+        with open_columnar(args.decode) as results:
+            out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+            try:
+                n = write_jsonl(out, results.iter_json())
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+        print("Decoded %d rows in %.2fs" % (n, time.perf_counter() - started), file=sys.stderr)
+        return 0
+
+    if not args.inputs:
+        parser.error("inputs is required unless --decode is given")
+    if args.format == "columnar":
+        if not args.out:
+            parser.error("--format columnar needs --out")
+        header = score_to_columnar(args.out, read_inputs(args.inputs))
+        print("Wrote %d rows (%d bytes) in %.2fs" % (header["count"], os.path.getsize(args.out),
+                                                     time.perf_counter() - started), file=sys.stderr)
+        return 0
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        n = write_jsonl(out, (run_inference(e) for e in read_inputs(args.inputs)))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print("Wrote %d rows in %.2fs" % (n, time.perf_counter() - started), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+
+from PersonalityEngine_Kernel.engines.inference.snapshot_store import SnapshotStore
+
+# ================================
+#  SNAPSHOT COMPACTION
+#  Drops snapshots older than the retention period from the store in
+#  PEK_SNAPSHOT_DIR (or --dir) and rewrites the log without them. Ids of the
+#  kept snapshots stay valid. Safe to run while the app is serving: it takes
+#  the store's writer lock, and running workers reopen the new files on
+#  their next read or append. Meant for a daily cron job; --min-log-mb skips
+#  the rewrite until the log is big enough to be worth it.
+#
+#  python -m PersonalityEngine_Kernel.engine_runtime.compact_snapshots --retention-days 90
+#  python -m PersonalityEngine_Kernel.engine_runtime.compact_snapshots --dir /data/snapshots \
+#      --retention-days 30 --min-log-mb 256
+# ================================
+
+RETENTION_DAYS = os.environ.get("PEK_SNAPSHOT_RETENTION_DAYS")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drop expired snapshots and rewrite the snapshot log.")
+    parser.add_argument("--dir", default=os.environ.get("PEK_SNAPSHOT_DIR"),
+                        help="snapshot directory (default: PEK_SNAPSHOT_DIR)")
+    parser.add_argument("--retention-days", type=float,
+                        default=float(RETENTION_DAYS) if RETENTION_DAYS else None,
+                        help="keep snapshots this many days (default: PEK_SNAPSHOT_RETENTION_DAYS)")
+    parser.add_argument("--min-log-mb", type=float, default=0.0,
+                        help="only compact when the log is at least this large")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir is required unless PEK_SNAPSHOT_DIR is set")
+    if args.retention_days is None or args.retention_days < 0:
+        parser.error("--retention-days (or PEK_SNAPSHOT_RETENTION_DAYS) must be a non-negative number")
+
+    store = SnapshotStore(args.dir)
+    try:
+        before = os.path.getsize(store.log_path)
+        if before < args.min_log_mb * (1 << 20):
+            print("Log is %d bytes, under --min-log-mb; nothing to do" % before, file=sys.stderr)
+            return 0
+        started = time.perf_counter()
+        result = store.compact(args.retention_days * 86400)
+        after = os.path.getsize(store.log_path)
+    finally:
+        store.close()
+    print("Kept %d snapshots, removed %d; log %d -> %d bytes in %.2fs"
+          % (result["kept"], result["removed"], before, after, time.perf_counter() - started), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from PersonalityEngine_Kernel.engines.inference import golden_v3_intensity as golden
+from PersonalityEngine_Kernel.engines.inference.result_cache import input_digest
+
+# ================================
+#  DIFFERENTIAL HARNESS
+#  Runs the frozen golden engine and one or more candidate implementations
+#  over the stored corpus plus seeded randomized inputs, reports every
+#  output difference side by side with per-implementation throughput, and
+#  exits 1 on any difference not listed in the approvals file.
+#
+#  python -m PersonalityEngine_Kernel.engine_runtime.diff_harness \
+#      [--candidate module[:function]] [--random 5000] [--seed 0]
+# ================================
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, "diff_corpus.jsonl")
+APPROVED_PATH = os.path.join(HERE, "diff_approved.json")
+
+DEFAULT_CANDIDATES = ["PersonalityEngine_Kernel.engines.inference.inference_engine"]
+
+RANDOM_INPUTS = 5000
+SHOW_DIFFS = 20
+
+FILLER = "the a and i when it my work day so because really often people time think feel".split()
+QUOTE_SWAPS = [("'", "’"), ("’", "'"), ('"', "“"), ("'", "‘")]
+
+# estimate_input_depth_label thresholds: (words, sentences) either side of each edge
+DEPTH_EDGES = [(79, 4), (80, 4), (80, 3), (169, 7), (170, 7), (170, 6), (400, 12)]
+
+
+class Implementation:
+    def __init__(self, name: str, run: Callable[[dict], dict],
+                 decide: Optional[Callable[[dict], dict]] = None,
+                 slots: Optional[Dict[str, list]] = None,
+                 decode: Optional[Callable[[str, int], List[int]]] = None):
+        self.name = name
+        self.run = run
+        self.decide = decide
+        self.slots = slots
+        self.decode = decode
+
+    def fields(self, engine_input: dict, output: dict) -> dict:
+        # mode / picker choices / depth; from the decision record when the
+        # implementation exposes one, else only what the output shows.
+        if self.decide is None:
+            return {"depth_label": (output.get("input_depth_rating") or {}).get("label")}
+        record = self.decide(engine_input)
+        mode = record["mode"]
+        picks = {}
+        if self.slots is not None and self.decode is not None:
+            picks = {salt: idx for (_, salt), idx in zip(self.slots[mode], self.decode(mode, record["variant"]))}
+        return {
+            "mode": mode,
+            "second_mode": record.get("second_mode"),
+            "depth_label": record["depth_label"],
+            "picks": picks,
+        }
+
+
+def load_implementation(spec: str) -> Implementation:
+    module_name, _, attr = spec.partition(":")
+    module = importlib.import_module(module_name)
+    if attr:
+        return Implementation("%s:%s" % (module_name.rsplit(".", 1)[-1], attr), getattr(module, attr))
+    return Implementation(
+        module_name.rsplit(".", 1)[-1],
+        module.run_inference,
+        getattr(module, "decide_inference", None),
+        getattr(module, "MODE_SLOTS", None),
+        getattr(module, "decode_variant", None),
+    )
+
+
+GOLDEN = Implementation("golden_v3_intensity", golden.run_inference, golden.decide_inference,
+                        golden.MODE_SLOTS, golden.decode_variant)
+
+# -------------------------
+# Inputs
+# -------------------------
+def load_corpus(path: str = CORPUS_PATH) -> List[tuple]:
+    out = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                out.append(("corpus:" + entry["id"], {"example_statement": " ".join(entry["responses"])}))
+    return out
+
+
+def _sentences(rng: random.Random, words: int, sentences: int, phrases: List[str]) -> str:
+    # exactly `words` space-separated words and `sentences` terminators
+    tokens = []
+    while len(tokens) < words:
+        tokens.extend((rng.choice(phrases) if rng.random() < 0.3 else rng.choice(FILLER)).split())
+    tokens = tokens[:words]
+    for i in rng.sample(range(words), min(sentences, words)):
+        tokens[i] += rng.choice(".!?")
+    return " ".join(tokens)
+
+
+def random_inputs(n: int, seed: int) -> List[tuple]:
+    rng = random.Random(seed)
+    phrases = [p for conf in golden.BANK.values() for p in conf["hits"] + conf["neg"]]
+    out = [
+        ("edge:missing", {}),
+        ("edge:none", {"example_statement": None}),
+        ("edge:empty", {"example_statement": ""}),
+        ("edge:whitespace", {"example_statement": " \n\t "}),
+    ]
+    for words, sentences in DEPTH_EDGES:
+        out.append(("edge:depth-%dw-%ds" % (words, sentences),
+                    {"example_statement": _sentences(rng, words, sentences, phrases)}))
+
+    for i in range(n):
+        parts = []
+        for _ in range(rng.choice([1, 2, 3, 6, 12, 40, 120])):
+            r = rng.random()
+            if r < 0.35:
+                parts.append(rng.choice(phrases))
+            elif r < 0.45:
+                parts.append(rng.choice(golden.NEGATORS))
+            else:
+                parts.append(rng.choice(FILLER))
+            if rng.random() < 0.08:
+                parts[-1] += rng.choice(".!?")
+        text = " ".join(parts)
+        if rng.random() < 0.25:
+            old, new = rng.choice(QUOTE_SWAPS)
+            text = text.replace(old, new)
+        if rng.random() < 0.15:
+            text = text.upper()
+        if rng.random() < 0.1:
+            text = "\n".join(text.split(". "))
+        if rng.random() < 0.05:
+            text = "  " + text + "  "
+        out.append(("random:%d" % i, {"example_statement": text}))
+    return out
+
+# -------------------------
+# Approvals
+# -------------------------
+def load_approvals(path: str = APPROVED_PATH) -> List[dict]:
+    # [{"candidate": name, "input_digest": sha256 or "*", "fields": [...], "reason": ...}]
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("approved", [])
+
+
+def is_approved(candidate: str, digest: str, fields: List[str], approvals: List[dict]) -> bool:
+    for a in approvals:
+        if a.get("candidate") != candidate or a.get("input_digest", "*") not in ("*", digest):
+            continue
+        allowed = a.get("fields")
+        if allowed is None or set(fields) <= set(allowed):
+            return True
+    return False
+
+# -------------------------
+# Comparison
+# -------------------------
+def _output_paths(a, b, prefix="") -> List[str]:
+    if isinstance(a, dict) and isinstance(b, dict):
+        paths = []
+        for k in sorted(set(a) | set(b)):
+            paths.extend(_output_paths(a.get(k), b.get(k), prefix + "." + k if prefix else k))
+        return paths
+    return [] if a == b else [prefix or "output"]
+
+
+def time_implementation(impl: Implementation, inputs: List[tuple]) -> tuple:
+    outputs = []
+    started = time.perf_counter()
+    for _, e in inputs:
+        outputs.append(impl.run(e))
+    elapsed = time.perf_counter() - started
+    return outputs, len(inputs) / elapsed if elapsed > 0 else float("inf")
+
+
+def compare(reference: Implementation, candidate: Implementation, inputs: List[tuple],
+            ref_outputs: List[dict], cand_outputs: List[dict], approvals: List[dict]) -> List[dict]:
+    diffs = []
+    for (label, e), a, b in zip(inputs, ref_outputs, cand_outputs):
+        fa, fb = reference.fields(e, a), candidate.fields(e, b)
+        changed = [k for k in fa if k in fb and fa[k] != fb[k]]
+        changed += ["output:" + p for p in _output_paths(a, b)]
+        if not changed:
+            continue
+        digest = input_digest(e)
+        diffs.append({
+            "input": label,
+            "input_digest": digest,
+            "changed": changed,
+            "reference": {k: fa[k] for k in fa if k in fb and fa[k] != fb[k]},
+            "candidate": {k: fb[k] for k in fb if k in fa and fa[k] != fb[k]},
+            "approved": is_approved(candidate.name, digest, changed, approvals),
+        })
+    return diffs
+
+
+def _pick_changes(ref: dict, cand: dict) -> str:
+    return ", ".join("%s %s→%s" % (s, ref.get(s), cand.get(s))
+                     for s in sorted(set(ref) | set(cand)) if ref.get(s) != cand.get(s))
+
+
+def print_diff(d: dict) -> None:
+    print("  %s  [%s]%s" % (d["input"], d["input_digest"][:12], "  (approved)" if d["approved"] else ""))
+    ref, cand = d["reference"], d["candidate"]
+    for key in ("mode", "second_mode", "depth_label"):
+        if key in ref:
+            print("      %-12s %-26s | %s" % (key, ref[key], cand[key]))
+    if "picks" in ref:
+        print("      %-12s %s" % ("picks", _pick_changes(ref["picks"], cand["picks"])))
+    other = [c[len("output:"):] for c in d["changed"] if c.startswith("output:")]
+    if other:
+        print("      %-12s %s" % ("output", ", ".join(other)))
+
+
+def run_harness(candidates: List[str], n_random: int = RANDOM_INPUTS, seed: int = 0,
+                corpus_path: str = CORPUS_PATH, approved_path: str = APPROVED_PATH,
+                show: int = SHOW_DIFFS) -> int:
+    inputs = load_corpus(corpus_path) + random_inputs(n_random, seed)
+    approvals = load_approvals(approved_path)
+    impls = [load_implementation(c) for c in candidates]
+
+    ref_outputs, ref_rate = time_implementation(GOLDEN, inputs)
+    print("Inputs: %d (corpus %s, %d random, seed %d)" % (len(inputs), os.path.basename(corpus_path), n_random, seed))
+    print("%-28s %12s %10s %10s" % ("implementation", "inputs/s", "diffs", "unapproved"))
+    print("%-28s %12.0f %10s %10s" % (GOLDEN.name + " (reference)", ref_rate, "-", "-"))
+
+    failed = 0
+    reports = []
+    for impl in impls:
+        outputs, rate = time_implementation(impl, inputs)
+        diffs = compare(GOLDEN, impl, inputs, ref_outputs, outputs, approvals)
+        unapproved = [d for d in diffs if not d["approved"]]
+        failed += len(unapproved)
+        print("%-28s %12.0f %10d %10d" % (impl.name, rate, len(diffs), len(unapproved)))
+        reports.append((impl, diffs))
+
+    for impl, diffs in reports:
+        if not diffs:
+            continue
+        print("\nDifferences: %s vs %s (reference | candidate)" % (GOLDEN.name, impl.name))
+        ordered = sorted(diffs, key=lambda d: d["approved"])
+        for d in ordered[:show]:
+            print_diff(d)
+        if len(diffs) > show:
+            print("  ... %d more" % (len(diffs) - show))
+
+    print("\nFAIL: %d unapproved difference(s)" % failed if failed else "\nOK: no unapproved differences")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare engine implementations against the golden engine.")
+    parser.add_argument("--candidate", action="append", help="module (with run_inference) or module:function")
+    parser.add_argument("--random", type=int, default=RANDOM_INPUTS, help="randomized inputs to add")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--approved", default=APPROVED_PATH)
+    parser.add_argument("--show", type=int, default=SHOW_DIFFS, help="diffs to print per candidate")
+    args = parser.parse_args()
+    sys.exit(run_harness(args.candidate or DEFAULT_CANDIDATES, args.random, args.seed,
+                         args.corpus, args.approved, args.show))
@@ -1,5 +1,7 @@
 import os
 import json
+import logging
+import time
 
 # ================================
 #  ENGINE LOADER v1.0
@@ -9,6 +11,8 @@ import json
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 KERNEL_ROOT = os.path.join(BASE_PATH, "..")
 
+logger = logging.getLogger(__name__)
+
 # -------------------------
 # Helper: Safe JSON Loader
 # -------------------------
@@ -39,12 +43,12 @@ def load_kernel():
 # ---------------------------------------------
 # Step 2: Recursively Load All Module JSON Files
 # ---------------------------------------------
-def load_modules():
-    modules_path = os.path.join(KERNEL_ROOT, "modules")
+def load_modules(folder="modules"):
+    modules_path = os.path.join(KERNEL_ROOT, folder)
     module_tree = {}
 
     for root, dirs, files in os.walk(modules_path):
-        for file in files:
+        for file in sorted(files):
             if file.endswith(".json"):
                 full_path = os.path.join(root, file)
                 relative_path = os.path.relpath(full_path, modules_path)
@@ -64,18 +68,23 @@ def load_modules():
 # Step 3: Attach Modules to Kernel Root
 # -------------------------------------
 def assemble_engine():
-    print("Loading kernel...")
+    started = time.perf_counter()
     kernel = load_kernel()
-
-    print("Loading modules...")
     modules = load_modules()
+    engines = load_modules("engines")
 
     engine = {
         "kernel": kernel,
-        "modules": modules
+        "modules": modules,
+        "engines": engines
     }
 
-    print("Engine structure assembled successfully.")
+    logger.debug(
+        "engine structure assembled",
+        extra={"kernel_components": len(kernel), "module_categories": len(modules),
+               "engine_categories": len(engines),
+               "elapsed_ms": round((time.perf_counter() - started) * 1e3, 2)},
+    )
     return engine
 
 # -------------------------------------
@@ -83,13 +92,11 @@ def assemble_engine():
 # -------------------------------------
 def initialize_engine():
     engine = assemble_engine()
-    print("\nPERSONALITY ENGINE INITIALIZED.")
-    print("--------------------------------")
-
-    # Show high-level structure count
-    print("Kernel components loaded:", len(engine["kernel"]))
-    print("Module categories loaded:", len(engine["modules"]))
-
+    logger.info(
+        "personality engine initialized",
+        extra={"kernel_components": len(engine["kernel"]),
+               "module_categories": len(engine["modules"])},
+    )
     return engine
 
 
@@ -97,5 +104,8 @@ def initialize_engine():
 # Standalone Run
 # -------------------------
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     engine = initialize_engine()
+    print("Kernel components loaded:", len(engine["kernel"]))
+    print("Module categories loaded:", len(engine["modules"]))
     print("\nReady for test input or live processing.")
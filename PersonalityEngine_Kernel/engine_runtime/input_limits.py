@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engine_runtime.engine_loader import KERNEL_ROOT, load_json
+
+# ================================
+#  INPUT LIMITS (live_input_mode.json)
+#  Body size is enforced while the request streams in, before anything
+#  parses it; item count and item length are enforced before inference.
+#  Together they bound the text any one request can hand to the engine.
+# ================================
+
+LIVE_INPUT_MODE_PATH = os.path.join(KERNEL_ROOT, "modules", "modules", "interpretation", "live_input_mode.json")
+
+TRUNCATE = "truncate"
+REJECT = "reject"
+
+# Worst-case wire bytes per answer character: 4 UTF-8 bytes, each of which
+# form-encoding may spell as %XX.
+WIRE_BYTES_PER_CHAR = 12
+BODY_OVERHEAD_BYTES = 16384
+
+LIMITED_METHODS = ("POST", "PUT", "PATCH")
+
+
+class InputLimitError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class InputLimits:
+    def __init__(self, spec: Optional[dict] = None, policy: Optional[str] = None,
+                 max_body_bytes: Optional[int] = None):
+        if spec is None:
+            spec = load_json(LIVE_INPUT_MODE_PATH)
+        rules = spec.get("input_rules", {})
+        safety = spec.get("safety_rules", {})
+
+        self.minimum_items = int(rules.get("minimum_required_items", 0))
+        self.max_item_length = int(rules.get("maximum_length_per_item", 0)) or None
+        self.max_items = int(safety.get("max_input_items", 0)) or None
+        self.missing_data_action = rules.get("missing_data_behavior", {}).get("action", "proceed_with_warnings")
+
+        policy = policy or os.environ.get("PEK_INPUT_POLICY", TRUNCATE)
+        self.policy = REJECT if policy == REJECT else TRUNCATE
+
+        if max_body_bytes is None:
+            max_body_bytes = int(os.environ.get("PEK_MAX_BODY_BYTES", 0)) or None
+        if max_body_bytes is None and self.max_items and self.max_item_length:
+            max_body_bytes = self.max_items * self.max_item_length * WIRE_BYTES_PER_CHAR + BODY_OVERHEAD_BYTES
+        # reject_extreme_length: bodies past the cap are always refused, whatever the policy
+        self.max_body_bytes = max_body_bytes if safety.get("reject_extreme_length", True) else None
+
+        self._lock = threading.Lock()
+        self.counters = {
+            "bodies_rejected": 0,
+            "rejected_bytes": 0,
+            "requests_rejected": 0,
+            "items_truncated": 0,
+            "chars_truncated": 0,
+            "items_dropped": 0,
+            "below_minimum": 0,
+        }
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    # -------------------------
+    # Item limits (before inference)
+    # -------------------------
+    def apply(self, responses: List[str]) -> Tuple[List[str], List[str]]:
+        # Returns (responses to analyze, warnings); raises InputLimitError on reject.
+        warnings = []
+        if self.max_items and len(responses) > self.max_items:
+            if self.policy == REJECT:
+                self.count("requests_rejected")
+                raise InputLimitError(422, "Too many responses (max %d)" % self.max_items)
+            self.count("items_dropped", len(responses) - self.max_items)
+            warnings.append("Only the first %d responses were analyzed." % self.max_items)
+            responses = responses[:self.max_items]
+
+        limit = self.max_item_length
+        if limit and any(len(r) > limit for r in responses):
+            if self.policy == REJECT:
+                self.count("requests_rejected")
+                raise InputLimitError(422, "Response too long (max %d characters each)" % limit)
+            over = [r for r in responses if len(r) > limit]
+            self.count("items_truncated", len(over))
+            self.count("chars_truncated", sum(len(r) - limit for r in over))
+            warnings.append("Responses longer than %d characters were shortened." % limit)
+            responses = [r[:limit] for r in responses]
+
+        if len(responses) < self.minimum_items:
+            self.count("below_minimum")
+            warnings.append(
+                "Fewer than %d responses; the result is based on limited input." % self.minimum_items
+            )
+        return responses, warnings
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "policy": self.policy,
+            "minimum_items": self.minimum_items,
+            "max_items": self.max_items,
+            "max_item_length": self.max_item_length,
+            "max_body_bytes": self.max_body_bytes,
+            "counters": counters,
+        }
+
+
+# -------------------------------------
+# ASGI middleware: streaming body cap
+# -------------------------------------
+class BodyLimitMiddleware:
+    def __init__(self, app, limits: InputLimits):
+        self.app = app
+        self.limits = limits
+
+    async def _reject(self, send, received: int) -> None:
+        self.limits.count("bodies_rejected")
+        self.limits.count("rejected_bytes", received)
+        body = json.dumps({"detail": "Request body too large", "max_bytes": self.limits.max_body_bytes}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        cap = self.limits.max_body_bytes
+        if scope["type"] != "http" or cap is None or scope["method"] not in LIMITED_METHODS:
+            return await self.app(scope, receive, send)
+
+        # Declared too large: refuse without reading a byte of it.
+        for name, value in scope.get("headers") or ():
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > cap:
+                    return await self._reject(send, declared)
+                break
+
+        # Otherwise read the body here, counting as it arrives, and stop at the cap.
+        chunks = []
+        received = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > cap:
+                return await self._reject(send, received)
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
@@ -0,0 +1,142 @@
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+# ================================
+#  ADMISSION LOAD TEST
+#  Floods bulk /infer with heavy pastes from many clients while paying
+#  customers submit /report, once with admission control and once without.
+#  Flood clients are told apart by forwarded address, paying customers by
+#  API keys the server is configured with (unknown keys are not buckets).
+# ================================
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+FLOOD_CLIENTS = 48
+PAID_CUSTOMERS = 20
+PAID_KEYS = ["paid-%d" % n for n in range(PAID_CUSTOMERS)]
+DURATION = 8.0
+REPORT_INTERVAL = 0.1
+
+HEAVY_PASTE = ("I overthink everything and replay it, I need reassurance and I keep the peace. " * 400)
+REPORT_ANSWERS = [
+    "When things depend on me I carry it all and rarely vent.",
+    "I trust myself but I replay decisions mentally.",
+    "I plan and weigh it before acting.",
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_server(port, admission):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["PEK_ADMISSION"] = "1" if admission else "0"
+    env["PEK_TRUST_FORWARDED"] = "1"
+    env["PEK_API_KEYS"] = ",".join(PAID_KEYS)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "PersonalityEngine_Kernel.app:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("server did not become ready")
+
+def _post(port, path, body, headers, timeout=30):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    conn.request("POST", path, body=body, headers=headers)
+    resp = conn.getresponse()
+    resp.read()
+    conn.close()
+    return resp.status
+
+# -------------------------
+# Traffic
+# -------------------------
+def flood(port, client_id, stop, statuses):
+    body = json.dumps({"responses": [HEAVY_PASTE]})
+    headers = {"Content-Type": "application/json", "X-Forwarded-For": "10.0.0.%d" % (client_id + 1)}
+    while not stop.is_set():
+        try:
+            status = _post(port, "/infer", body, headers)
+        except OSError:
+            status = "error"
+        statuses[status] = statuses.get(status, 0) + 1
+        if status in (429, 503):
+            time.sleep(0.05)
+
+def paid_reports(port, stop, latencies, statuses):
+    body = urllib.parse.urlencode([("responses", a) for a in REPORT_ANSWERS])
+    n = 0
+    while not stop.is_set():
+        # submissions rotate through the configured customers
+        n += 1
+        headers = {"Content-Type": "application/x-www-form-urlencoded", "X-API-Key": PAID_KEYS[n % PAID_CUSTOMERS]}
+        t0 = time.perf_counter()
+        try:
+            status = _post(port, "/report", body, headers)
+        except OSError:
+            status = "error"
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            latencies.append(time.perf_counter() - t0)
+        time.sleep(REPORT_INTERVAL)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else float("nan")
+
+def run_scenario(admission):
+    port = _free_port()
+    proc = _start_server(port, admission)
+    try:
+        stop = threading.Event()
+        flood_statuses, report_statuses, latencies = {}, {}, []
+        threads = [threading.Thread(target=flood, args=(port, i, stop, flood_statuses)) for i in range(FLOOD_CLIENTS)]
+        threads.append(threading.Thread(target=paid_reports, args=(port, stop, latencies, report_statuses)))
+        for t in threads:
+            t.start()
+        time.sleep(DURATION)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/admission/stats")
+        stats = json.loads(conn.getresponse().read())
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    print("admission %s" % ("ON" if admission else "OFF"))
+    print("  /report  p50 %.1f ms  p99 %.1f ms  statuses %s" % (
+        percentile(latencies, 0.5) * 1e3, percentile(latencies, 0.99) * 1e3, report_statuses))
+    print("  /infer flood statuses %s" % flood_statuses)
+    if stats.get("enabled"):
+        print("  counters %s" % stats["counters"])
+    return percentile(latencies, 0.99)
+
+
+if __name__ == "__main__":
+    on = run_scenario(True)
+    off = run_scenario(False)
+    print("paid-path p99: %.1f ms with admission vs %.1f ms without" % (on * 1e3, off * 1e3))
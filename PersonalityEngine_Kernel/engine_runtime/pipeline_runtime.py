@@ -0,0 +1,264 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ================================
+#  PIPELINE RUNTIME (pipeline.json)
+#  Builds the stage dependency graph once from the declared inputs/outputs
+#  (plus routing_layer.json ordering rules), then runs it level by level.
+#  Stage outputs are memoized by a digest of the stage's inputs, so a rerun
+#  skips every stage whose inputs did not change, even when an upstream
+#  stage had to run again and produced the same artifact.
+# ================================
+
+MEMO_SIZE = 4096
+MAX_WORKERS = 4
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+# -------------------------
+# Input digests
+# -------------------------
+def _feed(h, value) -> None:
+    if isinstance(value, np.ndarray):
+        h.update(b"A%s%s" % (value.dtype.str.encode(), repr(value.shape).encode()))
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"D%d" % len(value))
+        for k in sorted(value, key=repr):
+            _feed(h, k)
+            _feed(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(b"L%d" % len(value))
+        for v in value:
+            _feed(h, v)
+    else:
+        r = repr(value).encode()
+        h.update(b"S%d:" % len(r))
+        h.update(r)
+
+
+def artifact_digest(name: str, value: object) -> bytes:
+    h = hashlib.blake2b(name.encode(), digest_size=16)
+    _feed(h, value)
+    return h.digest()
+
+
+# -------------------------
+# Graph
+# -------------------------
+class PipelineGraph:
+    """
+    stages        stage names in execution_sequence order
+    inputs        stage -> declared input artifacts
+    outputs       stage -> output artifact
+    external      artifacts no stage produces (supplied by the caller)
+    depends_on    stage -> stages it must run after (data + routing order)
+    levels        stages grouped so every stage only depends on earlier levels
+    """
+
+    def __init__(self, pipeline_spec: dict, routing_spec: Optional[dict] = None):
+        stages_spec = pipeline_spec.get("pipeline", {})
+        order = [s for s in pipeline_spec.get("execution_sequence", []) if s in stages_spec]
+        order += [s for s in stages_spec if s not in order]
+        self.stages: List[str] = order
+        self.inputs = {s: _as_list(stages_spec[s].get("inputs")) for s in order}
+        self.outputs = {s: stages_spec[s].get("outputs") for s in order}
+
+        producer = {}
+        for s in order:
+            if self.outputs[s] in producer:
+                raise ValueError("artifact %r produced by both %s and %s"
+                                 % (self.outputs[s], producer[self.outputs[s]], s))
+            producer[self.outputs[s]] = s
+
+        self.external = sorted({a for s in order for a in self.inputs[s] if a not in producer})
+        self.depends_on: Dict[str, set] = {
+            s: {producer[a] for a in self.inputs[s] if a in producer} for s in order
+        }
+        if self._cycle():
+            raise ValueError("pipeline.json stage inputs form a cycle")
+
+        # routing_layer.json adjust_pipeline_order: extra "runs after" edges,
+        # kept only when they agree with the data dependencies.
+        self.routing_rules: List[str] = []
+        self.ignored_rules: List[str] = []
+        for name, rule in (routing_spec or {}).get("adaptive_routing_rules", {}).items():
+            sequence = [s for s in rule.get("adjust_pipeline_order", []) if s in self.depends_on]
+            if len(sequence) < 2:
+                continue
+            added = [(b, a) for a, b in zip(sequence, sequence[1:]) if a not in self.depends_on[b]]
+            for b, a in added:
+                self.depends_on[b].add(a)
+            if self._cycle():
+                for b, a in added:
+                    self.depends_on[b].discard(a)
+                self.ignored_rules.append(name)
+            else:
+                self.routing_rules.append(name)
+
+        self.levels = self._levels()
+
+    def _cycle(self) -> bool:
+        try:
+            self._levels()
+        except ValueError:
+            return True
+        return False
+
+    def _levels(self) -> List[List[str]]:
+        done, levels = set(), []
+        while len(done) < len(self.stages):
+            level = [s for s in self.stages if s not in done and self.depends_on[s] <= done]
+            if not level:
+                raise ValueError("cycle")
+            levels.append(level)
+            done.update(level)
+        return levels
+
+    def describe(self) -> dict:
+        return {
+            "levels": self.levels,
+            "external_inputs": self.external,
+            "depends_on": {s: sorted(d) for s, d in self.depends_on.items()},
+            "routing_rules": self.routing_rules,
+            "ignored_routing_rules": self.ignored_rules,
+        }
+
+
+# -------------------------
+# Runtime
+# -------------------------
+StageFn = Callable[[Dict[str, object]], object]
+
+
+class _Run:
+    __slots__ = ("artifacts", "digests", "timings")
+
+    def __init__(self, external: Dict[str, object], digests: Dict[str, bytes]):
+        self.artifacts = dict(external)
+        self.digests = digests
+        self.timings: Dict[str, dict] = {}
+
+
+class PipelineRuntime:
+    """
+    Runs a PipelineGraph with one callable per stage. A stage receives a dict
+    of its declared inputs and returns its output artifact; it must not
+    mutate its inputs, since memoized artifacts are shared between runs.
+    """
+
+    def __init__(self, graph: PipelineGraph, stages: Dict[str, StageFn],
+                 memo_size: int = MEMO_SIZE, max_workers: int = MAX_WORKERS):
+        missing = [s for s in graph.stages if s not in stages]
+        if missing:
+            raise ValueError("no implementation for stages: %s" % ", ".join(missing))
+        self.graph = graph
+        self.stages = stages
+        self.memo_size = memo_size
+        self.max_workers = max(1, max_workers)
+        self._memo: "OrderedDict[bytes, Tuple[object, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.counters = {
+            s: {"runs": 0, "memo_hits": 0, "total_ms": 0.0} for s in graph.stages
+        }
+
+    def _run_stage(self, stage: str, run: "_Run") -> None:
+        # Key = stage + digests of its inputs. Each artifact is hashed once,
+        # when it is produced; a memo hit reuses the digest stored with it.
+        h = hashlib.blake2b(stage.encode(), digest_size=16)
+        for a in self.graph.inputs[stage]:
+            h.update(run.digests[a])
+        key = h.digest()
+
+        started = time.perf_counter()
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                self._memo.move_to_end(key)
+        hit = entry is not None
+        if not hit:
+            output = self.stages[stage]({a: run.artifacts[a] for a in self.graph.inputs[stage]})
+            entry = (output, artifact_digest(self.graph.outputs[stage], output))
+        elapsed = (time.perf_counter() - started) * 1e3
+
+        with self._lock:
+            if not hit and self.memo_size:
+                self._memo[key] = entry
+                if len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+            counter = self.counters[stage]
+            counter["runs"] += 1
+            counter["memo_hits"] += hit
+            counter["total_ms"] += elapsed
+        name = self.graph.outputs[stage]
+        run.artifacts[name], run.digests[name] = entry
+        run.timings[stage] = {"ms": round(elapsed, 4), "memo": "hit" if hit else "miss"}
+
+    def _start(self, external: Dict[str, object]) -> "_Run":
+        missing = [a for a in self.graph.external if a not in external]
+        if missing:
+            raise KeyError("missing pipeline inputs: %s" % ", ".join(missing))
+        return _Run(external, {a: artifact_digest(a, external[a]) for a in self.graph.external})
+
+    def run(self, external: Dict[str, object]) -> Tuple[Dict[str, object], Dict[str, dict]]:
+        # Returns (every artifact by name, per-stage timings).
+        run = self._start(external)
+        for level in self.graph.levels:
+            for stage in level:
+                self._run_stage(stage, run)
+        return run.artifacts, run.timings
+
+    def _run_chunk(self, stage: str, chunk: List["_Run"]) -> None:
+        for run in chunk:
+            self._run_stage(stage, run)
+
+    def run_batch(self, externals: List[Dict[str, object]]
+                  ) -> List[Tuple[Dict[str, object], Dict[str, dict]]]:
+        # Stages of one level are independent of each other, and items are
+        # independent of each other: each level fans out as (stage, chunk of
+        # items) tasks, one chunk per worker, and the next level waits on it.
+        runs = [self._start(e) for e in externals]
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="pek-pipeline")
+        step = max(1, -(-len(runs) // self.max_workers))
+        chunks = [runs[i:i + step] for i in range(0, len(runs), step)]
+        for level in self.graph.levels:
+            futures = [self._pool.submit(self._run_chunk, stage, chunk)
+                       for stage in level for chunk in chunks]
+            for f in futures:
+                f.result()
+        return [(run.artifacts, run.timings) for run in runs]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {s: dict(c, total_ms=round(c["total_ms"], 3)) for s, c in self.counters.items()}
+            memo = len(self._memo)
+        return {
+            "memo_entries": memo,
+            "memo_size": self.memo_size,
+            "stages": counters,
+            "graph": self.graph.describe(),
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
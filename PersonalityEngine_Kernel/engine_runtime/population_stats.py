@@ -0,0 +1,340 @@
+import base64
+import glob
+import json
+import math
+import os
+import socket
+import threading
+import time
+import weakref
+from typing import Dict, Iterable, List, Optional
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import (
+    DEPTH_LABELS, ENGINE_VERSION, MODES, SIGNAL_KEYS,
+)
+from PersonalityEngine_Kernel.engines.inference.result_cache import input_digest
+
+# ================================
+#  POPULATION STATS
+#  Constant-memory streaming aggregates over completed inferences: counts per
+#  mode / second mode / depth label, a 0–8 histogram per signal, a log-bucket
+#  quantile sketch of input length, and a HyperLogLog of distinct input
+#  digests. Each request thread writes only its own shard (no locks on the
+#  update path); readers sum the shards, and an exited thread's shard is
+#  folded into a retired total. Every part merges by addition (or
+#  register max), so snapshots from several workers combine exactly.
+#  With PEK_STATS_DIR set, each worker writes its snapshot there periodically
+#  and /stats?scope=all merges them.
+# ================================
+
+STATS_ENABLED = os.environ.get("PEK_POPULATION_STATS", "1").lower() not in ("0", "false", "no")
+STATS_DIR = os.environ.get("PEK_STATS_DIR")
+STATS_FLUSH_INTERVAL = float(os.environ.get("PEK_STATS_FLUSH_SECONDS", 10))
+
+SNAPSHOT_VERSION = 1
+SIGNAL_LEVELS = 9           # internal signals are clamped to 0..8
+
+# Input length sketch: bucket i holds lengths in (GAMMA^(i-1), GAMMA^i], so a
+# quantile read from it is within LENGTH_ACCURACY of the true value.
+LENGTH_ACCURACY = 0.01
+GAMMA = (1 + LENGTH_ACCURACY) / (1 - LENGTH_ACCURACY)
+LENGTH_BUCKETS = 1024       # up to GAMMA^1023 ≈ 8e8 characters
+QUANTILES = (0.5, 0.9, 0.99)
+
+# HyperLogLog: 2^HLL_P one-byte registers, ~1.04 / sqrt(2^HLL_P) ≈ 1.6% error.
+HLL_P = 12
+HLL_M = 1 << HLL_P
+HLL_BITS = 64 - HLL_P
+
+WORKER_ID = "%s-%d" % (socket.gethostname(), os.getpid())
+
+_LOG_GAMMA = math.log(GAMMA)
+_MODE_INDEX = {m: i for i, m in enumerate(MODES)}
+_DEPTH_INDEX = {d: i for i, d in enumerate(DEPTH_LABELS)}
+
+
+def length_bucket(n: int) -> int:
+    if n <= 0:
+        return 0
+    return min(LENGTH_BUCKETS - 1, int(math.ceil(math.log(n) / _LOG_GAMMA)))
+
+
+def hll_update(registers: bytearray, digest: str) -> None:
+    x = int(digest[:16], 16)
+    rest = x & ((1 << HLL_BITS) - 1)
+    rank = HLL_BITS - rest.bit_length() + 1
+    idx = x >> HLL_BITS
+    if rank > registers[idx]:
+        registers[idx] = rank
+
+
+def hll_estimate(registers: bytes) -> int:
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)  # small-range correction
+    return int(round(estimate))
+
+
+# -------------------------
+# Per-thread shard
+# -------------------------
+class _Shard:
+    __slots__ = ("count", "modes", "second_modes", "depth", "signals", "lengths", "hll")
+
+    def __init__(self):
+        self.count = 0
+        self.modes = [0] * len(MODES)
+        self.second_modes = [0] * (len(MODES) + 1)   # last slot: no second mode
+        self.depth = [0] * len(DEPTH_LABELS)
+        self.signals = [[0] * SIGNAL_LEVELS for _ in SIGNAL_KEYS]
+        self.lengths = [0] * LENGTH_BUCKETS
+        self.hll = bytearray(HLL_M)
+
+    def add(self, other: "_Shard") -> None:
+        self.count += other.count
+        for i, v in enumerate(other.modes):
+            self.modes[i] += v
+        for i, v in enumerate(other.second_modes):
+            self.second_modes[i] += v
+        for i, v in enumerate(other.depth):
+            self.depth[i] += v
+        for hist, src in zip(self.signals, other.signals):
+            for i, v in enumerate(src):
+                hist[i] += v
+        for i, v in enumerate(other.lengths):
+            if v:
+                self.lengths[i] += v
+        self.hll = bytearray(map(max, self.hll, other.hll))
+
+
+class _ShardOwner:
+    # Lives only in the thread-local; collected when its thread exits.
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: _Shard):
+        self.shard = shard
+
+
+class PopulationStats:
+    def __init__(self, stats_dir: Optional[str] = STATS_DIR, flush_interval: float = STATS_FLUSH_INTERVAL):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []        # shards of live threads
+        self._retired = _Shard()               # folded shards of exited threads
+        self._lock = threading.Lock()          # shard registration / retirement only
+        self._flush_lock = threading.Lock()
+        self.stats_dir = stats_dir
+        self.flush_interval = flush_interval
+        self._next_flush = time.monotonic() + flush_interval
+        self.started = time.time()
+
+    def _shard(self) -> _Shard:
+        owner = getattr(self._local, "owner", None)
+        if owner is None:
+            owner = self._local.owner = _ShardOwner(_Shard())
+            # Pool threads come and go (AnyIO retires idle ones), so a dead
+            # thread's counts fold into _retired and its shard is dropped:
+            # memory follows the live thread count, not the thread history.
+            weakref.finalize(owner, self._retire, owner.shard)
+            with self._lock:
+                self._shards.append(owner.shard)
+        return owner.shard
+
+    def _retire(self, shard: _Shard) -> None:
+        with self._lock:
+            self._retired.add(shard)
+            self._shards.remove(shard)
+
+    def observe(self, engine_input: dict, record: dict) -> None:
+        # record: the request's decision record (cache rows and worker
+        # replies carry it), so stats never run inference themselves.
+        s = self._shard()
+        s.count += 1
+        s.modes[_MODE_INDEX[record["mode"]]] += 1
+        second = record.get("second_mode")
+        s.second_modes[_MODE_INDEX[second] if second in _MODE_INDEX else len(MODES)] += 1
+        s.depth[_DEPTH_INDEX[record["depth_label"]]] += 1
+        levels = record.get("signals") or {}
+        for hist, key in zip(s.signals, SIGNAL_KEYS):
+            hist[min(SIGNAL_LEVELS - 1, max(0, levels.get(key, 0)))] += 1
+        s.lengths[length_bucket(len(engine_input.get("example_statement", "") or ""))] += 1
+        hll_update(s.hll, input_digest(engine_input))
+        # one thread writes the periodic snapshot; the others skip past
+        if self.stats_dir and time.monotonic() >= self._next_flush and self._flush_lock.acquire(blocking=False):
+            try:
+                self._write_snapshot()
+            finally:
+                self._flush_lock.release()
+
+    # --- snapshots ---
+    def snapshot(self) -> dict:
+        # Mergeable state: plain counts plus the HLL registers.
+        total = _Shard()
+        with self._lock:
+            # retired and live shards read together, so a shard retiring
+            # mid-snapshot is counted exactly once
+            total.add(self._retired)
+            shards = list(self._shards)
+        for s in shards:
+            total.add(s)
+        count, modes, second, depth = total.count, total.modes, total.second_modes, total.depth
+        signals, lengths, hll = total.signals, total.lengths, total.hll
+        return {
+            "version": SNAPSHOT_VERSION,
+            "engine_version": ENGINE_VERSION,
+            "workers": [WORKER_ID],
+            "since": self.started,
+            "count": count,
+            "modes": dict(zip(MODES, modes)),
+            "second_modes": dict(zip(MODES + ["none"], second)),
+            "depth": dict(zip(DEPTH_LABELS, depth)),
+            "signals": dict(zip(SIGNAL_KEYS, signals)),
+            "input_length": {"gamma": GAMMA, "buckets": {str(i): v for i, v in enumerate(lengths) if v}},
+            "distinct_inputs": {"p": HLL_P, "registers": base64.b64encode(bytes(hll)).decode("ascii")},
+        }
+
+    def flush(self) -> Optional[str]:
+        # This worker's snapshot → <stats_dir>/<worker>.json (atomic rename).
+        if not self.stats_dir:
+            return None
+        with self._flush_lock:
+            return self._write_snapshot()
+
+    def _write_snapshot(self) -> str:
+        self._next_flush = time.monotonic() + self.flush_interval
+        os.makedirs(self.stats_dir, exist_ok=True)
+        path = os.path.join(self.stats_dir, WORKER_ID + ".json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return path
+
+    def cluster_snapshot(self) -> dict:
+        # Every worker's last flushed snapshot, with this worker's live one.
+        snapshots = [self.snapshot()]
+        if self.stats_dir:
+            own = os.path.join(self.stats_dir, WORKER_ID + ".json")
+            for path in sorted(glob.glob(os.path.join(self.stats_dir, "*.json"))):
+                if path == own:
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return merge_snapshots(snapshots)
+
+
+# -------------------------
+# Merge / summarize
+# -------------------------
+def _add(into: Dict[str, int], other: Dict[str, int]) -> None:
+    for k, v in other.items():
+        into[k] = into.get(k, 0) + v
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    out: Optional[dict] = None
+    for snap in snapshots:
+        if snap.get("version") != SNAPSHOT_VERSION:
+            raise ValueError("unsupported stats snapshot version %r" % snap.get("version"))
+        if out is None:
+            out = json.loads(json.dumps(snap))
+            continue
+        if snap["distinct_inputs"]["p"] != out["distinct_inputs"]["p"]:
+            raise ValueError("HyperLogLog precision differs between snapshots")
+        out["workers"] = out["workers"] + snap["workers"]
+        out["since"] = min(out["since"], snap["since"])
+        out["count"] += snap["count"]
+        if snap["engine_version"] != out["engine_version"]:
+            out["engine_version"] = "mixed"
+        for key in ("modes", "second_modes", "depth"):
+            _add(out[key], snap[key])
+        for key, hist in snap["signals"].items():
+            base = out["signals"].setdefault(key, [0] * len(hist))
+            out["signals"][key] = [a + b for a, b in zip(base, hist)]
+        _add(out["input_length"]["buckets"], snap["input_length"]["buckets"])
+        a = base64.b64decode(out["distinct_inputs"]["registers"])
+        b = base64.b64decode(snap["distinct_inputs"]["registers"])
+        out["distinct_inputs"]["registers"] = base64.b64encode(bytes(map(max, a, b))).decode("ascii")
+    if out is None:
+        raise ValueError("no snapshots to merge")
+    return out
+
+
+def length_quantiles(sketch: dict, quantiles=QUANTILES) -> Dict[str, Optional[float]]:
+    buckets = sorted((int(i), n) for i, n in sketch["buckets"].items())
+    total = sum(n for _, n in buckets)
+    gamma = sketch["gamma"]
+    out = {}
+    for q in quantiles:
+        if not total:
+            out["p%g" % (q * 100)] = None
+            continue
+        rank, seen = q * (total - 1), 0
+        for i, n in buckets:
+            seen += n
+            if seen > rank:
+                # bucket midpoint (relative-error estimate); bucket 0 is empty input
+                out["p%g" % (q * 100)] = 0.0 if i == 0 else round(2 * gamma ** i / (gamma + 1), 1)
+                break
+    return out
+
+
+def summarize(snapshot: dict) -> dict:
+    count = snapshot["count"]
+
+    def shares(counts: Dict[str, int]) -> Dict[str, dict]:
+        return {k: {"count": v, "share": round(v / count, 4) if count else 0.0} for k, v in counts.items()}
+
+    signals = {}
+    for key, hist in snapshot["signals"].items():
+        n = sum(hist)
+        signals[key] = {
+            "histogram": hist,
+            "mean": round(sum(level * c for level, c in enumerate(hist)) / n, 3) if n else None,
+        }
+    return {
+        "engine_version": snapshot["engine_version"],
+        "workers": len(snapshot["workers"]),
+        "since": snapshot["since"],
+        "inferences": count,
+        "distinct_inputs_estimate": hll_estimate(base64.b64decode(snapshot["distinct_inputs"]["registers"])),
+        "modes": shares(snapshot["modes"]),
+        "second_modes": shares(snapshot["second_modes"]),
+        "depth": shares(snapshot["depth"]),
+        "signals": signals,
+        "input_length": length_quantiles(snapshot["input_length"]),
+    }
+
+
+_STATS: Optional[PopulationStats] = None
+_STATS_LOCK = threading.Lock()
+
+
+def get_population_stats() -> Optional[PopulationStats]:
+    global _STATS
+    if not STATS_ENABLED:
+        return None
+    if _STATS is None:
+        with _STATS_LOCK:
+            if _STATS is None:
+                _STATS = PopulationStats()
+    return _STATS
+
+
+if __name__ == "__main__":
+    # Merge snapshot files from several workers / hosts: population_stats a.json b.json ...
+    import sys
+    files = sys.argv[1:]
+    if not files:
+        print("usage: python -m PersonalityEngine_Kernel.engine_runtime.population_stats SNAPSHOT.json ...")
+        sys.exit(2)
+    loaded = []
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            loaded.append(json.load(f))
+    print(json.dumps(summarize(merge_snapshots(loaded)), indent=2))
@@ -0,0 +1,111 @@
+import heapq
+import json
+import os
+import socket
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engines.inference.result_cache import input_digest
+
+# ================================
+#  SLOW REQUEST LOG
+#  Keeps the slowest N requests over a sliding window in a fixed ring of
+#  per-interval min-heaps. A request faster than everything already kept
+#  costs one comparison. Entries are keyed by input digest and carry shape
+#  metrics only; raw answers are never stored.
+# ================================
+
+SLOW_LOG_SIZE = int(os.environ.get("PEK_SLOW_LOG_SIZE", 50))
+SLOW_LOG_WINDOW = float(os.environ.get("PEK_SLOW_LOG_WINDOW_SECONDS", 900))
+SLOW_LOG_BUCKETS = 15
+
+WORKER_ID = "%s:%d" % (socket.gethostname(), os.getpid())
+
+
+def _text_shape(text: str) -> dict:
+    return {
+        "input_length": len(text),
+        "word_count": len(text.split()),
+        "sentence_count": sum(1 for ch in text if ch in ".!?"),
+    }
+
+
+class SlowRequestLog:
+    def __init__(self, size: int = SLOW_LOG_SIZE, window_seconds: float = SLOW_LOG_WINDOW,
+                 buckets: int = SLOW_LOG_BUCKETS):
+        self.size = max(1, size)
+        self.window_seconds = window_seconds
+        self.n_buckets = max(1, buckets)
+        self.bucket_seconds = window_seconds / self.n_buckets
+        # ring slot -> (interval index, min-heap of (duration, seq, entry)),
+        # replaced as a whole so an unlocked read never pairs the two wrongly
+        self._ring = [(-1, []) for _ in range(self.n_buckets)]
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _slot(self, now: float):
+        index = int(now // self.bucket_seconds)
+        seen, heap = self._ring[index % self.n_buckets]
+        if seen != index:
+            heap = []
+            self._ring[index % self.n_buckets] = (index, heap)
+        return heap
+
+    def observe(self, route: str, duration: float, engine_input: dict, cache_status: str,
+                stages: Iterable[Tuple[str, float]], mode: Optional[str] = None) -> bool:
+        # mode comes from the handler's decision record; this path never runs the engine.
+        now = time.time()
+        index = int(now // self.bucket_seconds)
+        index_seen, heap = self._ring[index % self.n_buckets]
+        # unlocked peek: a stale read only means one extra trip through the lock
+        if index_seen == index and len(heap) >= self.size and duration <= heap[0][0]:
+            return False
+
+        text = engine_input.get("example_statement", "") or ""
+        entry = {
+            "at": round(now, 3),
+            "route": route,
+            "duration_ms": round(duration * 1e3, 3),
+            "input_digest": input_digest(engine_input),
+            **_text_shape(text),
+            "mode": mode,
+            "stages_ms": {name: round(seconds * 1e3, 3) for name, seconds in stages},
+            "cache": cache_status,
+            "worker_id": WORKER_ID,
+        }
+        with self._lock:
+            heap = self._slot(now)
+            self._seq += 1
+            item = (duration, self._seq, entry)
+            if len(heap) < self.size:
+                heapq.heappush(heap, item)
+            elif duration > heap[0][0]:
+                heapq.heapreplace(heap, item)
+            else:
+                return False
+        return True
+
+    def snapshot(self) -> List[dict]:
+        oldest = int(time.time() // self.bucket_seconds) - self.n_buckets + 1
+        with self._lock:
+            items = [item for index, heap in self._ring if index >= oldest for item in heap]
+        return [entry for _, _, entry in heapq.nlargest(self.size, items)]
+
+    def to_jsonl(self) -> str:
+        return "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in self.snapshot())
+
+    def dump_jsonl(self, path: str) -> int:
+        entries = self.snapshot()
+        with open(path, "a", encoding="utf-8") as f:
+            for e in entries:
+                f.write(json.dumps(e, separators=(",", ":")) + "\n")
+        return len(entries)
+
+    def describe(self) -> dict:
+        return {
+            "worker_id": WORKER_ID,
+            "size": self.size,
+            "window_seconds": self.window_seconds,
+            "requests": self.snapshot(),
+        }
@@ -0,0 +1,172 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ================================
+#  STACK SAMPLER
+#  In-process statistical profiler for /debug/profile. Nothing is installed
+#  while idle: a profile starts one sampler thread that reads every thread's
+#  current frame at a fixed rate, then exits. Sampling time is held under a
+#  fixed share of wall time by stretching the interval, and duration and
+#  rate are clamped. Output is collapsed stacks ("a;b;c count") for
+#  flamegraph tools, plus per-function totals for the package modules.
+# ================================
+
+PROFILE_MAX_SECONDS = float(os.environ.get("PEK_PROFILE_MAX_SECONDS", 30))
+PROFILE_MAX_HZ = int(os.environ.get("PEK_PROFILE_MAX_HZ", 250))
+# Share of wall time the sampler itself may spend walking stacks.
+PROFILE_MAX_OVERHEAD = float(os.environ.get("PEK_PROFILE_MAX_OVERHEAD", 0.02))
+MIN_SECONDS = 0.1
+MAX_DEPTH = 128
+
+PACKAGE = "PersonalityEngine_Kernel"
+
+# Leaf frames of a thread that is parked, not working.
+IDLE_LEAVES = frozenset({
+    ("threading", "wait"), ("threading", "_wait_for_tstate_lock"), ("queue", "get"),
+    ("selectors", "select"), ("asyncio.base_events", "_run_once"),
+    ("concurrent.futures.thread", "_worker"), ("multiprocessing.connection", "_recv"),
+    ("multiprocessing.connection", "poll"), ("socket", "accept"),
+})
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _label(frame) -> str:
+    return "%s:%s" % (frame.f_globals.get("__name__", "?"), frame.f_code.co_name)
+
+
+class Profile:
+    def __init__(self, stacks: Counter, samples: int, idle: int, duration: float,
+                 sampling_time: float, requested_hz: int):
+        self.stacks = stacks
+        self.samples = samples
+        self.idle = idle
+        self.duration = duration
+        self.sampling_time = sampling_time
+        self.requested_hz = requested_hz
+
+    def collapsed(self) -> str:
+        # Brendan Gregg's folded format: root;...;leaf <count>
+        return "".join("%s %d\n" % (stack, n) for stack, n in self.stacks.most_common())
+
+    def function_totals(self, prefix: str = PACKAGE) -> List[dict]:
+        # self = leaf samples; total = samples with the function anywhere on the stack.
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, n in self.stacks.items():
+            frames = stack.split(";")[1:]  # first element is the thread name
+            if frames and frames[-1].startswith(prefix):
+                own[frames[-1]] += n
+            for f in set(frames):
+                if f.startswith(prefix):
+                    total[f] += n
+        return [
+            {"function": f, "self": own[f], "total": total[f]}
+            for f in sorted(total, key=lambda f: (-total[f], -own[f], f))
+        ]
+
+    def describe(self) -> dict:
+        return {
+            "duration_s": round(self.duration, 3),
+            "requested_hz": self.requested_hz,
+            "effective_hz": round(self.samples / self.duration, 1) if self.duration else 0.0,
+            "samples": self.samples,
+            "idle_thread_samples": self.idle,
+            "overhead": round(self.sampling_time / self.duration, 4) if self.duration else 0.0,
+            "functions": self.function_totals(),
+            "collapsed": self.collapsed(),
+        }
+
+
+class StackSampler:
+    def __init__(self, max_seconds: float = PROFILE_MAX_SECONDS, max_hz: int = PROFILE_MAX_HZ,
+                 max_overhead: float = PROFILE_MAX_OVERHEAD):
+        self.max_seconds = max_seconds
+        self.max_hz = max(1, max_hz)
+        self.max_overhead = max(1e-3, max_overhead)
+        self._busy = threading.Lock()
+
+    def clamp(self, seconds: float, hz: int) -> Tuple[float, int]:
+        return min(self.max_seconds, max(MIN_SECONDS, seconds)), min(self.max_hz, max(1, hz))
+
+    def _sample(self, stacks: Counter, exclude: set, names: Dict[int, str], include_idle: bool) -> int:
+        idle = 0
+        for ident, frame in sys._current_frames().items():
+            if ident in exclude:
+                continue
+            leaf = (frame.f_globals.get("__name__", "?"), frame.f_code.co_name)
+            if not include_idle and leaf in IDLE_LEAVES:
+                idle += 1
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(_label(frame))
+                frame = frame.f_back
+            if ident not in names:
+                names.update((t.ident, t.name) for t in threading.enumerate())
+            labels.append(names.get(ident, "thread-%d" % ident))
+            labels.reverse()
+            stacks[";".join(labels)] += 1
+        return idle
+
+    def run(self, seconds: float, hz: int, exclude: Iterable[int] = (),
+            include_idle: bool = False) -> Profile:
+        # Blocks the caller for the profile duration; one profile at a time.
+        seconds, hz = self.clamp(seconds, hz)
+        if not self._busy.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running")
+        try:
+            result: dict = {}
+            sampler = threading.Thread(
+                target=self._loop, args=(seconds, hz, set(exclude), include_idle, result),
+                name="pek-profiler", daemon=True,
+            )
+            sampler.start()
+            sampler.join()
+            return result["profile"]
+        finally:
+            self._busy.release()
+
+    def _loop(self, seconds: float, hz: int, exclude: set, include_idle: bool, result: dict) -> None:
+        exclude.add(threading.get_ident())
+        stacks: Counter = Counter()
+        names: Dict[int, str] = {}
+        samples = idle = 0
+        spent = 0.0
+        interval = 1.0 / hz
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_at = started
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_at:
+                time.sleep(min(next_at, deadline) - now)
+                continue
+            idle += self._sample(stacks, exclude, names, include_idle)
+            cost = time.perf_counter() - now
+            spent += cost
+            samples += 1
+            # Overhead cap: never sample more often than cost / max_overhead.
+            next_at = now + max(interval, cost / self.max_overhead)
+        result["profile"] = Profile(stacks, samples, idle, time.perf_counter() - started, spent, hz)
+
+
+_SAMPLER: Optional[StackSampler] = None
+_SAMPLER_LOCK = threading.Lock()
+
+
+def get_stack_sampler() -> StackSampler:
+    global _SAMPLER
+    if _SAMPLER is None:
+        with _SAMPLER_LOCK:
+            if _SAMPLER is None:
+                _SAMPLER = StackSampler()
+    return _SAMPLER
@@ -0,0 +1,118 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+# ================================
+#  STARTUP PROFILE
+#  Import cost (-X importtime) and time-to-first-ready for the web app.
+#  Run with --check to fail when a budget is exceeded.
+# ================================
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+APP_MODULE = "PersonalityEngine_Kernel.app"
+
+# Budgets (ms), overridable per environment.
+IMPORT_BUDGET_MS = float(os.environ.get("PEK_STARTUP_IMPORT_BUDGET_MS", 1500))
+READY_BUDGET_MS = float(os.environ.get("PEK_STARTUP_READY_BUDGET_MS", 5000))
+
+# Modules the health check never needs; they must not load at import time.
+DEFERRED_MODULES = ["numpy", "PersonalityEngine_Kernel.engines.vector.vector_engine"]
+
+READY_PATH = "/ready"
+READY_TIMEOUT = 30.0
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+# -------------------------
+# Import cost
+# -------------------------
+def profile_imports(top=15):
+    code = (
+        "import sys, %s\n"
+        "print(','.join(m for m in %r if m in sys.modules))" % (APP_MODULE, DEFERRED_MODULES)
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    total = next((c for c, _, n in rows if n.strip() == APP_MODULE), 0)
+    print("Import %s: %.1f ms" % (APP_MODULE, total / 1e3))
+    print("Top imports by cumulative time:")
+    for cumulative, self_time, name in sorted(rows, reverse=True)[:top]:
+        print("  %8.1f ms  (self %6.1f ms)  %s" % (cumulative / 1e3, self_time / 1e3, name))
+
+    loaded = [m for m in proc.stdout.strip().splitlines()[-1].split(",") if m] if proc.stdout.strip() else []
+    stray_output = proc.stdout.strip().splitlines()[:-1]
+    return total / 1e3, loaded, stray_output
+
+# -------------------------
+# Time to first ready
+# -------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_to_ready(path=READY_PATH):
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", APP_MODULE + ":app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < READY_TIMEOUT:
+            try:
+                with urllib.request.urlopen("http://127.0.0.1:%d%s" % (port, path), timeout=1) as r:
+                    if r.status == 200:
+                        return (time.perf_counter() - started) * 1e3
+            except OSError:
+                time.sleep(0.01)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def run_profile(check=False):
+    import_ms, loaded, stray_output = profile_imports()
+    ready_ms = time_to_ready()
+    print("Time to first ready (%s): %s" % (
+        READY_PATH, "timed out" if ready_ms is None else "%.1f ms" % ready_ms))
+
+    failures = []
+    if import_ms > IMPORT_BUDGET_MS:
+        failures.append("import %.1f ms > budget %.0f ms" % (import_ms, IMPORT_BUDGET_MS))
+    if ready_ms is None or ready_ms > READY_BUDGET_MS:
+        failures.append("first ready over budget %.0f ms" % READY_BUDGET_MS)
+    if loaded:
+        failures.append("deferred modules loaded at import: %s" % ", ".join(loaded))
+    if stray_output:
+        failures.append("import wrote to stdout: %r" % stray_output[0])
+
+    for f in failures:
+        print("FAIL:", f)
+    if check and not failures:
+        print("Startup within budget.")
+    return not failures
+
+
+if __name__ == "__main__":
+    ok = run_profile(check="--check" in sys.argv)
+    sys.exit(0 if ok or "--check" not in sys.argv else 1)
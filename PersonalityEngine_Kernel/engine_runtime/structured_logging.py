@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from PersonalityEngine_Kernel.engines.inference.result_cache import input_digest
+
+# ================================
+#  STRUCTURED LOGGING
+#  Records become one JSON line each, but request threads only enqueue them:
+#  formatting and writing happen on a background thread. The queue is
+#  bounded and a full queue drops the record (and counts it) instead of
+#  blocking the request. Request records are sampled per route and written
+#  by RequestLogMiddleware, which sees the status actually sent.
+# ================================
+
+LOG_ENABLED = os.environ.get("PEK_STRUCTURED_LOGS", "1").lower() not in ("0", "false", "no")
+LOG_LEVEL = os.environ.get("PEK_LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.environ.get("PEK_LOG_QUEUE_SIZE", 10000))
+LOG_FILE = os.environ.get("PEK_LOG_FILE")
+
+# "route=rate" pairs, e.g. "/infer=0.1,/report=1"; "default" covers other routes.
+# Bulk /infer is sampled by default: it carries most of the volume.
+LOG_SAMPLE = os.environ.get("PEK_LOG_SAMPLE", "")
+DEFAULT_SAMPLE_RATES = {"/infer": 0.1}
+DEFAULT_SAMPLE_RATE = 1.0
+
+REQUEST_LOGGER = "PersonalityEngine_Kernel.requests"
+
+# Routes that get a request record, and the request.state attribute their
+# handlers fill in (engine input, cache status, mode) for it.
+LOGGED_ROUTES = frozenset({"/infer", "/report"})
+REQUEST_STATE_KEY = "request_log"
+
+# Fields that may carry what the user typed. Dropped from every record.
+REDACTED_FIELDS = frozenset({
+    "example_statement", "responses", "response", "answers", "text", "raw_text", "engine_input",
+})
+
+# LogRecord attributes that are not caller-supplied extra fields.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        route, sep, rate = part.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+# -------------------------
+# Formatting
+# -------------------------
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in REDACTED_FIELDS and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+# -------------------------
+# Queue handler + drain thread
+# -------------------------
+class QueueLogHandler(logging.Handler):
+    def __init__(self, sink: logging.Handler, capacity: int = LOG_QUEUE_SIZE,
+                 sample_rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.sink = sink
+        self.queue: "queue.Queue[Optional[logging.LogRecord]]" = queue.Queue(maxsize=max(1, capacity))
+        self.capacity = max(1, capacity)
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = self.sample_rates.pop("default", DEFAULT_SAMPLE_RATE)
+        self._lock = threading.Lock()
+        self.counters = {"enqueued": 0, "dropped": 0, "sampled_out": 0, "written": 0, "sink_errors": 0}
+        self._thread = threading.Thread(target=self._drain, name="pek-log-drain", daemon=True)
+        self._thread.start()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def sample_rate(self, route: Optional[str]) -> float:
+        return self.sample_rates.get(route, self.default_rate) if route else 1.0
+
+    def sampled(self, route: Optional[str]) -> bool:
+        # Decided before a request record is built, so sampled-out requests cost nothing.
+        rate = self.sample_rate(route)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self._count("sampled_out")
+        return False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Request thread: no formatting, no I/O, never waits.
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._count("dropped")
+            return
+        self._count("enqueued")
+
+    def _drain(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is None:
+                return
+            try:
+                self.sink.handle(record)
+                self._count("written")
+            except Exception:
+                self._count("sink_errors")
+
+    def close(self) -> None:
+        # Flushes what is already queued, then stops the drain thread.
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+        self.sink.close()
+        super().close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "enabled": True,
+            "capacity": self.capacity,
+            "queued": self.queue.qsize(),
+            "sample_rates": dict(self.sample_rates, default=self.default_rate),
+            "counters": counters,
+        }
+
+
+_HANDLER: Optional[QueueLogHandler] = None
+_HANDLER_LOCK = threading.Lock()
+
+
+def configure_logging() -> Optional[QueueLogHandler]:
+    # Installs the queue handler on the package loggers once per process.
+    global _HANDLER
+    if not LOG_ENABLED:
+        return None
+    with _HANDLER_LOCK:
+        if _HANDLER is None:
+            sink = logging.FileHandler(LOG_FILE, encoding="utf-8") if LOG_FILE else logging.StreamHandler(sys.stderr)
+            sink.setFormatter(JsonFormatter())
+            rates = dict(DEFAULT_SAMPLE_RATES, **parse_sample_rates(LOG_SAMPLE))
+            _HANDLER = QueueLogHandler(sink, LOG_QUEUE_SIZE, rates)
+            package = logging.getLogger("PersonalityEngine_Kernel")
+            package.addHandler(_HANDLER)
+            package.setLevel(LOG_LEVEL)
+            package.propagate = False
+    return _HANDLER
+
+
+def shutdown_logging() -> None:
+    global _HANDLER
+    with _HANDLER_LOCK:
+        if _HANDLER is not None:
+            logging.getLogger("PersonalityEngine_Kernel").removeHandler(_HANDLER)
+            _HANDLER.close()
+            _HANDLER = None
+
+
+def get_log_handler() -> Optional[QueueLogHandler]:
+    return _HANDLER
+
+
+# -------------------------
+# Request records
+# -------------------------
+request_logger = logging.getLogger(REQUEST_LOGGER)
+
+
+def log_request(route: str, duration: float, engine_input: Optional[dict], cache_status: Optional[str],
+                status: int = 200, mode: Optional[str] = None) -> bool:
+    # One record per sampled request: digest and shape only, never the answers.
+    # mode comes from the handler's decision record; the logging path never
+    # runs the engine, so a request that failed before inference logs null.
+    handler = _HANDLER
+    if handler is None or not request_logger.isEnabledFor(logging.INFO) or not handler.sampled(route):
+        return False
+    text = (engine_input or {}).get("example_statement", "") or ""
+    request_logger.info("request", extra={
+        "route": route,
+        "status": status,
+        "duration_ms": round(duration * 1e3, 3),
+        "input_digest": input_digest(engine_input) if engine_input is not None else None,
+        "input_length": len(text),
+        "mode": mode,
+        "cache": cache_status,
+        "sample_rate": handler.sample_rate(route),
+    })
+    return True
+
+
+class RequestLogMiddleware:
+    # Pure ASGI: records the status from http.response.start, so 4xx/5xx
+    # answers (limits, admission, unhandled errors) are logged too.
+    def __init__(self, app, routes=LOGGED_ROUTES):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.routes or _HANDLER is None:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        sent = {"status": 500}   # an exception before the response starts is a 500
+
+        async def send_status(message):
+            if message["type"] == "http.response.start":
+                sent["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            info = scope.get("state", {}).get(REQUEST_STATE_KEY) or {}
+            log_request(scope["path"], time.perf_counter() - started, info.get("engine_input"),
+                        info.get("cache"), sent["status"], info.get("mode"))
@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import BANK
+
+# ================================
+#  WARM-UP
+#  Runs synthetic answers through every serving path before a worker
+#  reports ready, so the first real request doesn't pay for lazy imports,
+#  compiled tables or first-call code paths.
+# ================================
+
+logger = logging.getLogger(__name__)
+
+# Per-environment configuration.
+WARMUP_ENABLED = os.environ.get("PEK_WARMUP", "1").lower() not in ("0", "false", "no")
+WARMUP_ROUNDS = max(1, int(os.environ.get("PEK_WARMUP_ROUNDS", 2)))
+
+# Long answer so the High depth branch is exercised too.
+_LONG_FILLER = (
+    "When a lot depends on me I notice it first in my body. Then I start planning. "
+    "I go over the details and try to see what could go wrong. I talk to a friend sometimes. "
+    "Other times I keep it to myself until it settles. "
+)
+
+
+# -------------------------
+# Synthetic inputs
+# -------------------------
+def build_warmup_inputs() -> List[dict]:
+    # One answer set per phrase bank (pushes each mode to the top), plus an
+    # empty-ish answer (LOW_SIGNAL_BASELINE) and a long mixed one.
+    inputs = [{"example_statement": "ok"}]
+    for conf in BANK.values():
+        inputs.append({"example_statement": ". ".join(conf["hits"][:6]) + "."})
+    mixed = " ".join(conf["hits"][0] + "." for conf in BANK.values())
+    inputs.append({"example_statement": _LONG_FILLER * 6 + mixed})
+    inputs.append({
+        "example_statement": mixed,
+        "context_flags": {"stress_state": "acute"},
+        "forced_overrides": {"D1": 0.5},
+    })
+    return inputs
+
+
+# -------------------------
+# State + runner
+# -------------------------
+class WarmupState:
+    def __init__(self):
+        self.status = "pending"
+        self.started: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.steps: List[dict] = []
+        self.error: Optional[str] = None
+        self.ready = threading.Event()
+
+    def describe(self) -> dict:
+        return {
+            "status": self.status,
+            "warmup_ms": self.duration_ms,
+            "rounds": WARMUP_ROUNDS,
+            "steps": self.steps,
+            "error": self.error,
+        }
+
+
+def run_warmup(state: WarmupState, steps: List[Tuple[str, Callable[[dict], object]]],
+               inputs: Optional[List[dict]] = None) -> WarmupState:
+    state.started = time.perf_counter()
+    if not WARMUP_ENABLED:
+        state.status = "ready"
+        state.duration_ms = 0.0
+        state.ready.set()
+        return state
+
+    inputs = inputs or build_warmup_inputs()
+    state.status = "warming"
+    try:
+        for name, fn in steps:
+            t0 = time.perf_counter()
+            for _ in range(WARMUP_ROUNDS):
+                for engine_input in inputs:
+                    fn(engine_input)
+            state.steps.append({"step": name, "ms": round((time.perf_counter() - t0) * 1e3, 2)})
+        state.status = "ready"
+    except Exception as exc:
+        # A broken serving path must not report ready.
+        state.status = "failed"
+        state.error = "%s: %s" % (type(exc).__name__, exc)
+        logger.exception("warm-up failed")
+    state.duration_ms = round((time.perf_counter() - state.started) * 1e3, 2)
+    logger.info("warm-up finished", extra=state.describe())
+    if state.status == "ready":
+        state.ready.set()
+    return state
+
+
+def start_warmup(state: WarmupState, steps: List[Tuple[str, Callable[[dict], object]]]) -> threading.Thread:
+    # Off the event loop so /health keeps answering while the worker warms.
+    thread = threading.Thread(target=run_warmup, args=(state, steps), name="pek-warmup", daemon=True)
+    thread.start()
+    return thread
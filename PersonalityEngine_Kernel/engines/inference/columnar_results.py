@@ -0,0 +1,271 @@
+# columnar_results.py
+# PersonaSight™ — Columnar Result Files
+# Bulk scoring output as fixed-width columns instead of rendered JSON: one
+# byte per mode / second mode / depth / theme-extras bit set, the variant code,
+# and uint8 signal levels, behind a small JSON header holding the engine
+# version and code tables. Readers map the file and view each column in
+# place; any row renders back to the standard run_inference JSON on demand.
+#
+# Layout:
+#   magic "PEKCOL01" | u32 header length | header JSON | pad to 64
+#   column 0 | pad to 64 | column 1 | ...      (offsets listed in the header)
+
+import json
+import mmap
+import os
+import shutil
+import struct
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import (
+    DEPTH_LABELS, ENGINE_VERSION, MODE_SLOTS, MODES, PICK_OPTIONS, SECOND_MODE_EXTRAS, SIGNAL_KEYS,
+    decide_inference, render_record,
+)
+from PersonalityEngine_Kernel.engines.inference.snapshot_store import NO_MODE
+
+MAGIC = b"PEKCOL01"
+HEADER_LEN = struct.Struct("<I")
+ALIGN = 64
+FORMAT_VERSION = 1
+
+# Records scored per batch by score_to_columnar, and the copy buffer used
+# when the spilled columns are joined into the final file.
+WRITE_BATCH = 65536
+SPILL_COPY_BUFFER = 1 << 20
+
+
+def _variant_dtype() -> np.dtype:
+    # Narrowest unsigned type holding every mode's mixed-radix variant code.
+    largest = max(
+        int(np.prod([len(PICK_OPTIONS[salt]) for _, salt in MODE_SLOTS[m]], dtype=np.int64))
+        for m in MODES
+    )
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if largest - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+
+# ---------------------------------------
+# WRITE
+# ---------------------------------------
+def records_to_columns(records: List[dict]) -> Dict[str, np.ndarray]:
+    mode_code = {m: i for i, m in enumerate(MODES)}
+    depth_code = {d: i for i, d in enumerate(DEPTH_LABELS)}
+    n = len(records)
+    columns = {
+        "mode": np.fromiter((mode_code[r["mode"]] for r in records), dtype=np.uint8, count=n),
+        "second_mode": np.fromiter(
+            (NO_MODE if r.get("second_mode") is None else mode_code[r["second_mode"]] for r in records),
+            dtype=np.uint8, count=n,
+        ),
+        "depth": np.fromiter((depth_code[r["depth_label"]] for r in records), dtype=np.uint8, count=n),
+        "theme_extras": np.fromiter((r.get("theme_extras", 0) for r in records), dtype=np.uint8, count=n),
+        "variant": np.fromiter((r["variant"] for r in records), dtype=_variant_dtype(), count=n),
+        "signals": np.zeros((n, len(SIGNAL_KEYS)), dtype=np.uint8),
+    }
+    signals = columns["signals"]
+    for i, r in enumerate(records):
+        levels = r.get("signals") or {}
+        signals[i] = [levels.get(k, 0) for k in SIGNAL_KEYS]
+    return columns
+
+
+class ColumnarWriter:
+    """
+    Builds a columnar result file from batches of decision records.
+
+    Each column is appended to its own spill file next to the target, so
+    memory holds one batch at a time; close() writes the header, copies the
+    columns in, and renames into place, so readers never see a partial file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.engine_version = None
+        # names, dtypes and trailing shapes, from an empty batch
+        self._template = records_to_columns([])
+        self._spill = {name: path + ".tmp." + name for name in self._template}
+        self._files = {name: open(spill, "wb") for name, spill in self._spill.items()}
+
+    def append(self, records: List[dict]) -> None:
+        versions = {r.get("engine_version", ENGINE_VERSION) for r in records}
+        if self.engine_version is not None:
+            versions.add(self.engine_version)
+        if len(versions) > 1:
+            raise ValueError("records from several engine versions: %s" % ", ".join(sorted(versions)))
+        if versions:
+            self.engine_version = versions.pop()
+        for name, arr in records_to_columns(records).items():
+            self._files[name].write(np.ascontiguousarray(arr).tobytes())
+        self.count += len(records)
+
+    def close(self) -> dict:
+        for f in self._files.values():
+            f.close()
+        layout = []
+        offset = 0
+        for name, empty in self._template.items():
+            shape = [self.count] + list(empty.shape[1:])
+            nbytes = os.path.getsize(self._spill[name])
+            layout.append({"name": name, "dtype": empty.dtype.str, "shape": shape, "offset": offset})
+            offset += nbytes + _pad(nbytes)
+        header = {
+            "format_version": FORMAT_VERSION,
+            "engine_version": self.engine_version or ENGINE_VERSION,
+            "count": self.count,
+            "modes": MODES,
+            "no_mode": NO_MODE,
+            "depth_labels": DEPTH_LABELS,
+            "signal_keys": SIGNAL_KEYS,
+            "theme_extras": [theme for _, _, _, theme in SECOND_MODE_EXTRAS],
+            "columns": layout,
+        }
+        blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        prefix = len(MAGIC) + HEADER_LEN.size + len(blob)
+
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(MAGIC)
+                f.write(HEADER_LEN.pack(len(blob)))
+                f.write(blob)
+                f.write(b"\0" * _pad(prefix))
+                for name in self._template:
+                    with open(self._spill[name], "rb") as column:
+                        shutil.copyfileobj(column, f, SPILL_COPY_BUFFER)
+                    f.write(b"\0" * _pad(os.path.getsize(self._spill[name])))
+            os.replace(tmp, self.path)
+        finally:
+            self.abort()
+        return header
+
+    def abort(self) -> None:
+        # Drops the spill files (and a half-written target temp file).
+        for f in self._files.values():
+            f.close()
+        for spill in list(self._spill.values()) + [self.path + ".tmp"]:
+            if os.path.exists(spill):
+                os.remove(spill)
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is not None:
+            self.abort()
+
+
+def write_columnar(path: str, records: List[dict]) -> dict:
+    with ColumnarWriter(path) as writer:
+        writer.append(records)
+        return writer.close()
+
+
+def score_to_columnar(path: str, engine_inputs: Iterable[dict], batch: int = WRITE_BATCH) -> dict:
+    # Scores and writes WRITE_BATCH inputs at a time, so memory does not grow
+    # with the input; engine_inputs may be a generator.
+    with ColumnarWriter(path) as writer:
+        chunk = []
+        for e in engine_inputs:
+            chunk.append(decide_inference(e))
+            if len(chunk) >= batch:
+                writer.append(chunk)
+                chunk = []
+        writer.append(chunk)
+        return writer.close()
+
+
+# ---------------------------------------
+# READ
+# ---------------------------------------
+class ColumnarResults:
+    """
+    Read-only mapped view of a columnar result file.
+
+    header        the JSON header (engine version, code tables, column layout)
+    columns       name → NumPy array viewing the mapping (no copy)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError("%s: not a columnar result file" % path)
+        (length,) = HEADER_LEN.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + HEADER_LEN.size
+        self.header = json.loads(bytes(self._map[start:start + length]))
+        if self.header.get("format_version") != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError("%s: unsupported format version %r" % (path, self.header.get("format_version")))
+        base = start + length + _pad(start + length)
+
+        self.columns: Dict[str, np.ndarray] = {}
+        for col in self.header["columns"]:
+            dtype = np.dtype(col["dtype"])
+            shape = tuple(col["shape"])
+            count = int(np.prod(shape, dtype=np.int64))
+            self.columns[col["name"]] = np.frombuffer(
+                self._map, dtype=dtype, count=count, offset=base + col["offset"]
+            ).reshape(shape)
+
+        self.engine_version: str = self.header["engine_version"]
+        self.modes: List[str] = self.header["modes"]
+        self.depth_labels: List[str] = self.header["depth_labels"]
+        self.signal_keys: List[str] = self.header["signal_keys"]
+        self.no_mode: int = self.header["no_mode"]
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def record(self, i: int) -> dict:
+        # Decision record, as decide_inference returned it.
+        c = self.columns
+        second = int(c["second_mode"][i])
+        return {
+            "engine_version": self.engine_version,
+            "mode": self.modes[c["mode"][i]],
+            "second_mode": None if second == self.no_mode else self.modes[second],
+            "depth_label": self.depth_labels[c["depth"][i]],
+            "variant": int(c["variant"][i]),
+            "theme_extras": int(c["theme_extras"][i]),
+            "signals": dict(zip(self.signal_keys, c["signals"][i].tolist())),
+        }
+
+    def to_json(self, i: int) -> dict:
+        # The standard run_inference output for row i. Rendering uses this
+        # process's phrase tables, so the file's engine version must match.
+        if self.engine_version != ENGINE_VERSION:
+            raise ValueError("file written by %s, renderer is %s" % (self.engine_version, ENGINE_VERSION))
+        return render_record(self.record(i))
+
+    def iter_json(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self.to_json(i)
+
+    def close(self) -> None:
+        self.columns = {}
+        try:
+            self._map.close()
+        except BufferError:
+            # a caller still holds a column view; the mapping closes with it
+            pass
+
+    def __enter__(self) -> "ColumnarResults":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_columnar(path: str) -> ColumnarResults:
+    return ColumnarResults(path)
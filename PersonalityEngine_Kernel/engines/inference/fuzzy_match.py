@@ -0,0 +1,275 @@
+# fuzzy_match.py
+# PersonaSight™ — Typo-Tolerant Phrase Matching
+# Trigram index over the words of the phrase bank. Misspelled answer tokens
+# ("overthikning", "responsibilty") are corrected to the bank word they were
+# meant to be before the normal substring matching runs. Only tokens sharing
+# enough trigrams with a bank word reach the edit-distance check, so the cost
+# per token is bounded by a handful of short comparisons. Each distinct token
+# of an answer is looked at once, and an answer with nothing to correct is
+# returned as it is.
+
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Optional
+
+TOKEN = re.compile(r"[a-z]+")
+
+# Tokens shorter than this are never corrected: short words sit within one
+# edit of too many other words to be safe.
+MIN_FUZZY_LENGTH = 5
+
+# Only tokens long enough to be corrected are handed to the correction callback.
+CANDIDATE_TOKEN = re.compile(r"[a-z]{%d,}" % MIN_FUZZY_LENGTH)
+
+# Tokens up to this length get at most one edit; longer ones up to max_edits.
+SHORT_TOKEN_LENGTH = 8
+
+DEFAULT_MAX_EDITS = 2
+
+CORRECTION_CACHE_SIZE = 65536
+
+
+def _trigrams(word: str) -> List[str]:
+    padded = "$" + word + "$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _deletions(word: str) -> List[str]:
+    # The word itself and every way of dropping one letter from it.
+    return [word] + [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    # Optimal string alignment distance (adjacent transposition = 1 edit).
+    # Only the diagonal band |i - j| <= limit can stay within limit, so cells
+    # outside it are never computed, and a row whose band all exceeds limit
+    # ends the search.
+    la, lb = len(a), len(b)
+    if abs(la - lb) > limit:
+        return limit + 1
+    over = limit + 1
+    prev2 = None
+    prev = [j if j <= limit else over for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        cur = [over] * (lb + 1)
+        lo = i - limit
+        if lo <= 0:
+            cur[0] = i
+            lo = 1
+        hi = min(lb, i + limit)
+        ca = a[i - 1]
+        row_min = cur[0]
+        for j in range(lo, hi + 1):
+            cb = b[j - 1]
+            v = prev[j - 1] if ca == cb else prev[j - 1] + 1
+            t = prev[j] + 1
+            if t < v:
+                v = t
+            t = cur[j - 1] + 1
+            if t < v:
+                v = t
+            if prev2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                t = prev2[j - 2] + 1
+                if t < v:
+                    v = t
+            if v > over:
+                v = over
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > limit:
+            return over
+        prev2, prev = prev, cur
+    return prev[lb]
+
+
+def within_one_edit(a: str, b: str) -> int:
+    # bounded_edit_distance(a, b, 1) without the table: skip the common
+    # prefix, then the rest must match after one substitution, insertion,
+    # deletion or adjacent swap. Returns 0, 1, or 2 for "more than one".
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return 2
+    i, n = 0, min(la, lb)
+    while i < n and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        if a[i + 1:] == b[i + 1:]:
+            return 1
+        if i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]:
+            return 1
+        return 2
+    if la > lb:
+        return 1 if a[i + 1:] == b[i:] else 2
+    return 1 if a[i:] == b[i + 1:] else 2
+
+
+def edits_within(a: str, b: str, k: int) -> int:
+    # Same result as bounded_edit_distance, found by branching instead of a
+    # table: strip the common prefix and suffix, then try each edit at the
+    # first mismatch with one edit less. Unrelated words fail within a few
+    # calls, which is most of what a correction lookup checks.
+    if k <= 1:
+        return within_one_edit(a, b) if k == 1 else (0 if a == b else 1)
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > k:
+        return k + 1
+    n = min(la, lb)
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    j = 0
+    while j < n - i and a[la - 1 - j] == b[lb - 1 - j]:
+        j += 1
+    a, b = a[i:la - j], b[i:lb - j]
+    if not a or not b:
+        return len(a) + len(b)
+    best = k + 1
+    for x, y in ((a[1:], b[1:]), (a[1:], b), (a, b[1:])):
+        d = 1 + edits_within(x, y, k - 1)
+        if d < best:
+            best = d
+    if len(a) > 1 and len(b) > 1 and a[0] == b[1] and a[1] == b[0]:
+        d = 1 + edits_within(a[2:], b[2:], k - 1)
+        if d < best:
+            best = d
+    return best
+
+
+@lru_cache(maxsize=CORRECTION_CACHE_SIZE)
+def _whole_word(token: str) -> "re.Pattern[str]":
+    return re.compile(r"(?<![a-z])%s(?![a-z])" % token)
+
+
+class TrigramPhraseIndex:
+    """
+    vocabulary   bank words eligible as corrections (len >= MIN_FUZZY_LENGTH)
+    postings     trigram -> vocabulary ids containing it
+    neighbours   word or one-letter deletion of it -> vocabulary ids; two
+                 words within one edit always share a key
+    anchors      single-word phrases of 4+ letters; a token containing one
+                 already matches exactly and is left alone
+    """
+
+    def __init__(self, phrases: Iterable[str], max_edits: int = DEFAULT_MAX_EDITS):
+        self.max_edits = max(0, int(max_edits))
+        words = set()
+        single = set()
+        for p in phrases:
+            tokens = TOKEN.findall((p or "").lower())
+            words.update(tokens)
+            if len(tokens) == 1 and tokens[0] == (p or "").lower().strip():
+                single.add(tokens[0])
+
+        self.vocabulary: List[str] = sorted(w for w in words if len(w) >= MIN_FUZZY_LENGTH)
+        self.known = frozenset(words)
+        self.anchors = tuple(sorted(w for w in single if len(w) >= 4))
+        self._anchor_pattern = re.compile("|".join(map(re.escape, self.anchors))) if self.anchors else None
+        self.postings: Dict[str, List[int]] = {}
+        self.neighbours: Dict[str, List[int]] = {}
+        self.word_trigrams: List[frozenset] = []
+        self.trigram_counts: List[int] = []
+        for wid, w in enumerate(self.vocabulary):
+            grams = frozenset(_trigrams(w))
+            self.word_trigrams.append(grams)
+            self.trigram_counts.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(wid)
+            for key in set(_deletions(w)):
+                self.neighbours.setdefault(key, []).append(wid)
+
+        self.correct_token = lru_cache(maxsize=CORRECTION_CACHE_SIZE)(self._correct_token)
+
+    def _allowed_edits(self, token: str) -> int:
+        return min(self.max_edits, 1 if len(token) <= SHORT_TOKEN_LENGTH else 2)
+
+    def _correct_token(self, token: str) -> Optional[str]:
+        if len(token) < MIN_FUZZY_LENGTH or token in self.known:
+            return None
+        if self._anchor_pattern is not None and self._anchor_pattern.search(token):
+            return None
+        k = self._allowed_edits(token)
+        if k == 0:
+            return None
+        if k == 1:
+            return self._correct_one_edit(token)
+
+        grams = set(_trigrams(token))
+        postings = self.postings
+        shared = Counter(chain.from_iterable(postings.get(g, ()) for g in grams))
+
+        # q-gram lemma: one edit (an adjacent swap included) destroys at most
+        # 4 padded trigrams, so weaker candidates cannot be within k.
+        best = None
+        size = len(token)
+        floor = len(grams) - 4 * k
+        counts = self.trigram_counts
+        for wid, n in shared.items():
+            if n < floor or n < counts[wid] - 4 * k:
+                continue
+            word = self.vocabulary[wid]
+            if abs(len(word) - size) > k:
+                continue
+            d = edits_within(token, word, k)
+            if d <= k:
+                rank = (d, -n, word)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
+
+    def _correct_one_edit(self, token: str) -> Optional[str]:
+        # Most tokens get one edit. Their candidates are a few dict lookups
+        # instead of a trigram count; ties still go to the most shared
+        # trigrams, then the word, as in _correct_token.
+        neighbours = self.neighbours
+        found = set(chain.from_iterable(neighbours.get(key, ()) for key in _deletions(token)))
+        best = None
+        grams = None
+        for wid in found:
+            word = self.vocabulary[wid]
+            if within_one_edit(token, word) != 1:
+                continue
+            if grams is None:
+                grams = set(_trigrams(token))
+            rank = (-len(grams & self.word_trigrams[wid]), word)
+            if best is None or rank < best:
+                best = rank
+        return best[1] if best else None
+
+    def corrections(self, text: str) -> Dict[str, str]:
+        out = {}
+        for token in CANDIDATE_TOKEN.findall(text):
+            fixed = self.correct_token(token)
+            if fixed is not None:
+                out[token] = fixed
+        return out
+
+    def correct(self, text: str) -> str:
+        correct_token = self.correct_token
+        tokens = CANDIDATE_TOKEN.findall(text)
+        for token in set(tokens) - self.known:
+            fixed = correct_token(token)
+            if fixed is None:
+                continue
+            # A plain replace is safe when every occurrence of the token is a
+            # whole word; otherwise only whole-word occurrences are replaced.
+            if text.count(token) == tokens.count(token):
+                text = text.replace(token, fixed)
+            else:
+                text = _whole_word(token).sub(fixed, text)
+        return text
+
+
+def build_phrase_index(bank: dict, extra_phrases: Iterable[str] = (),
+                       max_edits: int = DEFAULT_MAX_EDITS) -> TrigramPhraseIndex:
+    phrases = list(extra_phrases)
+    for conf in bank.values():
+        phrases.extend(conf.get("hits", []))
+        phrases.extend(conf.get("neg", []))
+    return TrigramPhraseIndex(phrases, max_edits=max_edits)
@@ -0,0 +1,141 @@
+# inference_trace.py
+# PersonaSight™ — Inference Trace
+# Debug-only twin of run_inference: runs the same stages one at a time, times
+# each, and explains the result (matched phrases, negation dampening, mode
+# score table, fallback, picker indices). Only imported when trace is requested,
+# so the normal path carries none of this.
+
+import time
+from typing import Dict, List, Tuple
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import (
+    BANK,
+    CORE_SIGNALS,
+    ENGINE_VERSION,
+    FUZZY_MATCHING,
+    MODE_SLOTS,
+    NEGATORS,
+    PICK_OPTIONS,
+    choose_modes,
+    clamp,
+    decode_variant,
+    encode_variant,
+    estimate_input_depth_label,
+    get_phrase_index,
+    normalize_text,
+    rank_modes,
+    render_record,
+    score_modes,
+    score_signals,
+    theme_extras_bits,
+)
+
+# BANK keys scored by score_signals, in scoring order.
+TRACED_SIGNALS = CORE_SIGNALS + ["_avoidance_freeze", "_social_harmony"]
+
+
+def _matches(text: str, phrases: List[str]) -> List[dict]:
+    # count_hits counts each phrase once, so the first offset is the one that counted.
+    out = []
+    for p in phrases:
+        if p:
+            at = text.find(p)
+            if at >= 0:
+                out.append({"phrase": p, "offset": at})
+    return out
+
+
+def explain_signals(text: str) -> Dict[str, dict]:
+    # Offsets index the normalized text (lowercased, stripped, typo-corrected).
+    generic = _matches(text, NEGATORS)
+    explained = {}
+    for key in TRACED_SIGNALS:
+        conf = BANK[key]
+        hits = _matches(text, conf["hits"])
+        domain = _matches(text, conf["neg"])
+        raw = len(hits)
+        dampened = raw
+        dampened_by = None
+        if raw > 0 and (domain or generic):
+            dampened = raw - 1
+            dampened_by = (domain or generic)[0]
+        explained[key] = {
+            "matches": hits,
+            "raw_hits": raw,
+            "negation": dampened_by,
+            "dampened_hits": dampened,
+            "level": clamp(dampened),
+        }
+    return explained
+
+
+def trace_inference_record(engine_input: dict) -> Tuple[dict, dict]:
+    # (traced result, decision record)
+    timings = {}
+    clock = time.perf_counter_ns
+    t_start = clock()
+
+    raw_text = engine_input.get("example_statement", "") or ""
+
+    t0 = clock()
+    text = normalize_text(raw_text)
+    depth_label = estimate_input_depth_label(raw_text)
+    t1 = clock()
+    signal_summary, avoid_freeze, social_harmony = score_signals(text)
+    t2 = clock()
+    scores = score_modes(signal_summary, avoid_freeze, social_harmony)
+    ranked_modes = rank_modes(scores)
+    best_mode, second_mode = choose_modes(ranked_modes, signal_summary, depth_label)
+    t3 = clock()
+    variant = encode_variant(best_mode, raw_text)
+    theme_extras = theme_extras_bits(best_mode, second_mode, signal_summary)
+    t4 = clock()
+    record = {
+        "engine_version": ENGINE_VERSION,
+        "mode": best_mode,
+        "second_mode": second_mode,
+        "depth_label": depth_label,
+        "variant": variant,
+        "theme_extras": theme_extras,
+        "signals": signal_summary,
+    }
+    result = render_record(record)
+    t5 = clock()
+
+    timings["normalize_and_depth_us"] = round((t1 - t0) / 1e3, 2)
+    timings["signals_us"] = round((t2 - t1) / 1e3, 2)
+    timings["modes_us"] = round((t3 - t2) / 1e3, 2)
+    timings["variant_us"] = round((t4 - t3) / 1e3, 2)
+    timings["render_us"] = round((t5 - t4) / 1e3, 2)
+    timings["total_us"] = round((t5 - t_start) / 1e3, 2)
+
+    picks = [
+        {"section": section, "salt": salt, "index": idx, "options": len(PICK_OPTIONS[salt])}
+        for (section, salt), idx in zip(MODE_SLOTS[best_mode], decode_variant(best_mode, variant))
+    ]
+
+    total_activity = sum(signal_summary.values())
+    result["trace"] = {
+        "normalized_length": len(text),
+        "fuzzy_corrections": get_phrase_index().corrections(raw_text.lower()) if FUZZY_MATCHING else {},
+        "signals": explain_signals(text),
+        "mode_scores": scores,
+        "ranked_modes": [[m, s] for m, s in ranked_modes],
+        "autonomy_gate_applied": signal_summary["control_orientation"] < 3,
+        "low_signal_fallback": {
+            "fired": best_mode == "LOW_SIGNAL_BASELINE",
+            "total_activity": total_activity,
+            "depth_label": depth_label,
+        },
+        "mode": best_mode,
+        "second_mode": second_mode,
+        "theme_extras": theme_extras,
+        "variant": variant,
+        "picks": picks,
+        "timings": timings,
+    }
+    return result, record
+
+
+def trace_inference(engine_input: dict) -> dict:
+    return trace_inference_record(engine_input)[0]
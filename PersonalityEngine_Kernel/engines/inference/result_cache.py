@@ -0,0 +1,293 @@
+# result_cache.py
+# PersonaSight™ — Shared Result Cache
+# Optional host-local cache for run_inference results, shared by every uvicorn
+# worker through one SQLite file in WAL mode (readers never block the writer).
+# Enabled by setting PEK_RESULT_CACHE_PATH; without it every call goes straight
+# to run_inference. Each row keeps the decision record next to the rendered
+# result, so a hit still tells callers (stats, logs) which mode was chosen.
+# The cache never fails a request: a file that cannot be opened or a row that
+# cannot be decoded is counted as an error and inference runs uncached.
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import (
+    ENGINE_VERSION, MATCH_PROFILE, decide_inference, render_record,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 50000
+
+# Results depend on the matching profile as well as the engine version.
+CACHE_VERSION = "%s/%s" % (ENGINE_VERSION, MATCH_PROFILE)
+
+# Evict in batches so most writes are a single INSERT; the table may overshoot
+# max_entries by at most one batch (1/16 of the bound, capped at 256 rows).
+EVICT_EVERY = 256
+
+# Flush per-worker counters to the shared stats table this often (seconds).
+STATS_FLUSH_INTERVAL = 5.0
+
+# After the cache file fails to open, requests skip it for this long (seconds).
+OPEN_RETRY_INTERVAL = 30.0
+
+
+def input_digest(engine_input: dict) -> str:
+    # run_inference hashes the raw text for its wording picks, so the digest
+    # must cover the exact input, not a normalized form of it.
+    canonical = json.dumps(engine_input, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SharedResultCache:
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 engine_version: str = CACHE_VERSION):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.engine_version = engine_version
+        self.worker_id = "%s:%d" % (socket.gethostname(), os.getpid())
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        self._writes_since_evict = 0
+        self._evict_every = max(1, min(EVICT_EVERY, self.max_entries // 16))
+        self._last_flush = 0.0
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " engine_version TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " record TEXT)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            if "record" not in columns:
+                # files from before records were stored; their rows read as misses
+                conn.execute("ALTER TABLE results ADD COLUMN record TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS worker_stats ("
+                " worker_id TEXT PRIMARY KEY,"
+                " hits INTEGER, misses INTEGER, writes INTEGER,"
+                " evictions INTEGER, errors INTEGER, updated REAL)"
+            )
+
+    # ---------------------------------------
+    # CONNECTIONS (one per thread)
+    # ---------------------------------------
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: an application crash never loses a committed row,
+            # and a torn write is rolled back on the next open.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    # ---------------------------------------
+    # READ / WRITE
+    # ---------------------------------------
+    def _key(self, engine_input: dict) -> str:
+        return input_digest(engine_input) + ":" + self.engine_version
+
+    def get_entry(self, engine_input: dict) -> Optional[Tuple[dict, dict]]:
+        # (rendered result, decision record); rows stored without a record miss.
+        try:
+            row = self._connection().execute(
+                "SELECT payload, record FROM results WHERE key = ?", (self._key(engine_input),)
+            ).fetchone()
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        entry = None
+        if row is not None and row[1] is not None:
+            try:
+                entry = json.loads(row[0]), json.loads(row[1])
+            except ValueError:
+                # corrupt row: a miss, and the put that follows replaces it
+                self._count("errors")
+        self._count("hits" if entry is not None else "misses")
+        self._maybe_flush_stats()
+        return entry
+
+    def get(self, engine_input: dict) -> Optional[dict]:
+        entry = self.get_entry(engine_input)
+        return entry[0] if entry is not None else None
+
+    def put(self, engine_input: dict, result: dict, record: dict) -> None:
+        # The record is required: a row without one reads as a miss.
+        payload = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        stored_record = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, engine_version, payload, created, record)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self._key(engine_input), self.engine_version, payload, time.time(), stored_record),
+                )
+            self._count("writes")
+            with self._lock:
+                self._writes_since_evict += 1
+                evict = self._writes_since_evict >= self._evict_every
+                if evict:
+                    self._writes_since_evict = 0
+            if evict:
+                self.evict()
+        except sqlite3.Error:
+            self._count("errors")
+
+    def evict(self) -> int:
+        # Oldest-first, down to max_entries; stale engine versions go first.
+        try:
+            conn = self._connection()
+            with conn:
+                removed = conn.execute(
+                    "DELETE FROM results WHERE engine_version != ?", (self.engine_version,)
+                ).rowcount
+                total = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                overflow = total - self.max_entries
+                if overflow > 0:
+                    removed += conn.execute(
+                        "DELETE FROM results WHERE key IN ("
+                        " SELECT key FROM results ORDER BY created LIMIT ?)",
+                        (overflow,),
+                    ).rowcount
+        except sqlite3.Error:
+            self._count("errors")
+            return 0
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    # ---------------------------------------
+    # STATS
+    # ---------------------------------------
+    def local_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["worker_id"] = self.worker_id
+        return stats
+
+    def _maybe_flush_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._last_flush < STATS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        self.flush_stats()
+
+    def flush_stats(self) -> None:
+        s = self.local_stats()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO worker_stats"
+                    " (worker_id, hits, misses, writes, evictions, errors, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (s["worker_id"], s["hits"], s["misses"], s["writes"],
+                     s["evictions"], s["errors"], time.time()),
+                )
+        except sqlite3.Error:
+            self._count("errors")
+
+    def stats(self) -> dict:
+        self.flush_stats()
+        workers = []
+        entries = None
+        try:
+            conn = self._connection()
+            entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            for row in conn.execute(
+                "SELECT worker_id, hits, misses, writes, evictions, errors, updated FROM worker_stats"
+            ):
+                lookups = row[1] + row[2]
+                workers.append({
+                    "worker_id": row[0], "hits": row[1], "misses": row[2], "writes": row[3],
+                    "evictions": row[4], "errors": row[5], "updated": row[6],
+                    "hit_rate": round(row[1] / lookups, 4) if lookups else 0.0,
+                })
+        except sqlite3.Error:
+            self._count("errors")
+        return {
+            "path": self.path,
+            "engine_version": self.engine_version,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "this_worker": self.local_stats(),
+            "workers": workers,
+        }
+
+
+# ---------------------------------------
+# PROCESS-WIDE INSTANCE (env configured)
+# ---------------------------------------
+_CACHE: Optional[SharedResultCache] = None
+_CACHE_LOCK = threading.Lock()
+_OPEN_ERRORS = 0
+_OPEN_RETRY_AT = 0.0
+
+
+def get_result_cache() -> Optional[SharedResultCache]:
+    # None when the cache is off, or when its file could not be opened
+    # (counted in open_errors(); retried after OPEN_RETRY_INTERVAL).
+    global _CACHE, _OPEN_ERRORS, _OPEN_RETRY_AT
+    path = os.environ.get("PEK_RESULT_CACHE_PATH")
+    if not path:
+        return None
+    if _CACHE is None or _CACHE.path != path:
+        if time.monotonic() < _OPEN_RETRY_AT:
+            return None
+        with _CACHE_LOCK:
+            if _CACHE is None or _CACHE.path != path:
+                max_entries = int(os.environ.get("PEK_RESULT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+                try:
+                    cache = SharedResultCache(path, max_entries=max_entries)
+                except sqlite3.Error as exc:
+                    _OPEN_ERRORS += 1
+                    _OPEN_RETRY_AT = time.monotonic() + OPEN_RETRY_INTERVAL
+                    logger.warning("result cache %s unavailable, running uncached: %s", path, exc)
+                    return None
+                _CACHE = cache
+                atexit.register(_CACHE.flush_stats)
+    return _CACHE
+
+
+def open_errors() -> int:
+    return _OPEN_ERRORS
+
+
+def cached_inference_record(engine_input: dict) -> Tuple[dict, str, dict]:
+    # (result, "hit" | "miss" | "disabled" | "unavailable", decision record)
+    cache = get_result_cache()
+    if cache is not None:
+        entry = cache.get_entry(engine_input)
+        if entry is not None:
+            return entry[0], "hit", entry[1]
+    record = decide_inference(engine_input)
+    result = render_record(record)
+    if cache is None:
+        return result, "unavailable" if os.environ.get("PEK_RESULT_CACHE_PATH") else "disabled", record
+    cache.put(engine_input, result, record)
+    return result, "miss", record
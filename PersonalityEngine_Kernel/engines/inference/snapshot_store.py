@@ -0,0 +1,331 @@
+# snapshot_store.py
+# PersonaSight™ — Persistent Snapshot Store
+# Opt-in (PEK_SNAPSHOT_DIR). Stores the compact decision record from
+# decide_inference — mode, variant code, depth label, engine version; never the
+# answers — in an append-only log, plus a memory-mapped offset index so
+# GET /report/{id} re-renders in O(1) without running inference.
+#
+# Files (in PEK_SNAPSHOT_DIR):
+#   snapshots.log   frames of  u32 length | u32 crc32 | payload
+#   snapshots.idx   u64 log offset per sequence number (0 = removed)
+# The index is derived data: a missing or stale index is rebuilt from the log.
+# Nothing expires on its own: run engine_runtime/compact_snapshots.py (e.g. a
+# daily cron) to drop records past the retention period via compact().
+
+import fcntl
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engines.inference.inference_engine import DEPTH_LABELS, MODES
+
+LOG_NAME = "snapshots.log"
+INDEX_NAME = "snapshots.idx"
+
+FRAME = struct.Struct("<II")            # payload length, crc32
+RECORD = struct.Struct("<Qd8sBBBBIB")   # seq, created, token, mode, second, depth, extras, variant, version len
+INDEX_ENTRY = struct.Struct("<Q")
+LOG_HEADER = b"PEKSNAP1"                # offset 0 is never a record, so 0 marks "removed" in the index
+
+NO_MODE = 255
+
+
+class SnapshotStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._log = None
+        self._index = None
+        self._index_map = None
+        self._mapped_entries = 0
+        self._inodes = None
+        with self._lock:
+            self._open()
+            self._exclusive(self._recover)
+
+    # ---------------------------------------
+    # FILES / LOCKING
+    # ---------------------------------------
+    def _open(self) -> None:
+        self._close()
+        # O_APPEND: every frame lands at the current end, whoever wrote last
+        fd = os.open(self.log_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        self._log = os.fdopen(fd, "r+b", buffering=0)
+        fd = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._index = os.fdopen(fd, "r+b", buffering=0)
+        self._inodes = (os.fstat(self._log.fileno()).st_ino, os.fstat(self._index.fileno()).st_ino)
+        self._remap()
+
+    def _close(self) -> None:
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        for f in (self._log, self._index):
+            if f is not None:
+                f.close()
+        self._log = self._index = None
+        self._mapped_entries = 0
+
+    def _remap(self) -> None:
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        size = os.fstat(self._index.fileno()).st_size
+        self._mapped_entries = size // INDEX_ENTRY.size
+        if size:
+            self._index_map = mmap.mmap(self._index.fileno(), size, access=mmap.ACCESS_READ)
+
+    def _stale(self) -> bool:
+        # compaction in another process replaces both files
+        try:
+            return (os.stat(self.log_path).st_ino, os.stat(self.index_path).st_ino) != self._inodes
+        except FileNotFoundError:
+            return True
+
+    def _exclusive(self, fn, *args):
+        # Cross-process writer lock on the log; caller holds self._lock.
+        fcntl.flock(self._log.fileno(), fcntl.LOCK_EX)
+        try:
+            if self._stale():
+                fcntl.flock(self._log.fileno(), fcntl.LOCK_UN)
+                self._open()
+                fcntl.flock(self._log.fileno(), fcntl.LOCK_EX)
+            return fn(*args)
+        finally:
+            fcntl.flock(self._log.fileno(), fcntl.LOCK_UN)
+
+    # ---------------------------------------
+    # RECORD ENCODING
+    # ---------------------------------------
+    @staticmethod
+    def _encode(seq: int, token: bytes, record: dict, created: float) -> bytes:
+        version = record["engine_version"].encode("utf-8")
+        second = record.get("second_mode")
+        payload = RECORD.pack(
+            seq, created, token,
+            MODES.index(record["mode"]),
+            MODES.index(second) if second in MODES else NO_MODE,
+            DEPTH_LABELS.index(record["depth_label"]),
+            int(record.get("theme_extras", 0)),
+            int(record["variant"]),
+            len(version),
+        ) + version
+        return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+    @staticmethod
+    def _decode(payload: bytes) -> Tuple[int, bytes, dict]:
+        seq, created, token, mode, second, depth, extras, variant, vlen = RECORD.unpack_from(payload)
+        version = payload[RECORD.size:RECORD.size + vlen].decode("utf-8")
+        return seq, token, {
+            "engine_version": version,
+            "mode": MODES[mode],
+            "second_mode": MODES[second] if second != NO_MODE else None,
+            "depth_label": DEPTH_LABELS[depth],
+            "theme_extras": extras,
+            "variant": variant,
+            "created": created,
+        }
+
+    def _read_frame(self, offset: int) -> Optional[bytes]:
+        header = os.pread(self._log.fileno(), FRAME.size, offset)
+        if len(header) < FRAME.size:
+            return None
+        length, crc = FRAME.unpack(header)
+        if length < RECORD.size:
+            return None
+        payload = os.pread(self._log.fileno(), length, offset + FRAME.size)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return None
+        return payload
+
+    # ---------------------------------------
+    # RECOVERY (under exclusive lock)
+    # ---------------------------------------
+    def _recover(self) -> None:
+        log_size = os.fstat(self._log.fileno()).st_size
+        if log_size == 0:
+            os.write(self._log.fileno(), LOG_HEADER)
+            log_size = len(LOG_HEADER)
+
+        # Resume from the last indexed record if it is intact, else rescan.
+        entries = self._mapped_entries
+        offset = len(LOG_HEADER)
+        if entries:
+            last = INDEX_ENTRY.unpack_from(self._index_map, (entries - 1) * INDEX_ENTRY.size)[0]
+            payload = self._read_frame(last) if last else None
+            if payload is not None and RECORD.unpack_from(payload)[0] == entries - 1:
+                offset = last + FRAME.size + len(payload)
+            else:
+                entries = 0
+
+        index_updates = {}
+        while offset < log_size:
+            payload = self._read_frame(offset)
+            if payload is None:
+                # torn tail from a crashed append: drop it
+                os.truncate(self._log.fileno(), offset)
+                break
+            index_updates[RECORD.unpack_from(payload)[0]] = offset
+            offset += FRAME.size + len(payload)
+
+        if entries == 0 and self._mapped_entries:
+            # index could not be trusted: rebuild it from scratch
+            os.truncate(self._index.fileno(), 0)
+        if index_updates:
+            size = max(index_updates) + 1
+            current = os.fstat(self._index.fileno()).st_size // INDEX_ENTRY.size
+            if size > current:
+                os.truncate(self._index.fileno(), size * INDEX_ENTRY.size)
+            for seq, off in index_updates.items():
+                os.pwrite(self._index.fileno(), INDEX_ENTRY.pack(off), seq * INDEX_ENTRY.size)
+        self._remap()
+
+    # ---------------------------------------
+    # APPEND
+    # ---------------------------------------
+    def _append_locked(self, records: List[dict], created: float) -> List[str]:
+        seq = os.fstat(self._index.fileno()).st_size // INDEX_ENTRY.size
+        offset = os.fstat(self._log.fileno()).st_size
+        frames, index_bytes, ids = [], [], []
+        for record in records:
+            token = secrets.token_bytes(8)
+            frame = self._encode(seq, token, record, created)
+            frames.append(frame)
+            index_bytes.append(INDEX_ENTRY.pack(offset))
+            ids.append("%x-%s" % (seq, token.hex()))
+            offset += len(frame)
+            seq += 1
+        # log first, then index: a crash in between is repaired by _recover
+        os.write(self._log.fileno(), b"".join(frames))
+        os.fsync(self._log.fileno())
+        os.pwrite(self._index.fileno(), b"".join(index_bytes),
+                  os.fstat(self._index.fileno()).st_size)
+        return ids
+
+    def append_many(self, records: Iterable[dict]) -> List[str]:
+        records = list(records)
+        if not records:
+            return []
+        with self._lock:
+            return self._exclusive(self._append_locked, records, time.time())
+
+    def append(self, record: dict) -> str:
+        return self.append_many([record])[0]
+
+    # ---------------------------------------
+    # LOOKUP (O(1): index slot → one pread)
+    # ---------------------------------------
+    @staticmethod
+    def _parse_id(snapshot_id: str) -> Optional[Tuple[int, bytes]]:
+        try:
+            seq_hex, token_hex = snapshot_id.split("-", 1)
+            token = bytes.fromhex(token_hex)
+            seq = int(seq_hex, 16)
+        except (ValueError, AttributeError):
+            return None
+        if len(token) != 8 or seq < 0:
+            return None
+        return seq, token
+
+    def get(self, snapshot_id: str) -> Optional[dict]:
+        parsed = self._parse_id(snapshot_id)
+        if parsed is None:
+            return None
+        seq, token = parsed
+        with self._lock:
+            if seq >= self._mapped_entries or self._stale():
+                if self._stale():
+                    self._open()
+                else:
+                    self._remap()
+            if seq >= self._mapped_entries:
+                return None
+            offset = INDEX_ENTRY.unpack_from(self._index_map, seq * INDEX_ENTRY.size)[0]
+            if offset == 0:
+                return None
+            payload = self._read_frame(offset)
+        if payload is None:
+            return None
+        stored_seq, stored_token, record = self._decode(payload)
+        if stored_seq != seq or not secrets.compare_digest(stored_token, token):
+            return None
+        return record
+
+    # ---------------------------------------
+    # RETENTION COMPACTION
+    # ---------------------------------------
+    def _compact_locked(self, cutoff: float) -> dict:
+        tmp_log = self.log_path + ".compact"
+        tmp_index = self.index_path + ".compact"
+        entries = os.fstat(self._index.fileno()).st_size // INDEX_ENTRY.size
+        kept = removed = 0
+        with open(tmp_log, "wb") as log_out, open(tmp_index, "wb") as index_out:
+            log_out.write(LOG_HEADER)
+            offset = len(LOG_HEADER)
+            index_out.truncate(entries * INDEX_ENTRY.size)
+            for seq in range(entries):
+                old = INDEX_ENTRY.unpack(os.pread(self._index.fileno(), INDEX_ENTRY.size, seq * INDEX_ENTRY.size))[0]
+                payload = self._read_frame(old) if old else None
+                if payload is None:
+                    continue
+                if RECORD.unpack_from(payload)[1] < cutoff:
+                    removed += 1
+                    continue
+                frame = FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+                log_out.write(frame)
+                index_out.seek(seq * INDEX_ENTRY.size)
+                index_out.write(INDEX_ENTRY.pack(offset))
+                offset += len(frame)
+                kept += 1
+            log_out.flush()
+            os.fsync(log_out.fileno())
+            index_out.flush()
+            os.fsync(index_out.fileno())
+        # Sequence numbers are preserved, so ids stay valid. A crash between
+        # the two renames leaves an index that _recover detects and rebuilds.
+        os.replace(tmp_log, self.log_path)
+        os.replace(tmp_index, self.index_path)
+        return {"kept": kept, "removed": removed}
+
+    def compact(self, retention_seconds: float) -> dict:
+        cutoff = time.time() - retention_seconds
+        with self._lock:
+            result = self._exclusive(self._compact_locked, cutoff)
+            self._open()
+            self._exclusive(self._recover)
+        return result
+
+    def __len__(self) -> int:
+        with self._lock:
+            return os.fstat(self._index.fileno()).st_size // INDEX_ENTRY.size
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+# ---------------------------------------
+# PROCESS-WIDE INSTANCE (env configured)
+# ---------------------------------------
+_STORE: Optional[SnapshotStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    global _STORE
+    directory = os.environ.get("PEK_SNAPSHOT_DIR")
+    if not directory:
+        return None
+    if _STORE is None or _STORE.directory != directory:
+        with _STORE_LOCK:
+            if _STORE is None or _STORE.directory != directory:
+                _STORE = SnapshotStore(directory)
+    return _STORE
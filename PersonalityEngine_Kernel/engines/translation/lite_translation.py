@@ -2,132 +2,180 @@
 PEK Lite Translation Layer
 Deterministic interpretation of kernel output into plain language.
 Micro-step: populate all Lite fields, finalizing Lite v0.4.x.
+
+The output depends only on a small discrete key (coherence, orientation,
+motive, confidence bucket, empty conflict / stress), so translation is a key
+extraction followed by a memoized lookup of prebuilt, immutable results.
 """
 
-def translate_lite(kernel_output: dict) -> dict:
-    if not isinstance(kernel_output, dict):
-        return {
-            "orientation_snapshot": "",
-            "real_world_signals": [],
-            "strengths": [],
-            "common_misinterpretations": [],
-            "reflection_prompts": []
-        }
-
-    # --- Extract fields from current kernel schema ---
-    global_orientation = kernel_output.get("global_orientation", "Unknown")
-    dominant_motive = kernel_output.get("dominant_motive", "Unclear")
-    confidence_score = kernel_output.get("confidence_score", None)
-
-    conflict_patterns = kernel_output.get("conflict_patterns", {})
-    stress_profile = kernel_output.get("stress_profile", {})
-
-    identity_coherence = kernel_output.get("identity_coherence", {}) or {}
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# --- Coherence key values ---
+COHERENT = "coherent"
+TENSION = "tension"
+UNORGANIZED = "unorganized"
+
+# --- Confidence buckets ---
+CONFIDENCE_LOW = "low"            # < 0.35
+CONFIDENCE_MODERATE = "moderate"  # < 0.6
+CONFIDENCE_STRONG = "strong"      # otherwise
+
+# LRU bound for keys carrying open-ended orientation / motive / description text.
+TRANSLATION_CACHE_SIZE = 4096
+
+# ---------------------------------------
+# PREBUILT FRAGMENTS
+# ---------------------------------------
+COHERENCE_SENTENCES = {
+    COHERENT: "Your responses suggest your internal motivation is generally consistent rather than fragmented.",
+    TENSION: "Your responses suggest some internal tension or inconsistency in how motivation is organizing right now.",
+    UNORGANIZED: "Your responses suggest a system that is still organizing its motivational pattern from the available signal.",
+}
+
+CONFIDENCE_SENTENCES = {
+    CONFIDENCE_LOW: "Confidence is currently low, which usually means the system needs more detail to sharpen the read.",
+    CONFIDENCE_MODERATE: "Confidence is moderate, meaning the pattern is present but could sharpen with slightly more input.",
+    CONFIDENCE_STRONG: "Confidence is strong, meaning the pattern is clear and consistent across your responses.",
+}
+
+SIGNAL_HESITATE = "You may hesitate to act until things feel internally clearer or more certain."
+SIGNAL_AVOID_CONFLICT = "You may avoid engaging in conflict unless it feels unavoidable or especially meaningful."
+SIGNAL_PULL_BACK = "Under pressure, you are more likely to pull back and think quietly rather than react outwardly."
+
+STRENGTH_COHERENT = "Internally consistent motivation rather than contradictory or fragmented drives."
+STRENGTH_PAUSE = "Capacity to pause and reflect before acting instead of reacting impulsively."
+STRENGTH_PRESERVE = "Tendency to preserve emotional energy by avoiding unnecessary confrontation."
+
+COMMON_MISINTERPRETATIONS = (
+    "This pattern is often mistaken for indecision or lack of drive.",
+    "In reality, it reflects a system that waits for internal alignment before committing energy.",
+)
+
+REFLECTION_PROMPTS = (
+    "Notice what conditions tend to increase your sense of internal clarity versus uncertainty.",
+    "Pay attention to moments when waiting helps you act more deliberately — and when it slows momentum.",
+)
+
+# (confidence is low, conflict_patterns == {}, stress_profile == {}) → signals
+REAL_WORLD_SIGNALS = {
+    (low, no_conflict, no_stress): tuple(
+        s for s, on in (
+            (SIGNAL_HESITATE, low),
+            (SIGNAL_AVOID_CONFLICT, no_conflict),
+            (SIGNAL_PULL_BACK, no_stress),
+        ) if on
+    )
+    for low in (False, True)
+    for no_conflict in (False, True)
+    for no_stress in (False, True)
+}
+
+# (coherent, conflict_patterns == {}) → strengths
+STRENGTHS = {
+    (coherent, no_conflict): tuple(
+        s for s, on in (
+            (STRENGTH_COHERENT, coherent),
+            (STRENGTH_PAUSE, True),
+            (STRENGTH_PRESERVE, no_conflict),
+        ) if on
+    )
+    for coherent in (False, True)
+    for no_conflict in (False, True)
+}
+
+EMPTY_RESULT = (
+    "",
+    (),
+    (),
+    (),
+    (),
+)
+
+TranslationKey = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str], bool, bool]
+
+
+# ---------------------------------------
+# KEY EXTRACTION
+# ---------------------------------------
+def _confidence_bucket(confidence_score) -> Optional[str]:
+    if not isinstance(confidence_score, (int, float)):
+        return None
+    if confidence_score < 0.35:
+        return CONFIDENCE_LOW
+    if confidence_score < 0.6:
+        return CONFIDENCE_MODERATE
+    return CONFIDENCE_STRONG
+
+
+def _known(value, unknown: str) -> Optional[str]:
+    if isinstance(value, str) and value and value != unknown:
+        return value.lower()
+    return None
+
+
+def translation_key(kernel_output: dict) -> TranslationKey:
+    get = kernel_output.get
+    identity_coherence = get("identity_coherence", {}) or {}
     coherence_state = identity_coherence.get("state", "")
-    coherence_description = identity_coherence.get("description", "")
-
-    # --- Build orientation_snapshot ---
-    parts = []
 
+    description = None
     if coherence_state == "coherent":
-        if coherence_description:
-            parts.append(coherence_description)
-        else:
-            parts.append(
-                "Your responses suggest your internal motivation is generally consistent rather than fragmented."
-            )
+        coherence = COHERENT
+        description = identity_coherence.get("description", "") or None
     elif coherence_state:
-        parts.append(
-            "Your responses suggest some internal tension or inconsistency in how motivation is organizing right now."
-        )
+        coherence = TENSION
     else:
-        parts.append(
-            "Your responses suggest a system that is still organizing its motivational pattern from the available signal."
-        )
-
-    if isinstance(global_orientation, str) and global_orientation and global_orientation != "Unknown":
-        parts.append(f"Overall orientation trends toward {global_orientation.lower()}.")
-
-    if isinstance(dominant_motive, str) and dominant_motive and dominant_motive != "Unclear":
-        parts.append(f"Dominant motive appears centered on {dominant_motive.lower()}.")
-
-    if isinstance(confidence_score, (int, float)):
-        if confidence_score < 0.35:
-            parts.append(
-                "Confidence is currently low, which usually means the system needs more detail to sharpen the read."
-            )
-        elif confidence_score < 0.6:
-            parts.append(
-                "Confidence is moderate, meaning the pattern is present but could sharpen with slightly more input."
-            )
-        else:
-            parts.append(
-                "Confidence is strong, meaning the pattern is clear and consistent across your responses."
-            )
-
-    orientation_snapshot = " ".join([p.strip() for p in parts if p and p.strip()])
-
-    # --- Build real_world_signals ---
-    real_world_signals = []
-
-    if isinstance(confidence_score, (int, float)) and confidence_score < 0.35:
-        real_world_signals.append(
-            "You may hesitate to act until things feel internally clearer or more certain."
-        )
-
-    if conflict_patterns == {}:
-        real_world_signals.append(
-            "You may avoid engaging in conflict unless it feels unavoidable or especially meaningful."
-        )
-
-    if stress_profile == {}:
-        real_world_signals.append(
-            "Under pressure, you are more likely to pull back and think quietly rather than react outwardly."
-        )
-
-    # --- Build strengths ---
-    strengths = []
-
-    if coherence_state == "coherent":
-        strengths.append(
-            "Internally consistent motivation rather than contradictory or fragmented drives."
-        )
-
-    strengths.append(
-        "Capacity to pause and reflect before acting instead of reacting impulsively."
+        coherence = UNORGANIZED
+
+    return (
+        coherence,
+        description,
+        _known(get("global_orientation", "Unknown"), "Unknown"),
+        _known(get("dominant_motive", "Unclear"), "Unclear"),
+        _confidence_bucket(get("confidence_score", None)),
+        get("conflict_patterns", {}) == {},
+        get("stress_profile", {}) == {},
     )
 
-    if conflict_patterns == {}:
-        strengths.append(
-            "Tendency to preserve emotional energy by avoiding unnecessary confrontation."
-        )
 
-    # --- Build common_misinterpretations ---
-    common_misinterpretations = []
-
-    common_misinterpretations.append(
-        "This pattern is often mistaken for indecision or lack of drive."
-    )
+# ---------------------------------------
+# MEMOIZED BUILD
+# ---------------------------------------
+@lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+def build_translation(key: TranslationKey) -> tuple:
+    coherence, description, orientation, motive, bucket, no_conflict, no_stress = key
+
+    parts = [description if description else COHERENCE_SENTENCES[coherence]]
+    if orientation is not None:
+        parts.append(f"Overall orientation trends toward {orientation}.")
+    if motive is not None:
+        parts.append(f"Dominant motive appears centered on {motive}.")
+    if bucket is not None:
+        parts.append(CONFIDENCE_SENTENCES[bucket])
+    orientation_snapshot = " ".join([p.strip() for p in parts if p and p.strip()])
 
-    common_misinterpretations.append(
-        "In reality, it reflects a system that waits for internal alignment before committing energy."
+    return (
+        orientation_snapshot,
+        REAL_WORLD_SIGNALS[(bucket == CONFIDENCE_LOW, no_conflict, no_stress)],
+        STRENGTHS[(coherence == COHERENT, no_conflict)],
+        COMMON_MISINTERPRETATIONS,
+        REFLECTION_PROMPTS,
     )
 
-    # --- Build reflection_prompts (observational only) ---
-    reflection_prompts = []
 
-    reflection_prompts.append(
-        "Notice what conditions tend to increase your sense of internal clarity versus uncertainty."
-    )
-
-    reflection_prompts.append(
-        "Pay attention to moments when waiting helps you act more deliberately — and when it slows momentum."
-    )
+def translate_lite(kernel_output: dict) -> dict:
+    if not isinstance(kernel_output, dict):
+        built = EMPTY_RESULT
+    else:
+        built = build_translation(translation_key(kernel_output))
 
+    # Cached tuples are shared; callers always get their own lists.
+    snapshot, signals, strengths, misinterpretations, prompts = built
     return {
-        "orientation_snapshot": orientation_snapshot,
-        "real_world_signals": real_world_signals,
-        "strengths": strengths,
-        "common_misinterpretations": common_misinterpretations,
-        "reflection_prompts": reflection_prompts
+        "orientation_snapshot": snapshot,
+        "real_world_signals": [*signals],
+        "strengths": [*strengths],
+        "common_misinterpretations": [*misinterpretations],
+        "reflection_prompts": [*prompts]
     }
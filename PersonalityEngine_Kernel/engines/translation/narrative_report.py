@@ -0,0 +1,388 @@
+"""
+PEK Narrative Report
+Long-form report sections from narrative_templates.json, laid out by
+report_structure.json, filled from one kernel_vector output.
+
+Templates are compiled once at kernel load: every {{placeholder}} becomes a
+positional field of a prebuilt format string, and every placeholder must
+have a source below or compilation fails. Per request the slot values are
+computed once and each section is a single join of formatted paragraphs.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PersonalityEngine_Kernel.engine_runtime.engine_loader import assemble_engine
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+# report_structure.json section → narrative_templates.json templates.
+# full_narrative takes its template list from output_schema.json.
+SECTION_TEMPLATES = {
+    "summary": ("overall_personality_summary",),
+    "core_motives": ("core_motive_narrative",),
+    "conflict_patterns": ("conflict_profile_narrative",),
+    "stress_profile": ("stress_state_narrative",),
+    "identity_structure": ("identity_formation_narrative",),
+    "relational_dynamics": ("relational_dynamics_narrative",),
+}
+
+# Rendered only when the conflict engine fired for the request.
+CONFLICT_TEMPLATES = frozenset({"conflict_profile_narrative"})
+
+STRESS_SIGNALS = (
+    "STRESS_SPIKE", "STRESS_MODERATE", "THREAT_HIGH", "DANGER_SENSITIVITY",
+    "PERFORMANCE_ANXIETY", "REJECTION_FEAR", "SELF_PROTECTIVE_WITHDRAWAL",
+)
+
+# First active signal decides the relational conflict response.
+RELATIONAL_CONFLICT_SIGNALS = (
+    ("CONFLICT_AVOIDANCE", "avoiding confrontation to keep closeness intact"),
+    ("SELF_PROTECTIVE_WITHDRAWAL", "withdrawing until it feels safe to re-engage"),
+    ("CONFRONTATION_TENSION", "bracing for confrontation and holding tension inside"),
+    ("AUTONOMY_DEFENSE", "defending personal independence"),
+    ("APPROVAL_SEEKING", "accommodating others to restore approval"),
+)
+RELATIONAL_CONFLICT_DEFAULT = "working through disagreement directly"
+
+# ---------------------------------------
+# PREBUILT FRAGMENTS (by dominant dimension; None = no dimension active)
+# ---------------------------------------
+GLOBAL_ORIENTATION = {
+    "D1": "safety-first configuration",
+    "D2": "reward-driven configuration",
+    "D3": "harmony-regulating configuration",
+    "D4": "identity-anchored configuration",
+    "D5": "emotion-led configuration",
+    None: "balanced, low-signal configuration",
+}
+
+STRESS_EXPRESSION = {
+    "D1": "guarding against loss and tightening control over what feels uncertain",
+    "D2": "pushing harder for results or retreating into what feels comfortable",
+    "D3": "withdrawing from friction or holding boundaries more rigidly",
+    "D4": "seeking reassurance about who they are and how they are seen",
+    "D5": "suppressing feelings or releasing them in sudden bursts",
+    None: "no clearly defined pattern yet",
+}
+
+SAFETY_SIGNALS = {
+    "D1": "predictability and a sense of control",
+    "D2": "achievable goals and steady recognition",
+    "D3": "calm, low-conflict interactions",
+    "D4": "acceptance that does not depend on performance",
+    "D5": "room to name and settle emotions",
+    None: "stability and time",
+}
+
+IDENTITY_AXIS = {
+    "D1": "the need to stay safe",
+    "D2": "what they achieve and earn",
+    "D3": "how they handle friction with others",
+    "D4": "how consistently they can define themselves",
+    "D5": "how they experience and manage emotion",
+    None: "a sense of self that is still taking shape",
+}
+IDENTITY_AXIS_FRAGILE = "an unsettled sense of self"
+
+IDENTITY_INTERPRETATION = {
+    "D1": "vigilance toward potential threats",
+    "D2": "opportunity and progress",
+    "D3": "the cost of conflict",
+    "D4": "questions of belonging and self-definition",
+    "D5": "emotional meaning",
+    None: "an open, still-forming perspective",
+}
+
+RELATIONAL_STYLE = {
+    "D1": "cautious, trust-testing",
+    "D2": "goal-sharing, engagement-seeking",
+    "D3": "harmony-preserving",
+    "D4": "recognition-sensitive",
+    "D5": "emotionally attuned",
+    None: "still-forming",
+}
+
+INTEGRATION_PATHWAYS = {
+    "D1": "building tolerance for uncertainty",
+    "D2": "pacing effort against recovery",
+    "D3": "practising direct, low-stakes disagreement",
+    "D4": "grounding self-worth in values rather than approval",
+    "D5": "naming emotions before acting on them",
+    None: "gathering more detail about their patterns",
+}
+
+STRESS_PROFILE_LEVELS = (
+    (0.6, "rapid, threat-focused reactions"),
+    (0.3, "heightened vigilance and a narrower focus"),
+    (0.0, "a mostly steady baseline"),
+)
+
+TRIGGER_CONDITIONS = {
+    "approach_avoidance": "the wish to move toward a goal meets fear of what it may cost",
+    "identity_survival_clash": "the need for safety collides with the need to express who they are",
+    "emotional_block_vs_logic": "strong emotion crowds out deliberate reasoning",
+    "self_concept_ambivalence": "competing stories about who they are pull in different directions",
+}
+
+NO_CONFLICT_PAIR = "everyday competing demands"
+NO_MARKERS = "patterns that are not yet consistent"
+
+
+def _humanize(name: str) -> str:
+    return name.replace("_", " ").replace("-", " ").lower()
+
+
+def _series(items: List[str]) -> str:
+    if len(items) <= 1:
+        return "".join(items)
+    return ", ".join(items[:-1]) + " and " + items[-1]
+
+
+def _sentence_text(notes: str) -> str:
+    return notes.strip().rstrip(".")[:1].lower() + notes.strip().rstrip(".")[1:]
+
+
+# ---------------------------------------
+# PER-REQUEST PROFILE
+# ---------------------------------------
+class NarrativeProfile:
+    # What the sources read, derived once from a kernel_vector output.
+    __slots__ = ("top", "signals", "stress", "stress_state", "flags", "confidence", "conflicts")
+
+    def __init__(self, kernel_vector: dict):
+        dims = kernel_vector.get("dimension_vector") or {}
+        top = max(dims, key=dims.get) if dims else None
+        self.top = top if top is not None and dims[top] > 0 else None
+        levels = kernel_vector.get("signal_levels") or {}
+        self.signals = sorted(levels, key=lambda s: -levels[s])
+        self.stress = kernel_vector.get("stress_level") or 0.0
+        override = kernel_vector.get("stress_override") or {}
+        self.stress_state = override.get("stress_state")
+        validation = kernel_vector.get("validation") or {}
+        self.flags = validation.get("flags") or []
+        self.confidence = validation.get("adjusted_confidence")
+        self.conflicts = kernel_vector.get("conflict_patterns") or {}
+
+
+Source = Callable[[NarrativeProfile], str]
+
+
+def build_sources(engine: dict) -> Dict[str, Source]:
+    # placeholder → value; reads the motive modules and conflict_engine.json once.
+    modules = engine.get("modules", {})
+    motives = dict(modules.get("motives", {}))
+    motives.update(motives.get("modules", {}).get("motives", {}))
+    behaviors = {
+        name.split("_", 1)[0]: [m["behaviors"][0] for m in spec.get("motives", {}).values() if m.get("behaviors")]
+        for name, spec in motives.items() if name.endswith("_motives")
+    }
+    identity_motives = motives.get("D4_motives", {}).get("motives", {})
+    dimension_names = {
+        spec["id"]: _humanize(name)
+        for name, spec in engine.get("kernel", {}).get("kernel_structural_v1", {}).get("dimensions", {}).items()
+        if isinstance(spec, dict) and "id" in spec
+    }
+    pathways = engine.get("engines", {}).get("interpretation", {}).get("conflict_engine", {}) \
+        .get("conflict_resolution_patterns", {})
+
+    def dominant_motive(p):
+        return dimension_names.get(p.top, "no single dominant motive")
+
+    def behavioral_markers(p):
+        if p.top in behaviors:
+            return _series(behaviors[p.top][:3])
+        return _series([_humanize(s) for s in p.signals[:3]]) or NO_MARKERS
+
+    def conflict_pair(p):
+        origins = []
+        for found in p.conflicts.get("conflict_origins", {}).values():
+            origins.extend(dimension_names.get(o) or _humanize(o) for o in found)
+        origins = list(dict.fromkeys(origins))
+        return _series(origins[:2]) if len(origins) >= 2 else NO_CONFLICT_PAIR
+
+    def trigger_conditions(p):
+        points = p.conflicts.get("conflict_points") or []
+        if not points:
+            return "demands compete for the same time and energy"
+        return TRIGGER_CONDITIONS.get(points[0], _humanize(points[0]))
+
+    def resolution_mapping(p):
+        found = p.conflicts.get("resolution_pathways") or []
+        if not found:
+            return INTEGRATION_PATHWAYS[p.top]
+        notes = pathways.get(found[0], {}).get("notes")
+        return "a %s%s" % (_humanize(found[0]), ", " + _sentence_text(notes) if notes else "")
+
+    def stress_profile(p):
+        if p.stress_state:
+            return "a %s state" % _humanize(p.stress_state)
+        return next(text for floor, text in STRESS_PROFILE_LEVELS if p.stress >= floor)
+
+    def stress_behaviors(p):
+        active = [_humanize(s) for s in p.signals if s in STRESS_SIGNALS]
+        return _series(active[:3]) if active else STRESS_EXPRESSION[p.top]
+
+    def identity_dominant_axis(p):
+        return IDENTITY_AXIS_FRAGILE if "identity_fragility" in p.flags else IDENTITY_AXIS[p.top]
+
+    def identity_adaptations(p):
+        motive = "validation_seeking" if "identity_fragility" in p.flags else "internal_alignment"
+        return _series(identity_motives.get(motive, {}).get("behaviors", [])[:2]) or "adapting to circumstances"
+
+    def relational_conflict_response(p):
+        active = set(p.signals)
+        return next((text for s, text in RELATIONAL_CONFLICT_SIGNALS if s in active), RELATIONAL_CONFLICT_DEFAULT)
+
+    def integration_pathways(p):
+        return resolution_mapping(p) if p.conflicts else INTEGRATION_PATHWAYS[p.top]
+
+    def confidence_score(p):
+        return "%.2f" % p.confidence if isinstance(p.confidence, (int, float)) else "unavailable"
+
+    return {
+        "dominant_motive": dominant_motive,
+        "behavioral_markers": behavioral_markers,
+        "stress_expression": lambda p: STRESS_EXPRESSION[p.top],
+        "conflict_pair": conflict_pair,
+        "trigger_conditions": trigger_conditions,
+        "resolution_mapping": resolution_mapping,
+        "stress_profile": stress_profile,
+        "stress_behaviors": stress_behaviors,
+        "safety_signals": lambda p: SAFETY_SIGNALS[p.top],
+        "identity_dominant_axis": identity_dominant_axis,
+        "identity_interpretation": lambda p: IDENTITY_INTERPRETATION[p.top],
+        "identity_adaptations": identity_adaptations,
+        "relational_style": lambda p: RELATIONAL_STYLE[p.top],
+        "relational_conflict_response": relational_conflict_response,
+        "global_orientation": lambda p: GLOBAL_ORIENTATION[p.top],
+        "integration_pathways": integration_pathways,
+        "confidence_score": confidence_score,
+    }
+
+
+# ---------------------------------------
+# TEMPLATE COMPILER
+# ---------------------------------------
+def compile_template(name: str, sentences: List[str], slots: Dict[str, int],
+                     sources: Dict[str, Source], prefix: str = "") -> str:
+    # One format string per template: literals with braces escaped, and each
+    # {{placeholder}} replaced by {i}, its index in the shared slot table.
+    text = " ".join(sentences)
+    parts, pos = [prefix], 0
+    for m in PLACEHOLDER.finditer(text):
+        literal = text[pos:m.start()]
+        if "{{" in literal or "}}" in literal:
+            raise ValueError("%s: malformed placeholder in %r" % (name, literal))
+        key = m.group(1)
+        if key not in sources:
+            raise ValueError("%s: no source for placeholder {{%s}}" % (name, key))
+        if key not in slots:
+            slots[key] = len(slots)
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        parts.append("{%d}" % slots[key])
+        pos = m.end()
+    tail = text[pos:]
+    if "{{" in tail or "}}" in tail:
+        raise ValueError("%s: malformed placeholder in %r" % (name, tail))
+    parts.append(tail.replace("{", "{{").replace("}", "}}"))
+    return "".join(parts)
+
+
+class CompiledNarrative:
+    """
+    order       report_structure.json section order
+    headers     section → header line (header_style applied)
+    sections    section → ((template, bound format method), ...)
+    slots       placeholder names, by positional index
+    """
+
+    def __init__(self, engine: dict, sources: Optional[Dict[str, Source]] = None):
+        modules = engine.get("modules", {})
+        templates = modules.get("motives", {}).get("modules", {}).get("interpretation", {}) \
+            .get("narrative_templates", {}).get("templates", {})
+        output = modules.get("output", {})
+        structure = output.get("report_structure", {})
+        schema = output.get("output_schema", {}).get("sections", {})
+        rules = structure.get("formatting_rules", {})
+
+        self.sources = sources if sources is not None else build_sources(engine)
+        self.separator = rules.get("separator", "\n")
+        self.trailer = "\n" * rules.get("line_breaks_after_section", 0)
+        indent = " " * rules.get("indent", 0)
+        upper = rules.get("header_style") == "uppercase"
+
+        section_templates = dict(SECTION_TEMPLATES)
+        section_templates["full_narrative"] = tuple(schema.get("full_narrative", {}).get("fields", []))
+
+        slots: Dict[str, int] = {}
+        formats: Dict[str, Callable[..., str]] = {}
+        for name, spec in templates.items():
+            formats[name] = compile_template(name, spec.get("structure", []), slots, self.sources, indent).format
+
+        self.order: List[str] = []
+        self.headers: Dict[str, str] = {}
+        self.sections: Dict[str, Tuple[Tuple[str, Callable[..., str]], ...]] = {}
+        for section in structure.get("order", []):
+            names = section_templates.get(section, ())
+            missing = [t for t in names if t not in formats]
+            if missing:
+                raise ValueError("section %s: unknown templates %s" % (section, ", ".join(missing)))
+            header = structure.get("section_headers", {}).get(section, _humanize(section))
+            self.order.append(section)
+            self.headers[section] = header.upper() if upper else header
+            self.sections[section] = tuple((t, formats[t]) for t in names)
+
+        self.slots: List[str] = sorted(slots, key=slots.get)
+        self._resolvers = [self.sources[s] for s in self.slots]
+
+    def values(self, kernel_vector: dict) -> List[str]:
+        profile = NarrativeProfile(kernel_vector)
+        return [resolve(profile) for resolve in self._resolvers]
+
+    def render_sections(self, kernel_vector: dict) -> Dict[str, str]:
+        # section → body text; sections with nothing to say are left out.
+        values = self.values(kernel_vector)
+        conflict = bool(kernel_vector.get("conflict_patterns"))
+        out = {}
+        for section in self.order:
+            body = "\n\n".join([fmt(*values) for t, fmt in self.sections[section]
+                                if conflict or t not in CONFLICT_TEMPLATES])
+            if body:
+                out[section] = body
+        return out
+
+    def render_text(self, kernel_vector: dict) -> str:
+        sections = self.render_sections(kernel_vector)
+        return self.separator.join(
+            [self.headers[s] + "\n" + body for s, body in sections.items()]
+        ) + self.trailer
+
+
+# ---------------------------------------
+# PUBLIC API
+# ---------------------------------------
+def compile_narrative(engine: Optional[dict] = None) -> CompiledNarrative:
+    return CompiledNarrative(engine if engine is not None else assemble_engine())
+
+
+_NARRATIVE: Optional[CompiledNarrative] = None
+_NARRATIVE_LOCK = threading.Lock()
+
+
+def get_narrative() -> CompiledNarrative:
+    global _NARRATIVE
+    if _NARRATIVE is None:
+        with _NARRATIVE_LOCK:
+            if _NARRATIVE is None:
+                _NARRATIVE = compile_narrative()
+    return _NARRATIVE
+
+
+def render_narrative(kernel_vector: dict) -> Dict[str, str]:
+    return get_narrative().render_sections(kernel_vector)
+
+
+def render_narrative_text(kernel_vector: dict) -> str:
+    return get_narrative().render_text(kernel_vector)
@@ -0,0 +1,163 @@
+"""
+PEK Report Page
+The /report HTML page. One f-string, compiled with the module into a single
+string build, shared by the /report routes and the bulk pre-renderer so
+both produce byte-identical pages.
+"""
+
+from typing import Optional
+
+REPORT_NOT_SAVED_NOTICE = """<div style="margin-bottom:20px; padding:12px; background:#fff3cd; border-radius:8px; font-size:0.95em; color:#856404;">
+                This report is not saved. Please click “Save / Print Snapshot” before closing this page.
+            </div>"""
+
+REPORT_SAVED_NOTICE = """<div style="margin-bottom:20px; padding:12px; background:#e8f0e3; border-radius:8px; font-size:0.95em; color:#3c5a2e;">
+                This report is saved. You can reopen it at <a href="/report/{snapshot_id}">/report/{snapshot_id}</a>.
+            </div>"""
+
+
+def render_report_html(result: dict, snapshot_id: Optional[str] = None) -> str:
+
+    if snapshot_id:
+        notice = REPORT_SAVED_NOTICE.format(snapshot_id=snapshot_id)
+    else:
+        notice = REPORT_NOT_SAVED_NOTICE
+
+    depth = result.get("input_depth_rating", {})
+    lite = result.get("lite_translation", {})
+
+    orientation = lite.get("orientation_snapshot", "")
+    core_themes = lite.get("core_themes", "")
+    sections = lite.get("sections", {})
+    underlying = sections.get("underlying_patterns", "")
+    dynamics = sections.get("internal_dynamics", "")
+    decision = sections.get("decision_control", "")
+    real_world = lite.get("real_world_signals", [])
+    prompts = lite.get("reflection_prompts", [])
+    next_step_note = lite.get("next_step_note", "")
+
+    return f"""
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>PersonaSight™ Snapshot</title>
+        <style>
+            body {{
+                font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+                background: radial-gradient(circle at center, #f5f2ea 0%, #ece6d8 100%);
+                color: #2c2a27;
+                padding: 60px 20px;
+            }}
+            .container {{
+                max-width: 820px;
+                margin: auto;
+                background: #fbf8f3;
+                padding: 64px;
+                border-radius: 18px;
+                box-shadow: 0 35px 80px rgba(0,0,0,0.12);
+            }}
+            h1 {{
+                font-size: 2.3em;
+                margin-bottom: 30px;
+            }}
+            h2 {{
+                margin-top: 40px;
+                font-size: 1.1em;
+                text-transform: uppercase;
+                letter-spacing: 0.08em;
+                color: #8a8175;
+            }}
+            p {{
+                line-height: 1.8;
+                margin-top: 14px;
+            }}
+            ul {{
+                margin-top: 16px;
+                line-height: 1.8;
+            }}
+            li {{
+                margin-bottom: 8px;
+            }}
+            .depth {{
+                background: #f0ebe3;
+                padding: 16px;
+                border-radius: 10px;
+                margin-bottom: 30px;
+                font-size: 0.95em;
+            }}
+            .next {{
+                margin-top: 40px;
+                background: #f0ebe3;
+                padding: 16px;
+                border-radius: 10px;
+            }}
+
+            @media print {{
+                button {{
+                    display: none;
+                }}
+
+                body {{
+                    font-size: 12pt;
+                }}
+
+                a {{
+                    display: none;
+                }}
+
+                h2, p, ul, .depth, .next {{
+                    page-break-inside: avoid;
+                    break-inside: avoid;
+                }}
+
+                h2 {{
+                    page-break-after: avoid;
+                }}
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>PersonaSight™ Snapshot</h1>
+
+            {notice}
+
+            <button onclick="window.print()" style="margin-bottom:20px; padding:10px 16px; border-radius:8px; border:none; background:#2c2a27; color:white; cursor:pointer;">
+                Save / Print Snapshot
+            </button>
+
+            <div class="depth">
+                <strong>Input Depth:</strong> {depth.get("label","")}<br>
+                {depth.get("note","")}
+            </div>
+
+            <h2>Core Orientation</h2>
+            <p>{orientation}</p>
+
+            <p><em>{core_themes}</em></p>
+
+            <h2>Behavioral Foundation</h2>
+            <p>{underlying}</p>
+
+            <h2>Internal Pressure Pattern</h2>
+            <p>{dynamics}</p>
+
+            <h2>Decision Model</h2>
+            <p>{decision}</p>
+
+            <h2>Real-World Signals</h2>
+            <ul>
+                {''.join(f"<li>{s}</li>" for s in real_world)}
+            </ul>
+
+            <h2>Reflection Prompts</h2>
+            <ul>
+                {''.join(f"<li>{p}</li>" for p in prompts)}
+            </ul>
+
+            <div class="next">{next_step_note}</div>
+
+        </div>
+    </body>
+    </html>
+    """
@@ -0,0 +1,230 @@
+# conflict_stage.py
+# PersonaSight™ — Compiled Conflict Engine
+# conflict_engine.json compiled once into bitmasks: each rule becomes a mask
+# over the signal-presence bitset and a mask over the "high dimension" bitset,
+# so every rule for a request (or a whole batch) is a few AND / compare ops.
+
+from typing import List, Dict
+
+import numpy as np
+
+from PersonalityEngine_Kernel.engines.vector.validation_stage import HIGH_ACTIVATION
+
+# Cue names the rule file uses that are not literal signal ids. A required
+# cue is present when ANY of its listed signals (or signal groups) is active.
+# Cues without a kernel source stay unresolved and their rule never fires.
+CONFLICT_SIGNAL_ALIASES = {
+    "APPROACH_CUE": ["ACHIEVEMENT_DRIVE", "APPROVAL_SEEKING", "BELONGING_NEED"],
+    "AVOIDANCE_CUE": ["INSTABILITY_AVOIDANCE", "CONFLICT_AVOIDANCE", "SELF_PROTECTIVE_WITHDRAWAL"],
+    "EMO_INTENSITY_HIGH": ["STRESS_SPIKE"],
+    # motive ids → the identity signals that carry them
+    "ID-CONFLICT": ["ROLE_CONFLICT"],
+    "ID-UNCERTAINTY": ["SELF_CONCEPT_UNCERTAINTY"],
+}
+
+# conflict_engine.json "logic" values that mean "high activation" for dimensions.
+HIGH_ACTIVATION_LOGIC = ("high_activation_both_dimensions",)
+
+
+def _bitset_dtype(width: int):
+    # uint64 while the bits fit; Python ints (object arrays) past that.
+    return np.uint64 if width <= 64 else object
+
+
+def _pack(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    # (n, width) bool → (n,) bitset
+    if weights.dtype == object:
+        return np.array([sum(int(w) for w, b in zip(weights, row) if b) for row in matrix], dtype=object)
+    return (matrix.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+
+class CompiledConflictRules:
+    """
+    rules              rule names, in file order (bit j of every rule bitset)
+    term_masks         (n_terms,) signal bitset per required cue (any bit = present)
+    rule_term_masks    (n_rules,) bitset of the cues each rule requires (all = fired)
+    rule_dim_masks     (n_rules,) bitset of the dimensions that must be high
+    confidence_shifts  (n_rules,) confidence_shift per rule
+    pathway_dims       (n_pathways,) dominant dimension of each resolution pattern
+    pathway_factors    (n_pathways,) vector_shift applied to that dimension
+    """
+
+    def __init__(self, engine: dict, signals: List[str], signal_groups: Dict[str, str],
+                 dimensions: List[str]):
+        spec = (
+            engine.get("engines", {}).get("interpretation", {}).get("conflict_engine", {})
+        )
+        signal_index = {sid: i for i, sid in enumerate(signals)}
+        dim_index = {d: i for i, d in enumerate(dimensions)}
+        self.signals = signals
+        self.dimensions = dimensions
+        self.unresolved: List[str] = []
+
+        def resolve_cue(name: str) -> int:
+            mask = 0
+            for t in CONFLICT_SIGNAL_ALIASES.get(name, [name]):
+                if t in signal_index:
+                    mask |= 1 << signal_index[t]
+                else:
+                    for sid, i in signal_index.items():
+                        if signal_groups.get(sid) == t:
+                            mask |= 1 << i
+            if not mask:
+                self.unresolved.append(name)
+            return mask
+
+        # --- conflict_detection_rules ---
+        self.rules: List[str] = []
+        term_masks: List[int] = []
+        term_index: Dict[str, int] = {}
+        rule_terms, rule_dims, shifts = [], [], []
+        for name, rule in spec.get("conflict_detection_rules", {}).items():
+            cues = list(rule.get("signals_required", [])) + list(rule.get("motive_ids", []))
+            masks = [resolve_cue(c) for c in cues]
+            dims = rule.get("dimensions_required", [])
+            if not all(masks) or any(d not in dim_index for d in dims):
+                self.unresolved.extend(d for d in dims if d not in dim_index)
+                continue
+            if dims and rule.get("logic") not in HIGH_ACTIVATION_LOGIC:
+                self.unresolved.append(name)
+                continue
+            if not cues and not dims:
+                continue
+
+            term_bits = 0
+            for cue, mask in zip(cues, masks):
+                if cue not in term_index:
+                    term_index[cue] = len(term_masks)
+                    term_masks.append(mask)
+                term_bits |= 1 << term_index[cue]
+            dim_bits = 0
+            for d in dims:
+                dim_bits |= 1 << dim_index[d]
+
+            self.rules.append(name)
+            rule_terms.append(term_bits)
+            rule_dims.append(dim_bits)
+            shifts.append(float(rule.get("confidence_shift", 0.0)))
+
+        self.cues = list(term_index)
+        self._term_masks = term_masks
+        self._rule_terms = rule_terms
+        self._rule_dims = rule_dims
+
+        self.signal_weights = np.array([1 << i for i in range(len(signals))],
+                                       dtype=_bitset_dtype(len(signals)))
+        self.term_weights = np.array([1 << i for i in range(len(term_masks))],
+                                     dtype=_bitset_dtype(len(term_masks)))
+        self.dim_weights = np.array([1 << i for i in range(len(dimensions))], dtype=np.uint64)
+        self.term_masks = np.array(term_masks, dtype=self.signal_weights.dtype)
+        self.rule_term_masks = np.array(rule_terms, dtype=self.term_weights.dtype)
+        self.rule_dim_masks = np.array(rule_dims, dtype=np.uint64)
+        self.confidence_shifts = np.array(shifts, dtype=np.float64)
+
+        # --- conflict_resolution_patterns ---
+        self.pathways: List[str] = []
+        pathway_dims, pathway_factors = [], []
+        for name, pattern in spec.get("conflict_resolution_patterns", {}).items():
+            dim = pattern.get("dominant_dimension")
+            if dim not in dim_index:
+                self.unresolved.append(name)
+                continue
+            self.pathways.append(name)
+            pathway_dims.append(dim_index[dim])
+            pathway_factors.append(float(pattern.get("vector_shift", {}).get(dim, 1.0)))
+        self.pathway_dims = np.array(pathway_dims, dtype=np.intp)
+        self.pathway_factors = np.array(pathway_factors, dtype=np.float64)
+
+        # --- integration_rules ---
+        integration = spec.get("integration_rules", {})
+        self.stress_multiplier = float(
+            integration.get("stress_interaction", {}).get("stress_multiplier", 1.0)
+        )
+
+        for arr in (self.signal_weights, self.term_weights, self.dim_weights, self.term_masks,
+                    self.rule_term_masks, self.rule_dim_masks, self.confidence_shifts,
+                    self.pathway_dims, self.pathway_factors):
+            arr.setflags(write=False)
+
+    # ---------------------------------------
+    # EVALUATION
+    # ---------------------------------------
+    def evaluate(self, signals: np.ndarray, dims: np.ndarray) -> np.ndarray:
+        # (n, n_rules) bool: which rules fire for each row.
+        if not self.rules:
+            return np.zeros((signals.shape[0], 0), dtype=bool)
+        if signals.shape[0] == 1:
+            return np.array([self._evaluate_row(signals[0], dims[0])], dtype=bool)
+
+        present = _pack(signals > 0, self.signal_weights)
+        cue_hits = (present[:, None] & self.term_masks[None, :]) != 0
+        cues = _pack(cue_hits, self.term_weights)
+        high = _pack(dims >= HIGH_ACTIVATION, self.dim_weights)
+        return (
+            ((cues[:, None] & self.rule_term_masks) == self.rule_term_masks)
+            & ((high[:, None] & self.rule_dim_masks) == self.rule_dim_masks)
+        )
+
+    def _evaluate_row(self, signals: np.ndarray, dims: np.ndarray) -> List[bool]:
+        # Same masks on plain ints; NumPy setup dominates for a single row.
+        present = 0
+        for i, v in enumerate(signals.tolist()):
+            if v > 0:
+                present |= 1 << i
+        cues = 0
+        for j, mask in enumerate(self._term_masks):
+            if present & mask:
+                cues |= 1 << j
+        high = 0
+        for d, v in enumerate(dims.tolist()):
+            if v >= HIGH_ACTIVATION:
+                high |= 1 << d
+        return [
+            (cues & t) == t and (high & m) == m
+            for t, m in zip(self._rule_terms, self._rule_dims)
+        ]
+
+    def apply(self, fired: np.ndarray, dims: np.ndarray, stress: np.ndarray):
+        # Rows with a conflict: the strongest resolution pathway's vector_shift
+        # and the stress_interaction multiplier. Returns (confidence shift, pathway).
+        shift = fired @ self.confidence_shifts
+        pathway = np.full(len(dims), -1, dtype=np.intp)
+        rows = np.nonzero(fired.any(axis=1))[0]
+        if rows.size and self.pathways:
+            best = np.argmax(dims[np.ix_(rows, self.pathway_dims)], axis=1)
+            pathway[rows] = best
+            cols = self.pathway_dims[best]
+            dims[rows, cols] *= self.pathway_factors[best]
+            stress[rows] = np.minimum(1.0, stress[rows] * self.stress_multiplier)
+        return shift, pathway
+
+    def describe(self, fired: np.ndarray, signals: np.ndarray, shift: float,
+                 pathway: int) -> dict:
+        # conflict_patterns output block; {} when nothing fired.
+        if not fired.any():
+            return {}
+        active = {self.signals[i] for i in np.nonzero(signals)[0]}
+        origins = {}
+        for j in np.nonzero(fired)[0]:
+            found = []
+            for t in range(len(self.cues)):
+                if self._rule_terms[j] >> t & 1:
+                    found.extend(
+                        s for i, s in enumerate(self.signals)
+                        if self._term_masks[t] >> i & 1 and s in active
+                    )
+            found.extend(
+                d for i, d in enumerate(self.dimensions) if self._rule_dims[j] >> i & 1
+            )
+            origins[self.rules[j]] = found
+        return {
+            "conflict_points": list(origins),
+            "conflict_origins": origins,
+            "resolution_pathways": [self.pathways[pathway]] if pathway >= 0 else [],
+            "confidence_shift": round(float(shift), 4),
+        }
+
+
+def compile_conflict_rules(engine: dict, signals: List[str], signal_groups: Dict[str, str],
+                           dimensions: List[str]) -> CompiledConflictRules:
+    return CompiledConflictRules(engine, signals, signal_groups, dimensions)
@@ -0,0 +1,191 @@
+# indicator_stage.py
+# PersonaSight™ — Kernel Indicator Index
+# kernel_structural_v1.json behavioral_indicators / predictive_signals compiled
+# once into cue terms and an inverted index term → (indicator, weight). An
+# input is scored against all five dimensions in one pass over its tokens.
+
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Kernel entry lists that carry detectable definitions, with their id field.
+INDICATOR_SOURCES = (
+    ("behavioral_indicators", "indicator_id"),
+    ("predictive_signals", "signal_id"),
+)
+
+TOKEN = re.compile(r"[a-z]+")
+
+# Longest first; the stem must keep at least MIN_STEM letters.
+SUFFIXES = (
+    "ations", "ation", "ments", "ment", "ness", "ances", "ance", "ences", "ence",
+    "ities", "ity", "ings", "ing", "ively", "ive", "ed", "es", "s",
+)
+MIN_STEM = 4
+MIN_TERM = 4
+
+# Function words, description boilerplate that says nothing about a dimension,
+# and everyday verbs / fillers that answers use regardless of what they describe.
+STOPWORDS = frozenset("""
+a about across after against all also an and any are as at be based because been before being
+between both but by can could depending determines does during each either for from has have how
+if in into is it its likely may more most much not of on or other over rather shaped such than
+that the their them then there these they this those through to toward towards under until upon
+very via what when where whether which while who whose will with within without would
+expected patterns pattern behaviors behavior tendency tendencies likelihood response responses
+need needs needed make makes making made feel feels felt get gets getting got want wants wanted
+keep keeps kept take takes taking took give gives come comes going seem seems mean means meaning
+become becomes appear appears tend tends use uses used know think thinks someone something
+others really often frequently entirely time times days hour hours long later point
+type term
+""".split())
+
+# A term found in more than this share of all indicators is too generic to index.
+MAX_DF = 0.25
+BIGRAM_BOOST = 2.0
+
+# Indicators reported per input.
+TOP_INDICATORS = 5
+# Evidence an entry needs before it scores: matched unigrams count 1, bigrams
+# 2. One shared word is not enough to name an indicator.
+MIN_EVIDENCE = 2
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            token = token[:-len(suffix)]
+            if suffix in ("ing", "ings", "ed") and len(token) > MIN_STEM and token[-1] == token[-2]:
+                token = token[:-1]  # planning → plan
+            break
+    if token.endswith("e") and len(token) > MIN_STEM:
+        token = token[:-1]  # appease / appeasing → appeas
+    return token
+
+
+def content_terms(text: str) -> List[str]:
+    return [stem(t) for t in TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) >= MIN_TERM]
+
+
+class CompiledIndicatorIndex:
+    """
+    ids              indicator / signal ids (entry axis)
+    entry_dims       (n_entries,) dimension index of each entry
+    postings         term → ((entry, weight), ...); bigrams are "a b" terms
+    entry_capacity   (n_entries,) total indexed weight of each entry (score ceiling)
+    """
+
+    def __init__(self, engine: dict, dimensions: List[str]):
+        structural = engine.get("kernel", {}).get("kernel_structural_v1", {})
+        dim_index = {d: i for i, d in enumerate(dimensions)}
+        self.dimensions = dimensions
+
+        self.ids: List[str] = []
+        entry_dims: List[int] = []
+        entry_terms: List[set] = []
+        for spec in structural.get("dimensions", {}).values():
+            if not isinstance(spec, dict) or spec.get("id") not in dim_index:
+                continue
+            for field, id_field in INDICATOR_SOURCES:
+                for entry in spec.get(field, []):
+                    terms = content_terms(entry.get("description", ""))
+                    if not terms:
+                        continue
+                    self.ids.append(entry.get(id_field) or "%s-%d" % (spec["id"], len(self.ids)))
+                    entry_dims.append(dim_index[spec["id"]])
+                    entry_terms.append(set(terms) | {a + " " + b for a, b in zip(terms, terms[1:])})
+
+        # df over entries → idf weight; terms shared by too many entries are dropped.
+        n = len(self.ids)
+        df: Dict[str, int] = {}
+        for terms in entry_terms:
+            for t in terms:
+                df[t] = df.get(t, 0) + 1
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for e, terms in enumerate(entry_terms):
+            for t in sorted(terms):
+                if df[t] > max(1, MAX_DF * n):
+                    continue
+                w = math.log(1.0 + n / df[t]) * (BIGRAM_BOOST if " " in t else 1.0)
+                postings.setdefault(t, []).append((e, w))
+        self.postings: Dict[str, Tuple[Tuple[int, float], ...]] = {t: tuple(p) for t, p in postings.items()}
+
+        self.entry_dims = np.array(entry_dims, dtype=np.intp)
+        weights = np.zeros(n, dtype=np.float64)
+        for plist in self.postings.values():
+            for e, w in plist:
+                weights[e] += w
+        weights[weights <= 0] = 1.0
+        self.entry_capacity = weights
+        self.entry_dims.setflags(write=False)
+        self.entry_capacity.setflags(write=False)
+
+    def lookup(self, text: str) -> Dict[int, list]:
+        # One pass over the tokens: each distinct unigram / bigram term is
+        # looked up once. Returns entry → [matched weight, matched terms].
+        postings = self.postings
+        seen = set()
+        hits: Dict[int, list] = {}
+        prev = None
+        for token in TOKEN.findall(text):
+            if token in STOPWORDS or len(token) < MIN_TERM:
+                continue
+            term = stem(token)
+            for t in (term, prev + " " + term if prev is not None else None):
+                if t is None or t in seen:
+                    continue
+                seen.add(t)
+                for e, w in postings.get(t, ()):
+                    hit = hits.get(e)
+                    if hit is None:
+                        hits[e] = [w, [t]]
+                    else:
+                        hit[0] += w
+                        hit[1].append(t)
+            prev = term
+        return hits
+
+    def score(self, text: str) -> Tuple[np.ndarray, List[Tuple[int, float, List[str]]]]:
+        # Entry score = share of its indexed weight matched, in [0, 1];
+        # dimension score = its best entry. Entries come back best first;
+        # entries below MIN_EVIDENCE are left out.
+        hits = self.lookup(text)
+        dims = np.zeros(len(self.dimensions), dtype=np.float64)
+        matched = []
+        for e, (weight, terms) in hits.items():
+            if sum(2 if " " in t else 1 for t in terms) < MIN_EVIDENCE:
+                continue
+            s = float(weight / self.entry_capacity[e])
+            d = self.entry_dims[e]
+            if s > dims[d]:
+                dims[d] = s
+            matched.append((e, s, terms))
+        matched.sort(key=lambda m: (-m[1], m[0]))
+        return dims, matched
+
+    def describe(self, text: str) -> dict:
+        # kernel_indicators output block.
+        dims, matched = self.score(text)
+        return {
+            "dimension_scores": {d: round(float(v), 4) for d, v in zip(self.dimensions, dims)},
+            "indicators": [
+                {"id": self.ids[e], "dimension": self.dimensions[self.entry_dims[e]],
+                 "score": round(s, 4), "terms": terms}
+                for e, s, terms in matched[:TOP_INDICATORS]
+            ],
+        }
+
+    def stats(self) -> dict:
+        return {
+            "indicators": len(self.ids),
+            "terms": len(self.postings),
+            "postings": sum(len(p) for p in self.postings.values()),
+        }
+
+
+def compile_indicator_index(engine: dict, dimensions: List[str]) -> CompiledIndicatorIndex:
+    return CompiledIndicatorIndex(engine, dimensions)
@@ -0,0 +1,205 @@
+# pipeline_stages.py
+# PersonaSight™ — Interpretation Pipeline Stages
+# The nine pipeline.json stages implemented on the compiled vector kernel, one
+# request per run, for engine_runtime.pipeline_runtime. Every stage copies
+# before it changes an array: its inputs may be memoized artifacts. The report
+# handed back to callers is a deep copy, so it never aliases the memo either.
+
+import copy
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from PersonalityEngine_Kernel.engine_runtime.engine_loader import assemble_engine
+from PersonalityEngine_Kernel.engine_runtime.pipeline_runtime import PipelineGraph, PipelineRuntime, StageFn
+from PersonalityEngine_Kernel.engines.translation.lite_translation import translate_lite
+from PersonalityEngine_Kernel.engines.translation.narrative_report import CompiledNarrative, compile_narrative, get_narrative
+from PersonalityEngine_Kernel.engines.vector.vector_engine import (
+    DIMENSIONS,
+    VECTOR_ENGINE_VERSION,
+    CompiledVectorKernel,
+    _format_row,
+    compile_vector_kernel,
+    signal_matrix,
+    stress_levels,
+)
+
+# External artifacts named in pipeline.json, fed from one engine input.
+TEXT_INPUT = "modules/dimensions/*"
+KERNEL_INPUT = "kernel_access_layer"
+STRESS_INPUT = "stress indicators"
+
+# kernel_structural_v1.json dimension names, for the narrative summary.
+DIMENSION_NAMES = {
+    "D1": "Survival Orientation",
+    "D2": "Reward Strategy",
+    "D3": "Conflict Response",
+    "D4": "Identity Construction",
+    "D5": "Emotional Processing",
+}
+
+
+def pipeline_inputs(engine_input: dict) -> dict:
+    # forced_overrides are not part of the declared pipeline inputs and are ignored here.
+    return {
+        TEXT_INPUT: (engine_input.get("example_statement", "") or "").lower().strip(),
+        KERNEL_INPUT: VECTOR_ENGINE_VERSION,
+        STRESS_INPUT: engine_input.get("context_flags") or {},
+    }
+
+
+def build_vector_stages(kernel: CompiledVectorKernel,
+                        narrative: Optional[CompiledNarrative] = None) -> Dict[str, StageFn]:
+    narrative = narrative or get_narrative()
+    lo, hi = kernel.normalize_range
+    overrides = kernel.stress_overrides
+
+    def load_dimension_data(inputs):
+        # keyword detection → per-signal motive activation; kernel indicator index
+        text = inputs[TEXT_INPUT]
+        return {"signals": signal_matrix([text], kernel), "indicators": kernel.indicators.describe(text)}
+
+    def resolve_contradictions(inputs):
+        # vector_calculator dimension_resolution: weighted sum into normalize_range
+        bundle = inputs["dimension_data_bundle"]
+        signals = bundle["signals"]
+        return {"signals": signals, "dims": np.clip(signals @ kernel.weight_matrix, lo, hi),
+                "indicators": bundle["indicators"]}
+
+    def apply_stress_overrides(inputs):
+        state = inputs["resolved_state"]
+        flagged = overrides.stress_value(inputs[STRESS_INPUT])
+        signals, dims = state["signals"], state["dims"]
+        if flagged is not None:
+            row = overrides.segment(flagged)
+            signals = signals * overrides.signal_multipliers[row]
+            dims = np.clip((signals @ kernel.weight_matrix) * overrides.dimension_multipliers[row], lo, hi)
+        stress = stress_levels(signals, kernel)
+        checked = stress if flagged is None else np.fmax(stress, flagged)
+        return {"signals": signals, "dims": dims, "stress": stress,
+                "checked_stress": checked, "override": flagged, "indicators": state["indicators"]}
+
+    def weight_motives(inputs):
+        state = inputs["stress_modified_state"]
+        dims = state["dims"].copy()
+        validation = kernel.validation.evaluate(state["signals"], dims, state["checked_stress"])[0]
+        ranked = [DIMENSIONS[i] for i in np.argsort(-dims[0], kind="stable")]
+        return {"signals": state["signals"], "dims": dims, "validation": validation,
+                "ranked_dimensions": ranked, "indicators": state["indicators"]}
+
+    def derive_conflict_pattern(inputs):
+        state = inputs["stress_modified_state"]
+        motives = inputs["motive_weight_profile"]
+        conflicts = kernel.conflicts
+        dims, stress = motives["dims"].copy(), state["stress"].copy()
+        fired = conflicts.evaluate(state["signals"], dims)
+        shift, pathway = conflicts.apply(fired, dims, stress)
+        np.clip(dims, lo, hi, out=dims)
+        patterns = conflicts.describe(fired[0], state["signals"][0], shift[0], pathway[0])
+        return {"dims": dims, "stress": stress, "conflict_patterns": patterns}
+
+    def decode_emotional_style(inputs):
+        conflict = inputs["conflict_behavior"]
+        return {
+            "emotional_processing": float(conflict["dims"][0, DIMENSIONS.index("D5")]),
+            "stress_level": float(conflict["stress"][0]),
+            "stress_override": overrides.describe(inputs["stress_modified_state"]["override"]),
+        }
+
+    def apply_identity_filter(inputs):
+        motives = inputs["motive_weight_profile"]
+        return {
+            "identity_construction": float(motives["dims"][0, DIMENSIONS.index("D4")]),
+            "identity_fragile": "identity_fragility" in motives["validation"]["flags"],
+            "stress_level": inputs["emotional_profile"]["stress_level"],
+        }
+
+    def generate_prediction_matrix(inputs):
+        conflict = inputs["conflict_behavior"]
+        motives = inputs["motive_weight_profile"]
+        validation = dict(motives["validation"])
+        patterns = conflict["conflict_patterns"]
+        if patterns:
+            validation["adjusted_confidence"] = round(
+                min(1.0, max(0.0, validation["adjusted_confidence"] + patterns["confidence_shift"])), 4
+            )
+        row = _format_row(
+            kernel, motives["signals"][0], conflict["dims"][0],
+            inputs["identity_shaped_model"]["stress_level"], None, validation, patterns,
+            motives["indicators"],
+        )
+        row["stress_override"] = inputs["emotional_profile"]["stress_override"]
+        row["ranked_dimensions"] = motives["ranked_dimensions"]
+        return row
+
+    def construct_psychological_narrative(inputs):
+        prediction = inputs["prediction_matrix"]
+        top = prediction["ranked_dimensions"][0]
+        active = prediction["dimension_vector"][top] > 0
+        kernel_output = {
+            "dominant_motive": DIMENSION_NAMES.get(top, "Unclear") if active else "Unclear",
+            "confidence_score": prediction["validation"]["adjusted_confidence"],
+            "conflict_patterns": prediction["conflict_patterns"],
+            "stress_profile": prediction["stress_override"] or {},
+        }
+        return {
+            "kernel_vector": prediction,
+            "translation": translate_lite(kernel_output),
+            "narrative": narrative.render_sections(prediction),
+        }
+
+    return {
+        "load_dimension_data": load_dimension_data,
+        "resolve_contradictions": resolve_contradictions,
+        "apply_stress_overrides": apply_stress_overrides,
+        "weight_motives": weight_motives,
+        "derive_conflict_pattern": derive_conflict_pattern,
+        "decode_emotional_style": decode_emotional_style,
+        "apply_identity_filter": apply_identity_filter,
+        "generate_prediction_matrix": generate_prediction_matrix,
+        "construct_psychological_narrative": construct_psychological_narrative,
+    }
+
+
+# ---------------------------------------
+# RUNTIME
+# ---------------------------------------
+def compile_pipeline_runtime(engine: Optional[dict] = None,
+                             kernel: Optional[CompiledVectorKernel] = None) -> PipelineRuntime:
+    if engine is None:
+        engine = assemble_engine()
+    kernel = kernel or compile_vector_kernel(engine)
+    engines = engine.get("engines", {})
+    pipeline = engines.get("interpretation", {}).get("engines", {}).get("interpretation", {}).get("pipeline", {})
+    routing = engines.get("analysis", {}).get("engines", {}).get("analysis", {}).get("routing_layer", {})
+    return PipelineRuntime(PipelineGraph(pipeline, routing), build_vector_stages(kernel, compile_narrative(engine)))
+
+
+_PIPELINE_RUNTIME: Optional[PipelineRuntime] = None
+_PIPELINE_RUNTIME_LOCK = threading.Lock()
+
+
+def get_pipeline_runtime() -> PipelineRuntime:
+    global _PIPELINE_RUNTIME
+    if _PIPELINE_RUNTIME is None:
+        with _PIPELINE_RUNTIME_LOCK:
+            if _PIPELINE_RUNTIME is None:
+                _PIPELINE_RUNTIME = compile_pipeline_runtime()
+    return _PIPELINE_RUNTIME
+
+
+def _report(artifacts: dict, timings: dict) -> dict:
+    # The memoized report is shared with later runs: callers get their own copy.
+    return dict(copy.deepcopy(artifacts["psychological_report"]), stage_timings=timings)
+
+
+def run_pipeline(engine_input: dict, runtime: Optional[PipelineRuntime] = None) -> dict:
+    runtime = runtime or get_pipeline_runtime()
+    return _report(*runtime.run(pipeline_inputs(engine_input)))
+
+
+def run_pipeline_batch(engine_inputs: list, runtime: Optional[PipelineRuntime] = None) -> list:
+    runtime = runtime or get_pipeline_runtime()
+    runs = runtime.run_batch([pipeline_inputs(e) for e in engine_inputs])
+    return [_report(artifacts, timings) for artifacts, timings in runs]
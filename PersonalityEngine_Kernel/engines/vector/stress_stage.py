@@ -0,0 +1,147 @@
+# stress_stage.py
+# PersonaSight™ — Compiled Stress Overrides
+# Turns stress_overrides.json + stress_integration.json into per-stress-level
+# multiplier tables at load time. Applying a context_flags.stress_state is then
+# a row lookup and one elementwise multiply over the signal / dimension vectors.
+
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional
+
+import numpy as np
+
+# Names the rule files use for signal families that are not literal signal ids.
+# threat_cue / identity_violation follow signal_router.json groups, and
+# minor_reward_cues follows signal_definitions.json suppress_under_stress.
+OVERRIDE_SIGNAL_ALIASES = {
+    "threat_cue": ["threat_signals"],
+    "identity_violation": ["identity_signals"],
+    "minor_reward_cues": ["ACHIEVEMENT_DRIVE", "BELONGING_NEED"],
+}
+
+# validators.json stress_state_detector modes → stress_integration.json states
+STATE_ALIASES = {
+    "acute": "reactive",
+    "shutdown": "overload",
+}
+
+
+class CompiledStressOverrides:
+    """
+    Stress is split into segments by every threshold found in the rule files:
+    segment 2j+1 is "exactly breakpoints[j]", even segments are the open gaps
+    between them. Each segment owns one precomputed multiplier row, and the
+    extra last row is all ones (no stress flag).
+    """
+
+    def __init__(self, engine: dict, signals: List[str], signal_groups: Dict[str, str],
+                 dimensions: List[str]):
+        overrides_mod = engine.get("modules", {}).get("overrides", {})
+        overrides = overrides_mod.get("stress_overrides", {}).get("override_rules", {})
+        integration = overrides_mod.get("stress_integration", {})
+
+        signal_index = {sid: i for i, sid in enumerate(signals)}
+        dim_index = {d: i for i, d in enumerate(dimensions)}
+        self.unresolved: List[str] = []
+
+        def resolve_signals(name: str) -> List[int]:
+            targets = OVERRIDE_SIGNAL_ALIASES.get(name, [name])
+            out = []
+            for t in targets:
+                if t in signal_index:
+                    out.append(signal_index[t])
+                else:
+                    out.extend(i for sid, i in signal_index.items() if signal_groups.get(sid) == t)
+            if not out:
+                self.unresolved.append(name)
+            return out
+
+        # (threshold, kind, indices, factor) — active when stress is strictly above threshold
+        rules = []
+        for r in overrides.get("signal_suppression", {}).get("rules", []):
+            rules.append((float(r["when_stress_above"]), "signal",
+                          resolve_signals(r.get("signal", "")), 0.0))
+        for r in overrides.get("signal_amplification", {}).get("rules", []):
+            rules.append((float(r["when_stress_above"]), "signal",
+                          resolve_signals(r.get("signal", "")), float(r.get("amplify_factor", 1.0))))
+        for r in overrides.get("vector_overrides", {}).get("rules", []):
+            idx = [dim_index[r["dimension"]]] if r.get("dimension") in dim_index else []
+            rules.append((float(r["when_stress_above"]), "dimension",
+                          idx, float(r.get("vector_multiplier", 1.0))))
+
+        # stress_integration.json: cascading states, only the highest reached applies.
+        adjustments = integration.get("interpretation_adjustments", {})
+        states = sorted(
+            integration.get("stress_states", {}).items(),
+            key=lambda kv: float(kv[1].get("threshold", 0.0))
+        )
+        self.state_levels: Dict[str, float] = {
+            name: float(conf.get("threshold", 0.0)) for name, conf in states
+        }
+
+        self.breakpoints = sorted({r[0] for r in rules} | set(self.state_levels.values()))
+        n_seg = 2 * len(self.breakpoints) + 1
+        self.identity_row = n_seg
+
+        sig_mult = np.ones((n_seg + 1, len(signals)), dtype=np.float64)
+        dim_mult = np.ones((n_seg + 1, len(dimensions)), dtype=np.float64)
+        self.segment_states: List[Optional[str]] = [None] * (n_seg + 1)
+
+        for seg in range(n_seg):
+            for threshold, kind, idx, factor in rules:
+                if seg > 2 * self.breakpoints.index(threshold) + 1:
+                    target = sig_mult if kind == "signal" else dim_mult
+                    target[seg, idx] *= factor
+
+            reached = None
+            for name, conf in states:
+                j = self.breakpoints.index(float(conf.get("threshold", 0.0)))
+                if seg >= 2 * j + 1:
+                    reached = (name, conf)
+            if reached is None:
+                continue
+            name, conf = reached
+            self.segment_states[seg] = name
+            dim_mult[seg] *= float(conf.get("vector_bias", 1.0))
+            shift = adjustments.get(conf.get("interpretation_shift", "none"), {})
+            for d, factor in (shift.get("dimension_bias", {}) or {}).items():
+                if d in dim_index:
+                    dim_mult[seg, dim_index[d]] *= float(factor)
+
+        sig_mult.setflags(write=False)
+        dim_mult.setflags(write=False)
+        self.signal_multipliers = sig_mult
+        self.dimension_multipliers = dim_mult
+
+    # ---------------------------------------
+    # LOOKUP
+    # ---------------------------------------
+    def stress_value(self, context_flags: Optional[dict]) -> Optional[float]:
+        if not context_flags:
+            return None
+        state = context_flags.get("stress_state")
+        if state is None or isinstance(state, bool):
+            return None
+        if isinstance(state, (int, float)):
+            return min(1.0, max(0.0, float(state)))
+        name = str(state).strip().lower()
+        return self.state_levels.get(STATE_ALIASES.get(name, name))
+
+    def segment(self, value: Optional[float]) -> int:
+        if value is None:
+            return self.identity_row
+        i = bisect_right(self.breakpoints, value)
+        exact = i != bisect_left(self.breakpoints, value)
+        return 2 * i - int(exact)
+
+    def describe(self, value: Optional[float]) -> Optional[dict]:
+        if value is None:
+            return None
+        return {
+            "stress_value": round(value, 4),
+            "stress_state": self.segment_states[self.segment(value)] or "below_baseline",
+        }
+
+
+def compile_stress_overrides(engine: dict, signals: List[str], signal_groups: Dict[str, str],
+                             dimensions: List[str]) -> CompiledStressOverrides:
+    return CompiledStressOverrides(engine, signals, signal_groups, dimensions)
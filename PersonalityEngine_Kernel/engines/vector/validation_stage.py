@@ -0,0 +1,259 @@
+# validation_stage.py
+# PersonaSight™ — Compiled Validation Matrix
+# validation_matrix.json + validators.json compiled once into threshold arrays
+# and vectorized predicates. Every check runs over the whole (batch) signal and
+# dimension matrices, so one request or ten thousand cost the same handful of ops.
+
+from typing import List, Dict, Optional
+
+import numpy as np
+
+# Contradiction-pair terms that are not motive ids, resolved to the dimension
+# whose high pole they describe. Terms without a kernel source stay unresolved.
+VALIDATION_TERMS = {
+    "high_reward_drive": "D2",
+    "identity_vulnerability": "D4",
+}
+
+# Motive id prefixes used by the override files but spelled differently in
+# kernel_structural_v1.json sub_motives.
+MOTIVE_PREFIX_ALIASES = {
+    "EMO": "EM",
+}
+
+# A dimension (or the motive family it owns) counts as "high" at this value.
+HIGH_ACTIVATION = 0.5
+
+# Output columns, in flag-matrix order.
+VALIDATION_FLAGS = [
+    "missing_data",
+    "signal_vector_mismatch",
+    "motive_vector_contradiction",
+    "low_stress_high_conflict",
+    "high_stress_no_conflict",
+    "identity_fragility",
+]
+
+
+class CompiledValidation:
+    """
+    flag_penalties      (n_flags,) confidence penalty per flag column
+    pair_left/right     (n_pairs,) dimension index for each contradiction term
+    conflict_mask       (n_signals,) signals from conflict_signals
+    """
+
+    def __init__(self, engine: dict, signals: List[str], signal_groups: Dict[str, str],
+                 routing_matrix: np.ndarray, dimensions: List[str]):
+        interp = engine.get("modules", {}).get("modules", {}).get("interpretation", {})
+        checks = interp.get("validation_matrix", {}).get("validation_checks", {})
+        aggregated = interp.get("validation_matrix", {}).get("aggregated_actions", {})
+        structural = engine.get("kernel", {}).get("kernel_structural_v1", {})
+        validators = (
+            engine.get("engines", {}).get("analysis", {}).get("engines", {})
+            .get("analysis", {}).get("validators", {}).get("validators", {})
+        )
+
+        dim_index = {d: i for i, d in enumerate(dimensions)}
+        self.dimensions = dimensions
+        self.routing_matrix = routing_matrix
+        self.unresolved: List[str] = []
+
+        # --- missing_data_check ---
+        missing = checks.get("missing_data_check", {}).get("rules", {})
+        self.minimum_signals = int(missing.get("minimum_signals_required", 0))
+
+        # --- signal_vector_alignment_check ---
+        alignment = checks.get("signal_vector_alignment_check", {}).get("rules", {})
+        self.mismatch_threshold = float(alignment.get("mismatch_threshold", 1.0))
+
+        # --- motive_vector_consistency_check ---
+        consistency = checks.get("motive_vector_consistency_check", {}).get("rules", {})
+        motive_dims = {}
+        for dim in structural.get("dimensions", {}).values():
+            for m in dim.get("sub_motives", []):
+                motive_dims[m["motive_id"].split("-", 1)[0]] = dim.get("id")
+
+        def resolve_term(term: str) -> Optional[int]:
+            dim = VALIDATION_TERMS.get(term)
+            if dim is None and "-" in term:
+                prefix = term.split("-", 1)[0]
+                dim = motive_dims.get(MOTIVE_PREFIX_ALIASES.get(prefix, prefix))
+            if dim not in dim_index:
+                self.unresolved.append(term)
+                return None
+            return dim_index[dim]
+
+        left, right = [], []
+        for a, b in consistency.get("contradiction_pairs", []):
+            ia, ib = resolve_term(a), resolve_term(b)
+            if ia is not None and ib is not None:
+                left.append(ia)
+                right.append(ib)
+        self.pair_left = np.array(left, dtype=np.intp)
+        self.pair_right = np.array(right, dtype=np.intp)
+
+        # --- stress_conflict_interaction_check ---
+        stress_conflict = checks.get("stress_conflict_interaction_check", {}).get("rules", {})
+        self.stress_low = float(stress_conflict.get("stress_too_low_for_conflict", 0.0))
+        self.stress_high = float(stress_conflict.get("stress_too_high_for_no_conflict", 1.0))
+        self.conflict_mask = np.array(
+            [signal_groups.get(s) == "conflict_signals" for s in signals], dtype=np.float64
+        )
+
+        # --- identity_integrity_check ---
+        identity = checks.get("identity_integrity_check", {}).get("rules", {})
+        self.identity_index = dim_index.get("D4")
+        self.identity_threshold = float(identity.get("identity_fragility_threshold", 1.0))
+        self.identity_amplification = float(identity.get("amplification_factor", 1.0))
+
+        # --- penalties / aggregated actions ---
+        self.flag_penalties = np.array([
+            float(missing.get("confidence_penalty", 0.0)),
+            0.0,
+            float(consistency.get("confidence_penalty", 0.0)),
+            0.0,
+            0.0,
+            0.0,
+        ], dtype=np.float64)
+        reduce = aggregated.get("reduce_confidence", {})
+        self.failure_threshold = int(reduce.get("threshold_failures", len(VALIDATION_FLAGS) + 1))
+        self.total_penalty = float(reduce.get("total_confidence_penalty", 0.0))
+        force = aggregated.get("force_conflict_activation", {}).get("rules", {})
+        self.contradiction_threshold = int(force.get("contradiction_threshold", 1 << 30))
+
+        # --- validators.json: per-dimension missing data feeds the confidence estimator ---
+        self.dimension_missing = (
+            "missing_data_interpreter" in validators and "confidence_estimator" in validators
+        )
+
+        # plain-Python copies for the single-row path
+        self._routing_rows = [tuple(r) for r in routing_matrix.tolist()]
+        self._conflict_rows = [bool(v) for v in self.conflict_mask]
+        self._pairs = list(zip(left, right))
+        self._penalties = self.flag_penalties.tolist()
+
+        for arr in (self.pair_left, self.pair_right, self.conflict_mask, self.flag_penalties):
+            arr.setflags(write=False)
+
+    # ---------------------------------------
+    # EVALUATION
+    # ---------------------------------------
+    def evaluate(self, signals: np.ndarray, dims: np.ndarray, stress: np.ndarray) -> List[dict]:
+        # NumPy setup costs more than the checks themselves for a single row,
+        # so the per-request path runs the same predicates on Python floats.
+        if signals.shape[0] == 1:
+            return [self._evaluate_row(signals[0], dims[0], float(stress[0]))]
+        return self._evaluate_batch(signals, dims, stress)
+
+    def _evaluate_batch(self, signals: np.ndarray, dims: np.ndarray,
+                        stress: np.ndarray) -> List[dict]:
+        n = signals.shape[0]
+        flags = np.zeros((n, len(VALIDATION_FLAGS)), dtype=bool)
+
+        flags[:, 0] = (signals > 0).sum(axis=1) < self.minimum_signals
+
+        # implied (signal routing) vs resolved (dimension) distribution, total variation distance
+        implied = signals @ self.routing_matrix
+        resolved = np.abs(dims)
+        implied_sum = implied.sum(axis=1, keepdims=True)
+        resolved_sum = resolved.sum(axis=1, keepdims=True)
+        has_mass = (implied_sum[:, 0] > 0) & (resolved_sum[:, 0] > 0)
+        distance = 0.5 * np.abs(
+            implied / np.where(implied_sum > 0, implied_sum, 1.0)
+            - resolved / np.where(resolved_sum > 0, resolved_sum, 1.0)
+        ).sum(axis=1)
+        flags[:, 1] = has_mass & (distance > self.mismatch_threshold)
+
+        high = dims >= HIGH_ACTIVATION
+        pair_hits = (high[:, self.pair_left] & high[:, self.pair_right]).sum(axis=1)
+        flags[:, 2] = pair_hits > 0
+
+        conflict = (signals @ self.conflict_mask) > 0
+        flags[:, 3] = conflict & (stress < self.stress_low)
+        flags[:, 4] = ~conflict & (stress > self.stress_high)
+
+        if self.identity_index is not None:
+            fragile = dims[:, self.identity_index] >= self.identity_threshold
+            flags[:, 5] = fragile
+            dims[:, self.identity_index] *= np.where(fragile, self.identity_amplification, 1.0)
+
+        # missing_data_interpreter / confidence_estimator: dimensions with no routed signal
+        missing_dims = (implied <= 0) & self.dimension_missing
+
+        failures = flags.sum(axis=1)
+        penalty = flags @ self.flag_penalties
+        penalty = np.where(failures >= self.failure_threshold,
+                           np.maximum(penalty, self.total_penalty), penalty)
+        confidence = np.clip(1.0 - penalty, 0.0, 1.0)
+        dim_confidence = np.clip(confidence[:, None] - missing_dims * self.flag_penalties[0], 0.0, 1.0)
+        activate = (pair_hits + flags[:, 1]) >= self.contradiction_threshold
+
+        return [
+            self._format(flags[i], confidence[i], dim_confidence[i], missing_dims[i], activate[i])
+            for i in range(n)
+        ]
+
+    def _evaluate_row(self, signals: np.ndarray, dims: np.ndarray, stress: float) -> dict:
+        sig = signals.tolist()
+        dim = dims.tolist()
+        routing = self._routing_rows
+        flags = [False] * len(VALIDATION_FLAGS)
+
+        implied = [0.0] * len(dim)
+        active = 0
+        conflict = False
+        for i, v in enumerate(sig):
+            if v > 0:
+                active += 1
+                conflict = conflict or self._conflict_rows[i]
+                for d, w in enumerate(routing[i]):
+                    implied[d] += v * w
+        flags[0] = active < self.minimum_signals
+
+        implied_sum = sum(implied)
+        resolved = [abs(v) for v in dim]
+        resolved_sum = sum(resolved)
+        if implied_sum > 0 and resolved_sum > 0:
+            distance = 0.5 * sum(
+                abs(a / implied_sum - b / resolved_sum) for a, b in zip(implied, resolved)
+            )
+            flags[1] = distance > self.mismatch_threshold
+
+        pair_hits = sum(
+            1 for a, b in self._pairs if dim[a] >= HIGH_ACTIVATION and dim[b] >= HIGH_ACTIVATION
+        )
+        flags[2] = pair_hits > 0
+        flags[3] = conflict and stress < self.stress_low
+        flags[4] = (not conflict) and stress > self.stress_high
+
+        if self.identity_index is not None and dim[self.identity_index] >= self.identity_threshold:
+            flags[5] = True
+            dims[self.identity_index] *= self.identity_amplification
+
+        missing_dims = [self.dimension_missing and v <= 0 for v in implied]
+
+        penalty = sum(p for f, p in zip(flags, self._penalties) if f)
+        if sum(flags) >= self.failure_threshold:
+            penalty = max(penalty, self.total_penalty)
+        confidence = min(1.0, max(0.0, 1.0 - penalty))
+        dim_confidence = [
+            min(1.0, max(0.0, confidence - (self._penalties[0] if m else 0.0))) for m in missing_dims
+        ]
+        activate = pair_hits + int(flags[1]) >= self.contradiction_threshold
+        return self._format(flags, confidence, dim_confidence, missing_dims, activate)
+
+    def _format(self, flags, confidence, dim_confidence, missing_dims, activate) -> dict:
+        return {
+            "flags": [name for name, f in zip(VALIDATION_FLAGS, flags) if f],
+            "adjusted_confidence": round(float(confidence), 4),
+            "dimension_confidence": {
+                d: round(float(v), 4) for d, v in zip(self.dimensions, dim_confidence)
+            },
+            "missing_dimensions": [d for d, m in zip(self.dimensions, missing_dims) if m],
+            "activate_conflict_engine": bool(activate),
+        }
+
+
+def compile_validation(engine: dict, signals: List[str], signal_groups: Dict[str, str],
+                       routing_matrix: np.ndarray, dimensions: List[str]) -> CompiledValidation:
+    return CompiledValidation(engine, signals, signal_groups, routing_matrix, dimensions)
@@ -0,0 +1,314 @@
+# vector_engine.py
+# PersonaSight™ — Kernel Vector Pipeline
+# Version: PEK_KERNEL_VECTOR_V1
+# Compiles the JSON kernel (signals → motives → dimensions) into dense
+# weight matrices once, then scores one input or a whole batch with NumPy ops.
+
+import threading
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from PersonalityEngine_Kernel.engine_runtime.engine_loader import assemble_engine
+from PersonalityEngine_Kernel.engines.vector.conflict_stage import compile_conflict_rules
+from PersonalityEngine_Kernel.engines.vector.indicator_stage import compile_indicator_index
+from PersonalityEngine_Kernel.engines.vector.stress_stage import compile_stress_overrides
+from PersonalityEngine_Kernel.engines.vector.validation_stage import compile_validation
+
+VECTOR_ENGINE_VERSION = "PEK_KERNEL_VECTOR_V1"
+
+DIMENSIONS = ["D1", "D2", "D3", "D4", "D5"]
+
+# Ordered buckets from weights_defaults.json. A signal with N keyword hits
+# lands in bucket N (capped), and both scales are read at the same bucket.
+STRENGTH_BUCKETS = ["weak", "moderate", "strong", "critical"]
+ACTIVATION_BUCKETS = ["low", "medium", "high", "extreme"]
+
+
+# ---------------------------------------
+# COMPILED KERNEL
+# ---------------------------------------
+class CompiledVectorKernel:
+    """
+    Dense, read-only view of the vector pipeline described by the kernel JSON.
+
+    signals          ordered signal ids (columns of every signal matrix)
+    signal_groups    signal id -> category from signal_definitions.json
+    keywords         ordered keyword list used for detection
+    keyword_matrix   (n_keywords, n_signals) keyword → signal incidence
+    level_table      hit count → motive activation (strength * activation weight)
+    routing_matrix   (n_signals, 5) signal → dimension routing (before baselines)
+    motive_matrix    (n_signals, 5) motive activation → dimension shift
+    influence_matrix (5, 5) cross-dimension influences (row = source)
+    weight_matrix    (n_signals, 5) motive_matrix @ (I + influence) / normalizer
+    stress_vector    (n_signals,) signals that feed stress_state instead of a dimension
+    stress_overrides per-stress-level signal / dimension multiplier tables
+    validation       compiled validation_matrix.json checks
+    conflicts        compiled conflict_engine.json rules
+    indicators       inverted index over kernel_structural_v1 indicators / predictive signals
+    """
+
+    def __init__(self, engine: dict):
+        modules = engine.get("modules", {})
+        signal_defs = modules["signals"]["signal_definitions"]
+        weights = modules["weights"]["weights_defaults"]
+        calculator = modules["motives"]["modules"]["vectors"]["vector_calculator"]
+
+        # --- signal axis ---
+        self.signals: List[str] = []
+        self.signal_groups: Dict[str, str] = {}
+        for group, ids in signal_defs.get("signal_categories", {}).items():
+            for sid in ids:
+                if sid not in self.signal_groups:
+                    self.signals.append(sid)
+                    self.signal_groups[sid] = group
+        self.signal_index = {sid: i for i, sid in enumerate(self.signals)}
+        n_sig = len(self.signals)
+
+        # --- keyword → signal incidence ---
+        keyword_rules = signal_defs.get("detection_rules", {}).get("keyword_rules", {})
+        self.keywords: List[str] = []
+        keyword_index: Dict[str, int] = {}
+        pairs = []
+        for sid, words in keyword_rules.items():
+            if sid not in self.signal_index:
+                continue
+            for w in words:
+                w = (w or "").lower().strip()
+                if not w:
+                    continue
+                if w not in keyword_index:
+                    keyword_index[w] = len(self.keywords)
+                    self.keywords.append(w)
+                pairs.append((keyword_index[w], self.signal_index[sid]))
+
+        self.keyword_matrix = np.zeros((len(self.keywords), n_sig), dtype=np.float64)
+        for k, s in pairs:
+            self.keyword_matrix[k, s] = 1.0
+        self.detectable = self.keyword_matrix.sum(axis=0) > 0
+
+        # --- hit count → motive activation ---
+        strength = weights.get("signal_strength_defaults", {})
+        activation = weights.get("motive_activation_weights", {})
+        self.level_table = np.array(
+            [0.0] + [
+                float(strength.get(s, 0.0)) * float(activation.get(a, 0.0))
+                for s, a in zip(STRENGTH_BUCKETS, ACTIVATION_BUCKETS)
+            ],
+            dtype=np.float64,
+        )
+        self.max_hits = len(self.level_table) - 1
+
+        # --- motive activation → dimension shift ---
+        dim_weights = weights.get("dimension_weights", {})
+        baselines = np.array(
+            [float(dim_weights.get(d, {}).get("baseline", 0.0)) for d in DIMENSIONS],
+            dtype=np.float64,
+        )
+        dim_index = {d: i for i, d in enumerate(DIMENSIONS)}
+        mapping_rules = signal_defs.get("mapping_rules", {})
+
+        routing = np.zeros((n_sig, len(DIMENSIONS)), dtype=np.float64)
+        self.stress_vector = np.zeros(n_sig, dtype=np.float64)
+        for sid, i in self.signal_index.items():
+            target = mapping_rules.get(sid)
+            if target is None:
+                # signal_router.json fallback_rule: normalize_and_distribute
+                routing[i, :] = 1.0 / len(DIMENSIONS)
+                continue
+            dim = target.split("_", 1)[0]
+            if dim in dim_index:
+                routing[i, dim_index[dim]] = 1.0
+            else:
+                self.stress_vector[i] = 1.0
+        self.routing_matrix = routing
+        self.motive_matrix = routing * baselines
+
+        # --- cross-dimension influences (one linear propagation step) ---
+        self.influence_matrix = np.zeros((len(DIMENSIONS), len(DIMENSIONS)), dtype=np.float64)
+        for src, conf in dim_weights.items():
+            if src not in dim_index:
+                continue
+            for dst, w in (conf.get("influences", {}) or {}).items():
+                if dst in dim_index:
+                    self.influence_matrix[dim_index[src], dim_index[dst]] = float(w)
+        propagation = np.eye(len(DIMENSIONS)) + self.influence_matrix
+
+        # --- weighted_sum normalized into normalize_range ---
+        resolution = calculator.get("calculation_rules", {}).get("dimension_resolution", {})
+        lo, hi = resolution.get("normalize_range", [-1.0, 1.0])
+        self.normalize_range = (float(lo), float(hi))
+
+        combined = self.motive_matrix @ propagation
+        ceiling = (self.level_table[-1] * self.detectable.astype(np.float64)) @ combined
+        ceiling[ceiling <= 0] = 1.0
+        self.weight_matrix = combined / ceiling * self.normalize_range[1]
+
+        stress_ceiling = float(self.level_table[-1] * (self.stress_vector * self.detectable).sum())
+        if stress_ceiling > 0:
+            self.stress_vector = self.stress_vector / stress_ceiling
+
+        self.stress_overrides = compile_stress_overrides(
+            engine, self.signals, self.signal_groups, DIMENSIONS
+        )
+        self.validation = compile_validation(
+            engine, self.signals, self.signal_groups, self.routing_matrix, DIMENSIONS
+        )
+        self.conflicts = compile_conflict_rules(
+            engine, self.signals, self.signal_groups, DIMENSIONS
+        )
+        self.indicators = compile_indicator_index(engine, DIMENSIONS)
+
+        for arr in (self.keyword_matrix, self.level_table, self.routing_matrix, self.motive_matrix,
+                    self.influence_matrix, self.weight_matrix, self.stress_vector):
+            arr.setflags(write=False)
+
+
+def compile_vector_kernel(engine: Optional[dict] = None) -> CompiledVectorKernel:
+    if engine is None:
+        engine = assemble_engine()
+    return CompiledVectorKernel(engine)
+
+
+_VECTOR_KERNEL: Optional[CompiledVectorKernel] = None
+_VECTOR_KERNEL_LOCK = threading.Lock()
+
+
+def get_vector_kernel() -> CompiledVectorKernel:
+    global _VECTOR_KERNEL
+    if _VECTOR_KERNEL is None:
+        with _VECTOR_KERNEL_LOCK:
+            if _VECTOR_KERNEL is None:
+                _VECTOR_KERNEL = compile_vector_kernel()
+    return _VECTOR_KERNEL
+
+
+# ---------------------------------------
+# MATRIX STAGES
+# ---------------------------------------
+def _normalize_text(engine_input: dict) -> str:
+    return (engine_input.get("example_statement", "") or "").lower().strip()
+
+
+def keyword_presence(texts: List[str], kernel: CompiledVectorKernel) -> np.ndarray:
+    # (n_texts, n_keywords) 0/1 — the only per-text Python step.
+    keywords = kernel.keywords
+    out = np.zeros((len(texts), len(keywords)), dtype=np.float64)
+    for row, t in enumerate(texts):
+        out[row] = [kw in t for kw in keywords]
+    return out
+
+
+def signal_matrix(texts: List[str], kernel: CompiledVectorKernel) -> np.ndarray:
+    # (n_texts, n_signals) motive activation per signal.
+    counts = keyword_presence(texts, kernel) @ kernel.keyword_matrix
+    buckets = np.minimum(counts, kernel.max_hits).astype(np.intp)
+    return kernel.level_table[buckets]
+
+
+def dimension_matrix(signals: np.ndarray, kernel: CompiledVectorKernel) -> np.ndarray:
+    # (n_texts, 5) resolved dimension vector.
+    lo, hi = kernel.normalize_range
+    return np.clip(signals @ kernel.weight_matrix, lo, hi)
+
+
+def stress_levels(signals: np.ndarray, kernel: CompiledVectorKernel) -> np.ndarray:
+    return np.clip(signals @ kernel.stress_vector, 0.0, 1.0)
+
+
+def apply_forced_overrides(signals: np.ndarray, dims: Optional[np.ndarray], row: int,
+                           forced: dict, kernel: CompiledVectorKernel) -> None:
+    # forced_overrides: {"<SIGNAL_ID>": activation, "D1".."D5": value}
+    lo, hi = kernel.normalize_range
+    for key, value in forced.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        if dims is None:
+            if key in kernel.signal_index:
+                signals[row, kernel.signal_index[key]] = min(1.0, max(0.0, float(value)))
+        elif key in DIMENSIONS:
+            dims[row, DIMENSIONS.index(key)] = min(hi, max(lo, float(value)))
+
+
+# ---------------------------------------
+# OUTPUT
+# ---------------------------------------
+def _format_row(kernel: CompiledVectorKernel, signals: np.ndarray, dims: np.ndarray,
+                stress: float, override: Optional[float], validation: dict,
+                conflict_patterns: dict, kernel_indicators: dict) -> dict:
+    active = np.nonzero(signals)[0]
+    return {
+        "engine_version": VECTOR_ENGINE_VERSION,
+        "dimension_vector": {d: round(float(v), 4) for d, v in zip(DIMENSIONS, dims)},
+        "signal_levels": {kernel.signals[i]: round(float(signals[i]), 4) for i in active},
+        "stress_level": round(float(stress), 4),
+        "stress_override": kernel.stress_overrides.describe(override),
+        "validation": validation,
+        "conflict_patterns": conflict_patterns,
+        "kernel_indicators": kernel_indicators,
+    }
+
+
+def run_vector_batch(engine_inputs: List[dict],
+                     kernel: Optional[CompiledVectorKernel] = None) -> List[dict]:
+    kernel = kernel or get_vector_kernel()
+    texts = [_normalize_text(e) for e in engine_inputs]
+    signals = signal_matrix(texts, kernel)
+
+    # context_flags / forced_overrides: skipped entirely when no request sets them.
+    overrides = kernel.stress_overrides
+    flagged = [overrides.stress_value(e.get("context_flags")) for e in engine_inputs]
+    forced = [e.get("forced_overrides") or {} for e in engine_inputs]
+    has_stress = any(v is not None for v in flagged)
+    has_forced = any(forced)
+
+    if has_stress:
+        rows = np.fromiter((overrides.segment(v) for v in flagged), dtype=np.intp, count=len(flagged))
+        signals = signals * overrides.signal_multipliers[rows]
+    if has_forced:
+        for i, f in enumerate(forced):
+            if f:
+                apply_forced_overrides(signals, None, i, f, kernel)
+
+    dims = signals @ kernel.weight_matrix
+    if has_stress:
+        dims *= overrides.dimension_multipliers[rows]
+    lo, hi = kernel.normalize_range
+    dims = np.clip(dims, lo, hi)
+
+    stress = stress_levels(signals, kernel)
+    if has_stress:
+        context = np.array([np.nan if v is None else v for v in flagged], dtype=np.float64)
+        stress_for_checks = np.fmax(stress, context)
+    else:
+        stress_for_checks = stress
+    validation = kernel.validation.evaluate(signals, dims, stress_for_checks)
+
+    # conflict_engine.json: detection on the validated vector, then vector / stress / confidence shifts
+    conflicts = kernel.conflicts
+    fired = conflicts.evaluate(signals, dims)
+    shift, pathway = conflicts.apply(fired, dims, stress)
+    np.clip(dims, lo, hi, out=dims)
+    patterns = [
+        conflicts.describe(fired[i], signals[i], shift[i], pathway[i]) if fired[i].any() else {}
+        for i in range(len(texts))
+    ]
+    for v, p in zip(validation, patterns):
+        if p:
+            v["adjusted_confidence"] = round(min(1.0, max(0.0, v["adjusted_confidence"] + p["confidence_shift"])), 4)
+
+    if has_forced:
+        for i, f in enumerate(forced):
+            if f:
+                apply_forced_overrides(signals, dims, i, f, kernel)
+
+    return [
+        _format_row(kernel, signals[i], dims[i], stress[i], flagged[i], validation[i], patterns[i],
+                    kernel.indicators.describe(texts[i]))
+        for i in range(len(texts))
+    ]
+
+
+def run_vector_inference(engine_input: dict,
+                         kernel: Optional[CompiledVectorKernel] = None) -> dict:
+    return run_vector_batch([engine_input], kernel)[0]